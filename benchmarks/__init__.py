@@ -0,0 +1 @@
+"""Benchmarks for ``mgrid`` on synthetic power grids."""
@@ -0,0 +1,78 @@
+"""Benchmark memory of graphs stored by ``networkx`` and in arrays.
+
+Bytes per edge are traced while building a planar graph from an
+edgelist, without and with elements on edges, and the time to convert
+the grid to a supra grid is compared.
+
+Run with ``python -m benchmarks.compact``.
+"""
+import gc
+from time import perf_counter
+import tracemalloc
+from typing import Callable
+
+from benchmarks.synthetic import edgelist, grid
+from mgrid.graph.geographic import GeoGraph
+from mgrid.transformation import planar2supra
+
+FEEDER_LENGTH = 20
+SIZES = [100, 1000, 10000]
+
+
+def _traced(build: Callable) -> float:
+    """Trace memory kept by an object after building it.
+
+    Args:
+        build: a function without arguments.
+
+    Returns:
+        Bytes kept by the result.
+    """
+    gc.collect()
+    tracemalloc.start()
+    res = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del res
+    return size
+
+
+def main():
+    """Echo bytes per edge and seconds for grids in increasing sizes."""
+    print(
+        f"{'edges':>10} {'graph B/e':>10} {'arrays B/e':>10} "
+        f"{'grid B/e':>10} {'arrays B/e':>10} {'supra s':>10} "
+        f"{'arrays s':>10}"
+    )
+    for num_substations in SIZES:
+        df = edgelist(num_substations, FEEDER_LENGTH)
+        num_edges = len(df)
+        sizes = [
+            _traced(lambda: GeoGraph.from_edgelist(df, "source", "target")),
+            _traced(
+                lambda: GeoGraph.from_edgelist(
+                    df, "source", "target", compact=True
+                )
+            ),
+            _traced(lambda: grid(num_substations, FEEDER_LENGTH)),
+            _traced(lambda: grid(num_substations, FEEDER_LENGTH, True)),
+        ]
+
+        durations = []
+        for compact in [False, True]:
+            g = grid(num_substations, FEEDER_LENGTH, compact)
+            start = perf_counter()
+            planar2supra(g)
+            durations.append(perf_counter() - start)
+
+        print(
+            f"{num_edges:>10} "
+            + " ".join(f"{size / num_edges:>10.0f}" for size in sizes)
+            + " "
+            + " ".join(f"{duration:>10.3f}" for duration in durations)
+        )
+
+
+if __name__ == "__main__":
+    main()
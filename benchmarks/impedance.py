@@ -0,0 +1,63 @@
+"""Benchmark the direct impedance method against pandapower.
+
+Synthetic grids have cable capacitance and transformer magnetising
+losses, which are ignored by the direct impedance method, so voltages
+differ slightly from those by pandapower.
+
+Run with ``python -m benchmarks.impedance``.
+"""
+from time import perf_counter
+
+import numpy as np
+import pandapower as pp
+
+from benchmarks.synthetic import grid
+from mgrid.power_flow.impedance import RadialPowerFlow, RadialPowerFlowPhase
+from mgrid.power_flow.pandapower import supra2pandapower
+from mgrid.transformation import planar2supra
+
+FEEDER_LENGTH = 20
+SIZES = [10, 40, 160]
+NUM_RUNS = 10  #: number of load profiles solved for each grid
+
+
+def main():
+    """Echo the time to solve some load profiles in all the ways."""
+    print(
+        f"{'buses':>10} {'build':>10} {'sweep':>10} {'3-phase':>10} "
+        f"{'newton':>10} {'max dv':>10}"
+    )
+    for num_substations in SIZES:
+        supra = planar2supra(grid(num_substations, FEEDER_LENGTH))
+        net = supra2pandapower(supra)
+
+        start = perf_counter()
+        rpf = RadialPowerFlow(supra)
+        build = perf_counter() - start
+
+        start = perf_counter()
+        for _ in range(NUM_RUNS):
+            v = rpf.solve()
+        sweep = (perf_counter() - start) / NUM_RUNS
+
+        rpf_phase = RadialPowerFlowPhase(supra)
+        start = perf_counter()
+        for _ in range(NUM_RUNS):
+            rpf_phase.solve()
+        phase = (perf_counter() - start) / NUM_RUNS
+
+        start = perf_counter()
+        for _ in range(NUM_RUNS):
+            pp.runpp(net)
+        newton = (perf_counter() - start) / NUM_RUNS
+
+        vm_pp = net.res_bus.set_index(net.bus["name"])["vm_pu"]
+        dv = np.abs(np.abs(v) - vm_pp[rpf.buses].to_numpy()).max()
+        print(
+            f"{len(rpf.buses):>10} {build:>10.4f} {sweep:>10.4f} "
+            f"{phase:>10.4f} {newton:>10.4f} {dv:>10.1e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
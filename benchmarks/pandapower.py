@@ -0,0 +1,48 @@
+"""Benchmark how ``supra2pandapower`` scales with the number of buses.
+
+The two-step path through ``planar2supra`` is compared with building
+the model from the planar grid directly by ``geo2pandapower``.
+
+Run with ``python -m benchmarks.pandapower``.
+"""
+from time import perf_counter
+
+from benchmarks.synthetic import grid
+from mgrid.power_flow.pandapower import geo2pandapower, supra2pandapower
+from mgrid.transformation import planar2supra
+
+FEEDER_LENGTH = 20
+SIZES = [100, 400, 1600, 6400]
+
+
+def main():
+    """Echo the time to build pandapower models of increasing sizes."""
+    print(
+        f"{'buses':>10} {'seconds':>10} {'us/bus':>10} {'two-step':>10} "
+        f"{'direct':>10}"
+    )
+    for num_substations in SIZES:
+        g = grid(num_substations, FEEDER_LENGTH)
+
+        start = perf_counter()
+        supra = planar2supra(g)
+        duration_supra = perf_counter() - start
+
+        start = perf_counter()
+        supra2pandapower(supra)
+        duration = perf_counter() - start
+
+        start = perf_counter()
+        geo2pandapower(g)
+        duration_direct = perf_counter() - start
+
+        num_buses = len(supra.buses)
+        print(
+            f"{num_buses:>10} {duration:>10.3f} "
+            f"{duration / num_buses * 1e6:>10.1f} "
+            f"{duration_supra + duration:>10.3f} {duration_direct:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
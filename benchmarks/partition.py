@@ -0,0 +1,41 @@
+"""Benchmark solving feeders in parallel with increasing workers.
+
+Run with ``python -m benchmarks.partition``.
+"""
+import os
+from time import perf_counter
+
+from benchmarks.synthetic import grid
+from mgrid.power_flow.partition import ParallelPowerFlow, partition
+from mgrid.transformation import planar2supra
+
+FEEDER_LENGTH = 20
+NUM_SUBSTATIONS = 160
+WORKERS = [1, 2, 4, 8, 16, 32, 64]
+
+
+def main():
+    """Echo the time to solve the same grid with more workers."""
+    supra = planar2supra(grid(NUM_SUBSTATIONS, FEEDER_LENGTH))
+    part = partition(supra, [0])
+    print(f"{len(supra.buses)} buses in {len(part.grids)} pieces")
+    print(f"{'workers':>10} {'first':>10} {'again':>10} {'rounds':>10}")
+    for max_workers in WORKERS:
+        if max_workers > os.cpu_count():
+            break
+        with ParallelPowerFlow(part, max_workers) as runner:
+            start = perf_counter()
+            runner.run()
+            first = perf_counter() - start
+
+            start = perf_counter()
+            runner.run()
+            again = perf_counter() - start
+        print(
+            f"{max_workers:>10} {first:>10.3f} {again:>10.3f} "
+            f"{runner.rounds:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark ingesting a whole grid as a new snapshot.
+
+The bulk ingest is compared with posing a snapshot and adding edges one
+by one, both into a database file in a temporary directory.
+
+Run with ``python -m benchmarks.snapshots``.
+"""
+from pathlib import Path
+import tempfile
+from time import perf_counter
+from typing import Tuple
+
+from benchmarks.synthetic import edgelist
+from mgrid.snapshots.relational import GraphSnapshots
+
+FEEDER_LENGTH = 20
+SIZES = [100, 1000, 10000]
+MAX_EDGES_ONE_BY_ONE = 25000  #: skip the slow path beyond this size
+
+
+def _add_edges(path: str, edges: list) -> float:
+    """Time posing a snapshot and adding edges one by one.
+
+    Args:
+        path: to a new database file.
+        edges: tuples with source, target and element index.
+
+    Returns:
+        Duration in seconds.
+    """
+    gs = GraphSnapshots(path)
+    start = perf_counter()
+    gs.pose("base", "head")
+    gs.add_edges(edges)
+    gs.commit()
+    return perf_counter() - start
+
+
+def _ingest(path: str, edges: list) -> Tuple[float, int]:
+    """Time ingesting edges in bulk.
+
+    Args:
+        path: to a new database file.
+        edges: tuples with source, target and element index.
+
+    Returns:
+        Duration in seconds and size of the database in bytes.
+    """
+    gs = GraphSnapshots(path)
+    start = perf_counter()
+    gs.ingest("base", edges)
+    duration = perf_counter() - start
+    page_count = gs.conn.execute("PRAGMA page_count;").fetchone()[0]
+    page_size = gs.conn.execute("PRAGMA page_size;").fetchone()[0]
+    return duration, page_count * page_size
+
+
+def main():
+    """Echo ingest rates for grids in increasing sizes."""
+    print(
+        f"{'edges':>10} {'add edges/s':>12} {'bulk edges/s':>12} "
+        f"{'bytes/edge':>10}"
+    )
+    for num_substations in SIZES:
+        df = edgelist(num_substations, FEEDER_LENGTH)
+        edges = list(zip(df["source"], df["target"], range(len(df))))
+
+        with tempfile.TemporaryDirectory() as directory:
+            rate = float("nan")
+            if len(edges) <= MAX_EDGES_ONE_BY_ONE:
+                duration = _add_edges(str(Path(directory, "a.db")), edges)
+                rate = len(edges) / duration
+            duration, size = _ingest(str(Path(directory, "b.db")), edges)
+
+        print(
+            f"{len(edges):>10} {rate:>12.0f} "
+            f"{len(edges) / duration:>12.0f} {size / len(edges):>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Build synthetic power grids of arbitrary size for benchmarks.
+
+Every synthetic grid has two layers. In layer 0, substations are
+connected one after another by a medium-voltage cable. Each substation
+is an inter-node, and a radial low-voltage feeder hangs below it in
+layer 1. Every cabinet in the feeder has one load attached.
+"""
+import pandas as pd
+from pandas.core.frame import DataFrame
+
+from mgrid.grid import GeoGrid
+from mgrid.power_flow.conversion import Ejection, Slack
+from mgrid.power_flow.delivery import Cable, TransformerStd
+from mgrid.power_flow.type import TransformerType
+
+
+def edgelist(num_substations: int, feeder_length: int) -> DataFrame:
+    """Build the edgelist of a synthetic grid.
+
+    Args:
+        num_substations: number of substations in layer 0.
+        feeder_length: number of cabinets in each feeder in layer 1.
+
+    Returns:
+        Edgelist with ``source``, ``target`` and ``layer`` columns.
+    """
+    sources = []
+    targets = []
+    layers = []
+    for i in range(num_substations):
+        if i > 0:
+            sources.append(f"sub{i - 1}")
+            targets.append(f"sub{i}")
+            layers.append(0)
+        upstream = f"sub{i}"
+        for j in range(feeder_length):
+            sources.append(upstream)
+            targets.append(f"cab{i}_{j}")
+            layers.append(1)
+            upstream = f"cab{i}_{j}"
+    return pd.DataFrame(
+        {"source": sources, "target": targets, "layer": layers}
+    )
+
+
+def grid(
+    num_substations: int, feeder_length: int, compact: bool = False
+) -> GeoGrid:
+    """Build a synthetic grid with elements on all edges and nodes.
+
+    Args:
+        num_substations: number of substations in layer 0.
+        feeder_length: number of cabinets in each feeder in layer 1.
+        compact: whether to store edges in arrays. Default to be False.
+
+    Returns:
+        A geographic grid with about ``num_substations * (feeder_length
+        + 1)`` edges.
+    """
+    df = edgelist(num_substations, feeder_length)
+    df["element"] = [
+        Cable(
+            length_km=0.1,
+            name=f"{source}-{target}",
+            parallel=1,
+            r_ohm=0.2 if layer else 0.1,
+            x_ohm=0.08,
+            c_nf=210,
+            max_i_ka=0.3,
+        )
+        for source, target, layer in df.itertuples(index=False)
+    ]
+    res = GeoGrid.from_edgelist(
+        df, "source", "target", "element", compact=compact
+    )
+    res.types["trafo"] = TransformerType(
+        s_mva=0.4,
+        v_high_kv=10,
+        v_low_kv=0.4,
+        vk_percent=4,
+        vkr_percent=1.2,
+        pfe_kw=0.82,
+        i0_percent=0.32801,
+    )
+    res.add_inter_nodes(
+        (node, TransformerStd("trafo", node, parallel=1))
+        for node in res.inter_nodes.index
+    )
+    res.df_layers["voltage"] = [10, 0.4]
+
+    res.add_conversion("slack", "sub0", Slack(), 0)
+    intra_nodes = res.intra_nodes
+    res.add_conversions(
+        (f"load_{node}", node, Ejection(0.002, 0.95))
+        for node in intra_nodes.index[intra_nodes["layer"] == 1]
+    )
+    return res
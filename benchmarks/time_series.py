@@ -0,0 +1,40 @@
+"""Benchmark a time-series study with random load profiles.
+
+Run with ``python -m benchmarks.time_series``.
+"""
+from time import perf_counter
+
+import numpy as np
+
+from benchmarks.synthetic import grid
+from mgrid.power_flow.impedance import RadialPowerFlow
+from mgrid.power_flow.snapshot import TimeSeriesPowerFlow
+from mgrid.transformation import planar2supra
+
+FEEDER_LENGTH = 20
+SIZES = [10, 40, 160]
+NUM_STEPS = 1000
+
+
+def main():
+    """Echo the time to solve profiles of grids in increasing sizes."""
+    rng = np.random.default_rng(0)
+    print(f"{'buses':>10} {'seconds':>10} {'ms/step':>10} {'iter':>10}")
+    for num_substations in SIZES:
+        supra = planar2supra(grid(num_substations, FEEDER_LENGTH))
+        solver = RadialPowerFlow(supra)
+        p_mw = rng.uniform(0, 0.004, (NUM_STEPS, len(solver.ejections)))
+
+        start = perf_counter()
+        res = TimeSeriesPowerFlow(solver).run(p_mw)
+        duration = perf_counter() - start
+
+        print(
+            f"{len(solver.buses):>10} {duration:>10.3f} "
+            f"{duration / NUM_STEPS * 1e3:>10.3f} "
+            f"{res.iterations.mean():>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark how ``planar2supra`` scales with the number of edges.
+
+A full conversion is compared with viewing the planar grid as a supra
+grid, and with patching the supra grid after one planning edit, where a
+new cabinet with a load is connected to the end of the first feeder.
+
+Run with ``python -m benchmarks.transformation``.
+"""
+from time import perf_counter
+
+from benchmarks.synthetic import grid
+from mgrid.power_flow.conversion import Ejection
+from mgrid.transformation import GeoDelta, planar2supra, SupraGridView
+
+FEEDER_LENGTH = 20
+SIZES = [50, 100, 200, 400, 800, 1600]
+
+
+def main():
+    """Echo the time of conversion for grids of increasing sizes."""
+    print(
+        f"{'edges':>10} {'seconds':>10} {'us/edge':>10} {'view s':>10} "
+        f"{'patch ms':>10}"
+    )
+    for num_substations in SIZES:
+        g = grid(num_substations, FEEDER_LENGTH)
+
+        start = perf_counter()
+        supra = planar2supra(g)
+        duration = perf_counter() - start
+
+        start = perf_counter()
+        SupraGridView(g)
+        duration_view = perf_counter() - start
+
+        end = f"cab0_{FEEDER_LENGTH - 1}"
+        element = g.edges["sub0", "cab0_0"]["element"]
+        g.add_edge(end, "new", layer=1, element=element)
+        g.add_conversion("new_load", "new", Ejection(0.01, 0.95))
+        delta = GeoDelta(
+            edges_added=[(end, "new")], conversions_added=["new_load"]
+        )
+        start = perf_counter()
+        planar2supra(g, supra, delta)
+        duration_patch = perf_counter() - start
+
+        num_edges = g.number_of_edges()
+        print(
+            f"{num_edges:>10} {duration:>10.3f} "
+            f"{duration / num_edges * 1e6:>10.1f} {duration_view:>10.3f} "
+            f"{duration_patch * 1e3:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
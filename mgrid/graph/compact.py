@@ -0,0 +1,607 @@
+"""Compact storage of directed graphs in arrays.
+
+A ``networkx`` graph keeps dictionaries for every node and every edge,
+which take hundreds of bytes per edge before any attribute. Here, node
+names are interned as ``int32`` ids, and edges are stored in NumPy
+arrays for sources, targets and layers. Elements on edges are referred
+to by rows of :class:`mgrid.power_flow.table.ElementTable`.
+
+To keep existing code working, :func:`install` replaces the storage of a
+graph by mappings over :class:`EdgeArrays`, which build dictionaries
+for a node when it is visited, like views of ``networkx``. Such a graph
+is frozen.
+
+.. note::
+    Attributes of edges and elements are built on every access, so they
+    are equal but not identical between accesses. Bulk operations, like
+    :func:`to_pandas_edgelist`, read the arrays directly.
+"""
+from collections.abc import Mapping, MutableMapping
+from dataclasses import is_dataclass
+from typing import Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+from pandas.core.frame import DataFrame
+from pandas.core.indexes.base import Index
+
+from mgrid.power_flow.table import ElementTable
+
+
+def _downcast(values: np.ndarray) -> np.ndarray:
+    """Store numbers in the smallest dtype without loss.
+
+    Args:
+        values: integers, or floats like layers of inter-edges.
+
+    Returns:
+        Integers or floats in the smallest dtype.
+    """
+    res = pd.to_numeric(pd.Series(values), downcast="integer")
+    if res.dtype.kind == "f":
+        res = pd.to_numeric(res, downcast="float")
+    return res.to_numpy()
+
+
+def tabulate_rows(
+    elements: Sequence,
+) -> Tuple[np.ndarray, np.ndarray, List[ElementTable]]:
+    """Find tables and rows of elements, one table for each data-class.
+
+    Note:
+        Views of the same table keep their rows, so the table is shared
+        instead of copied.
+
+    Args:
+        elements: elements of data-classes or their views. Others are
+            taken as missing, like ``None`` or ``NaN``.
+
+    Returns:
+        Positions of tables, which are -1 for missing elements, rows in
+        tables, and tables.
+    """
+    groups: Dict[type, list] = {}
+    for i, element in enumerate(elements):
+        table = getattr(element, "_table", None)
+        cls = type(element) if table is None else table.cls
+        if is_dataclass(cls):
+            groups.setdefault(cls, []).append(i)
+
+    positions = np.full(len(elements), -1, dtype=np.int8)
+    rows = np.zeros(len(elements), dtype=np.int32)
+    tables = []
+    for code, indices in enumerate(groups.values()):
+        group = [elements[i] for i in indices]
+        table = getattr(group[0], "_table", None)
+        if table is not None and all(
+            getattr(element, "_table", None) is table for element in group
+        ):
+            rows[indices] = [element._row for element in group]
+        else:
+            table = ElementTable.from_elements(group)
+            rows[indices] = np.arange(len(group))
+        positions[indices] = code
+        tables.append(table)
+    return positions, rows, tables
+
+
+class EdgeArrays:
+    """Edges of a directed graph in arrays, with interned node names.
+
+    Note:
+        Edges are sorted by sources, keeping the order of rows for the
+        same source, which is the order of iteration of ``nx.DiGraph``
+        built from the rows. Predecessors are found from positions of
+        edges sorted by targets, like compressed sparse rows.
+
+    Attributes:
+        nodes (Index): node names, whose positions are their ids.
+        source (np.ndarray): ``int32`` ids of sources of edges.
+        target (np.ndarray): ``int32`` ids of targets of edges.
+        layer (np.ndarray): layers of edges in the smallest dtype.
+        element_table (np.ndarray): ``int8`` position of the table for
+            the element on each edge in ``tables``, or -1 if missing.
+        element_row (np.ndarray): ``int32`` row of the element on each
+            edge in its table.
+        tables (List[ElementTable]): tables for elements on edges.
+        node_data (Dict[int, dict]): attributes of some nodes keyed by
+            ids, while other nodes have no attribute.
+        succ_ptr (np.ndarray): edges from node ``i`` are in the range
+            ``succ_ptr[i]:succ_ptr[i + 1]``.
+        pred_ptr (np.ndarray): positions of edges to node ``i`` in
+            ``pred`` are in the range ``pred_ptr[i]:pred_ptr[i + 1]``.
+        pred (np.ndarray): ``int32`` positions of edges sorted by targets.
+    """
+
+    def __init__(
+        self,
+        nodes: Index,
+        source: np.ndarray,
+        target: np.ndarray,
+        layer: np.ndarray,
+        element_table: Optional[np.ndarray] = None,
+        element_row: Optional[np.ndarray] = None,
+        tables: Optional[List[ElementTable]] = None,
+        node_data: Optional[Dict[int, dict]] = None,
+    ):
+        """Store edges given by node ids.
+
+        Args:
+            nodes: unique node names.
+            source: ids of sources of edges.
+            target: ids of targets of edges.
+            layer: layers of edges.
+            element_table: positions of tables for elements on edges, or
+                -1 for missing elements. Default to be None, when there
+                is no element.
+            element_row: rows of elements in their tables.
+            tables: tables for elements.
+            node_data: attributes of some nodes keyed by ids. Default to
+                be None.
+        """
+        num_nodes = len(nodes)
+        order = np.argsort(source, kind="stable")
+        self.nodes = nodes
+        self.source = np.asarray(source, dtype=np.int32)[order]
+        self.target = np.asarray(target, dtype=np.int32)[order]
+        self.layer = _downcast(np.asarray(layer)[order])
+        self.node_data = node_data or {}
+
+        if element_table is None:
+            self.element_table = np.full(len(order), -1, dtype=np.int8)
+            self.element_row = np.zeros(len(order), dtype=np.int32)
+            self.tables = []
+        else:
+            self.element_table = np.asarray(element_table, np.int8)[order]
+            self.element_row = np.asarray(element_row, np.int32)[order]
+            self.tables = tables
+
+        self.succ_ptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(self.source, minlength=num_nodes),
+            out=self.succ_ptr[1:],
+        )
+        self.pred = np.argsort(self.target, kind="stable").astype(np.int32)
+        self.pred_ptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(self.target, minlength=num_nodes),
+            out=self.pred_ptr[1:],
+        )
+
+    @classmethod
+    def from_edgelist(
+        cls,
+        df: DataFrame,
+        source: str,
+        target: str,
+        element: Optional[str] = None,
+        nodes: Optional[Sequence[Hashable]] = None,
+        node_data: Optional[Dict[Hashable, dict]] = None,
+    ) -> "EdgeArrays":
+        """Store an edgelist dataframe in arrays.
+
+        Note:
+            Without ``nodes``, nodes are ordered by first appearance in
+            rows, like ``nx.from_pandas_edgelist``. For duplicated
+            edges, the last row is kept.
+
+        Args:
+            df: an edgelist with a column ``layer``.
+            source: column name indicating sources of edges.
+            target: column name indicating targets of edges.
+            element: column name indicating elements on edges.
+            nodes: all the node names in order. Default to be None,
+                when they are found from edges.
+            node_data: attributes of some nodes keyed by names.
+
+        Returns:
+            Arrays for the edgelist.
+        """
+        if df.duplicated([source, target], keep="last").any():
+            df = df.drop_duplicates([source, target], keep="last")
+
+        if nodes is None:
+            codes, uniques = pd.factorize(
+                np.column_stack([df[source], df[target]]).ravel()
+            )
+            nodes = pd.Index(uniques)
+            codes = codes.reshape(-1, 2)
+            ids = (codes[:, 0], codes[:, 1])
+        else:
+            nodes = pd.Index(nodes)
+            ids = (
+                nodes.get_indexer(df[source]),
+                nodes.get_indexer(df[target]),
+            )
+
+        elements = (None, None, None)
+        if element is not None:
+            elements = tabulate_rows(df[element].to_numpy())
+        if node_data:
+            positions = nodes.get_indexer(list(node_data))
+            node_data = dict(zip(positions, node_data.values()))
+        return cls(
+            nodes, ids[0], ids[1], df["layer"].to_numpy(), *elements, node_data
+        )
+
+    def __len__(self) -> int:
+        """Count edges.
+
+        Returns:
+            Number of edges.
+        """
+        return len(self.source)
+
+    @property
+    def nbytes(self) -> int:
+        """Count bytes of arrays for edges, except node names and tables.
+
+        Returns:
+            Total size of arrays in bytes.
+        """
+        return sum(
+            array.nbytes
+            for array in [
+                self.source,
+                self.target,
+                self.layer,
+                self.element_table,
+                self.element_row,
+                self.succ_ptr,
+                self.pred,
+                self.pred_ptr,
+            ]
+        )
+
+    def edge_data(self, edge: int) -> dict:
+        """Build attributes of an edge.
+
+        Args:
+            edge: position of the edge.
+
+        Returns:
+            Layer of the edge, and a view of its element if any.
+        """
+        res = {"layer": self.layer[edge].item()}
+        table = self.element_table[edge]
+        if table >= 0:
+            res["element"] = self.tables[table].view(
+                self.element_row[edge].item()
+            )
+        return res
+
+    def elements(self) -> np.ndarray:
+        """Gather views of elements on all the edges.
+
+        Returns:
+            Views in the order of edges, or None for missing elements.
+        """
+        res = np.full(len(self), None, dtype=object)
+        for code, table in enumerate(self.tables):
+            positions = np.flatnonzero(self.element_table == code)
+            res[positions] = [
+                table.view(row) for row in self.element_row[positions].tolist()
+            ]
+        return res
+
+    def to_frame(self, elements: bool = True) -> DataFrame:
+        """Build an edgelist like ``nx.to_pandas_edgelist``.
+
+        Args:
+            elements: whether to gather views of elements, which is one
+                object for every edge. Default to be True.
+
+        Returns:
+            Edges with columns ``source``, ``target``, ``layer``, and
+            ``element`` if there is any element.
+        """
+        names = self.nodes.to_numpy()
+        layer = self.layer
+        layer = layer.astype(np.float64 if layer.dtype.kind == "f" else int)
+        res = pd.DataFrame(
+            {
+                "source": names[self.source],
+                "target": names[self.target],
+                "layer": layer,
+            }
+        )
+        if elements and self.tables:
+            res["element"] = self.elements()
+        return res
+
+    def layer_extremes(self) -> DataFrame:
+        """Find upper and lower layers of nodes from edges.
+
+        Returns:
+            Dataframe like
+            :meth:`mgrid.graph.geographic.GeoGraph._find_layer_extremes`,
+            with nodes in the order of first appearance in sources and
+            then targets of edges.
+        """
+        num_nodes = len(self.nodes)
+        ids = np.concatenate([self.source, self.target])
+        layers = np.concatenate([self.layer, self.layer]).astype(np.int64)
+
+        upper = np.full(num_nodes, np.iinfo(np.int64).max)
+        np.minimum.at(upper, ids, layers)
+        lower = np.full(num_nodes, np.iinfo(np.int64).min)
+        np.maximum.at(lower, ids, layers)
+        first = np.full(num_nodes, len(ids))
+        np.minimum.at(first, ids, np.arange(len(ids)))
+
+        order = np.argsort(first, kind="stable")
+        order = order[first[order] < len(ids)]
+        return pd.DataFrame(
+            {"upper": upper[order], "lower": lower[order]},
+            index=self.nodes[order].rename("name"),
+        )
+
+
+class _Nodes(Mapping):
+    """Nodes of compact storage, like ``_node`` of ``nx.DiGraph``."""
+
+    def __init__(self, arrays: EdgeArrays):
+        """Wrap nodes of arrays.
+
+        Args:
+            arrays: compact storage of a graph.
+        """
+        self._arrays = arrays
+
+    def __getitem__(self, node: Hashable) -> dict:
+        """Get attributes of a node.
+
+        Args:
+            node: name of the node.
+
+        Returns:
+            Attributes of the node, or an empty dictionary.
+        """
+        i = self._arrays.nodes.get_loc(node)
+        return self._arrays.node_data.get(i, {})
+
+    def __contains__(self, node: Hashable) -> bool:
+        """Check if a node exists with the hash index of names.
+
+        Args:
+            node: name of the node.
+
+        Returns:
+            Whether the node exists.
+        """
+        return node in self._arrays.nodes
+
+    def __iter__(self) -> Iterator[Hashable]:
+        """Iterate over node names in order.
+
+        Returns:
+            An iterator over node names.
+        """
+        return iter(self._arrays.nodes.to_numpy())
+
+    def __len__(self) -> int:
+        """Count nodes.
+
+        Returns:
+            Number of nodes.
+        """
+        return len(self._arrays.nodes)
+
+
+class _Adjacency(Mapping):
+    """Successors or predecessors, like ``_succ`` of ``nx.DiGraph``."""
+
+    def __init__(
+        self,
+        arrays: EdgeArrays,
+        ptr: np.ndarray,
+        edges: Optional[np.ndarray],
+        ends: np.ndarray,
+    ):
+        """Wrap adjacency in one direction.
+
+        Args:
+            arrays: compact storage of a graph.
+            ptr: ranges of edges for all the nodes.
+            edges: positions of edges in the ranges, or None if edges
+                are sorted in this direction.
+            ends: ids of neighbours along edges.
+        """
+        self._arrays = arrays
+        self._ptr = ptr
+        self._edges = edges
+        self._ends = ends
+
+    def __getitem__(self, node: Hashable) -> dict:
+        """Gather neighbours of a node.
+
+        Args:
+            node: name of the node.
+
+        Returns:
+            Names of neighbours and attributes of edges.
+        """
+        arrays = self._arrays
+        i = arrays.nodes.get_loc(node)
+        start, stop = self._ptr[i], self._ptr[i + 1]
+        if self._edges is None:
+            edges = range(start, stop)
+        else:
+            edges = self._edges[start:stop].tolist()
+        names = arrays.nodes.to_numpy()
+        return {names[self._ends[k]]: arrays.edge_data(k) for k in edges}
+
+    def __contains__(self, node: Hashable) -> bool:
+        """Check if a node exists.
+
+        Args:
+            node: name of the node.
+
+        Returns:
+            Whether the node exists.
+        """
+        return node in self._arrays.nodes
+
+    def __iter__(self) -> Iterator[Hashable]:
+        """Iterate over node names in order.
+
+        Returns:
+            An iterator over node names.
+        """
+        return iter(self._arrays.nodes.to_numpy())
+
+    def __len__(self) -> int:
+        """Count nodes.
+
+        Returns:
+            Number of nodes.
+        """
+        return len(self._arrays.nodes)
+
+
+class NodeLayers(MutableMapping):
+    """Upper and lower layers of nodes in arrays aligned to node ids.
+
+    Note:
+        It replaces the dictionary of node layers in
+        :class:`mgrid.graph.geographic.GeoGraph` for compact storage.
+    """
+
+    def __init__(self, nodes: Index, extremes: DataFrame):
+        """Index layers of nodes.
+
+        Args:
+            nodes: node names, whose positions are their ids.
+            extremes: upper and lower layers indexed by some nodes.
+        """
+        self._nodes = nodes
+        ids = nodes.get_indexer(extremes.index)
+        self._upper = np.zeros(len(nodes), dtype=np.int64)
+        self._lower = np.zeros(len(nodes), dtype=np.int64)
+        self._known = np.zeros(len(nodes), dtype=bool)
+        self._upper[ids] = extremes["upper"].to_numpy()
+        self._lower[ids] = extremes["lower"].to_numpy()
+        self._known[ids] = True
+        self._count = len(ids)
+
+    def _id(self, node: Hashable) -> int:
+        """Find the id of a node with known layers.
+
+        Args:
+            node: name of the node.
+
+        Raises:
+            KeyError: if layers of the node are unknown.
+
+        Returns:
+            Id of the node.
+        """
+        try:
+            i = self._nodes.get_loc(node)
+        except (KeyError, TypeError):
+            raise KeyError(node) from None
+        if not self._known[i]:
+            raise KeyError(node)
+        return i
+
+    def __getitem__(self, node: Hashable) -> Tuple[int, int]:
+        """Get layers of a node.
+
+        Args:
+            node: name of the node.
+
+        Returns:
+            Upper and lower layers.
+        """
+        i = self._id(node)
+        return self._upper[i].item(), self._lower[i].item()
+
+    def __setitem__(self, node: Hashable, layers: Tuple[int, int]):
+        """Set layers of an existing node.
+
+        Args:
+            node: name of the node.
+            layers: upper and lower layers.
+        """
+        i = self._nodes.get_loc(node)
+        self._count += not self._known[i]
+        self._upper[i], self._lower[i] = layers
+        self._known[i] = True
+
+    def __delitem__(self, node: Hashable):
+        """Forget layers of a node.
+
+        Args:
+            node: name of the node.
+        """
+        i = self._id(node)
+        self._known[i] = False
+        self._count -= 1
+
+    def __iter__(self) -> Iterator[Hashable]:
+        """Iterate over nodes with known layers.
+
+        Returns:
+            An iterator over node names.
+        """
+        return iter(self._nodes.to_numpy()[self._known])
+
+    def __len__(self) -> int:
+        """Count nodes with known layers without scanning.
+
+        Returns:
+            Number of nodes.
+        """
+        return self._count
+
+
+def install(graph: nx.DiGraph, arrays: EdgeArrays):
+    """Replace the storage of an empty graph by arrays, and freeze it.
+
+    Args:
+        graph: an empty graph.
+        arrays: compact storage of edges.
+    """
+    graph._arrays = arrays
+    graph._node = _Nodes(arrays)
+    graph._succ = graph._adj = _Adjacency(
+        arrays, arrays.succ_ptr, None, arrays.target
+    )
+    graph._pred = _Adjacency(
+        arrays, arrays.pred_ptr, arrays.pred, arrays.source
+    )
+    nx.freeze(graph)
+
+
+def arrays_of(graph: nx.DiGraph) -> Optional[EdgeArrays]:
+    """Get compact storage of a graph.
+
+    Args:
+        graph: a directed graph.
+
+    Returns:
+        Arrays, or None if the graph is stored by ``networkx``.
+    """
+    return getattr(graph, "_arrays", None)
+
+
+def to_pandas_edgelist(
+    graph: nx.DiGraph, elements: bool = True
+) -> DataFrame:
+    """Build an edgelist, from arrays if the graph is compact.
+
+    Args:
+        graph: a directed graph.
+        elements: whether to gather elements from arrays. Default to be
+            True.
+
+    Returns:
+        An edgelist like ``nx.to_pandas_edgelist``.
+    """
+    arrays = arrays_of(graph)
+    if arrays is None:
+        res = nx.to_pandas_edgelist(graph)
+    else:
+        res = arrays.to_frame(elements)
+    return res
@@ -8,12 +8,19 @@ they are geographical points. That is, all the nodes and edges in a
 planar graph have geographical attributes.
 """
 from itertools import chain
-from typing import Optional, Set, Tuple
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple, Union
 
 import networkx as nx
+import numpy as np
 import pandas as pd
 from pandas.core.frame import DataFrame
 
+from mgrid.graph.compact import (
+    EdgeArrays,
+    install,
+    NodeLayers,
+    to_pandas_edgelist,
+)
 from mgrid.log import LOGGER
 
 COLUMNS = ["upper", "lower"]
@@ -24,9 +31,11 @@ class GeoGraph(nx.DiGraph):
     """Multilayer network as a planar graph.
 
     Note:
-        ``DiGraph`` from ``networkx`` is inherited, in order to modify
-        terminals of edges directly. The order of edge terminals
-        returned by ``Graph`` class is not consistent.
+        - ``DiGraph`` from ``networkx`` is inherited, in order to modify
+          terminals of edges directly. The order of edge terminals
+          returned by ``Graph`` class is not consistent.
+        - With :class:`mgrid.graph.compact.EdgeArrays`, edges are stored
+          in arrays instead of dictionaries, and the graph is frozen.
 
     Attributes:
         inter_nodes (DataFrame): information on inter-nodes.
@@ -48,25 +57,44 @@ class GeoGraph(nx.DiGraph):
                 name, object, layer names
     """
 
-    def __init__(self, dg: Optional[nx.DiGraph] = None):
+    #: upper and lower layers of nodes, maintained when edges change.
+    _node_layers: Optional[Dict[Hashable, Tuple[int, int]]] = None
+    #: edgelists in all the layers, dropped when edges change.
+    _layer_edges: Optional[Dict[int, DataFrame]] = None
+    #: compact storage of edges, if any.
+    _arrays: Optional[EdgeArrays] = None
+
+    def __init__(self, dg: Optional[Union[nx.DiGraph, EdgeArrays]] = None):
         """Init an empty directed graph or from existing directed graph.
 
         Args:
-            dg: an existing directed graph. Default to be None.
+            dg: an existing directed graph, or edges in arrays. Default
+                to be None.
         """
-        if not dg:
+        if isinstance(dg, EdgeArrays):
+            super().__init__()
+            install(self, dg)
+        elif not dg:
             super().__init__()
         else:
             super().__init__(dg)
 
+        # Find layers of all the nodes from incident edges at once.
+        extremes = self._find_layer_extremes()
+        if self._arrays is None:
+            self._node_layers = dict(
+                zip(extremes.index, zip(extremes["upper"], extremes["lower"]))
+            )
+        else:
+            self._node_layers = NodeLayers(self._arrays.nodes, extremes)
+
         self.inter_nodes = None
-        self.inter_nodes = self._find_inter_nodes()
+        self.inter_nodes = self._find_inter_nodes(extremes)
 
         # Find integer indices of all the layers.
-        edgelist = nx.to_pandas_edgelist(self)
-        if "layer" in edgelist:
-            max_layer = edgelist["layer"].max()
-            min_layer = edgelist["layer"].min()
+        if not extremes.empty:
+            max_layer = extremes["lower"].max()
+            min_layer = extremes["upper"].min()
             layer_range = range(min_layer, max_layer + 1)
             self.layers = set(layer_range)
 
@@ -85,6 +113,7 @@ class GeoGraph(nx.DiGraph):
         source: str,
         target: str,
         element: Optional[str] = None,
+        compact: bool = False,
     ):
         """Init a planar graph from an edgelist dataframe.
 
@@ -100,6 +129,9 @@ class GeoGraph(nx.DiGraph):
             source: column name indicating sources of edges.
             target: column name indicating targets of edges.
             element: column name indicating models for delivery element.
+            compact: whether to store edges in arrays, which makes a
+                frozen graph. See :mod:`mgrid.graph.compact`. Default to
+                be False.
 
         Returns:
             A ``PlanarGraph`` when the dataframe have essential columns.
@@ -111,6 +143,8 @@ class GeoGraph(nx.DiGraph):
                 f"Column {source} or {target} not found in dataframe."
             )
             res = None
+        elif compact:
+            res = cls(EdgeArrays.from_edgelist(df, source, target, element))
         else:
             if element:
                 edge_attr = ["layer", "element"]
@@ -126,9 +160,65 @@ class GeoGraph(nx.DiGraph):
             res = cls(res)
         return res
 
-    def _find_inter_nodes(self) -> DataFrame:
+    def _find_layer_extremes(self) -> DataFrame:
+        """Find upper and lower layers of all the nodes from edges.
+
+        Note:
+            Layers of all the incident edges are aggregated in one pass
+            over the edgelist, so nodes are not visited one by one, or
+            over arrays for compact storage. Isolated nodes and edges
+            without layer are ignored.
+
+        Returns:
+            Dataframe for minimum and maximum layers of incident edges.
+
+            .. csv-table::
+                :header: name, dtype, definition
+
+                name (index), name of the node
+                upper, int64, minimum layer of incident edges
+                lower, int64, maximum layer of incident edges
+        """
+        if self._arrays is not None:
+            res = self._arrays.layer_extremes()
+        else:
+            # Adjacency is iterated directly, because ``self.edges`` would
+            # be cached before ``networkx`` views replace it.
+            edgelist = pd.DataFrame(
+                [
+                    (source, target, data.get("layer"))
+                    for source, nbrs in self._succ.items()
+                    for target, data in nbrs.items()
+                ],
+                columns=COLUMNS_DI + ["layer"],
+            )
+            terminals = pd.concat(
+                [
+                    edgelist[[col, "layer"]].set_axis(
+                        ["name", "layer"], axis=1
+                    )
+                    for col in COLUMNS_DI
+                ],
+                ignore_index=True,
+            )
+            terminals = terminals.dropna().infer_objects()
+
+            res = terminals.groupby("name", sort=False)["layer"].agg(
+                ["min", "max"]
+            )
+            res.columns = COLUMNS
+        return res
+
+    def _find_inter_nodes(
+        self, extremes: Optional[DataFrame] = None
+    ) -> DataFrame:
         """Find as many inter-nodes as possible.
 
+        Args:
+            extremes: upper and lower layers of all the nodes from
+                :meth:`GeoGraph._find_layer_extremes`. Default to be
+                None, when they will be found again.
+
         Returns:
             Dataframe for detected inter-nodes.
 
@@ -139,22 +229,18 @@ class GeoGraph(nx.DiGraph):
                 upper, int64, upper layer of the inter-edge
                 lower, int64, lower layer of the inter-edge
         """
-        res_dict = {}
-        for node in self.nodes:
-            upper, lower = self.find_layer(node)
-
-            if upper == lower - 1:
-                res_dict[node] = [upper, lower]
-            elif upper == lower:
-                pass
-            else:
-                LOGGER.warning(
-                    f"Incorrect specification for node {node} corresponding "
-                    f"to an inter-edge with max layer {upper} and min layer "
-                    f" {lower}."
-                )
+        if extremes is None:
+            extremes = self._find_layer_extremes()
+
+        gaps = extremes["lower"] - extremes["upper"]
+        for node, row in extremes[gaps > 1].iterrows():
+            LOGGER.warning(
+                f"Incorrect specification for node {node} corresponding "
+                f"to an inter-edge with max layer {row['upper']} and min "
+                f"layer {row['lower']}."
+            )
 
-        res = pd.DataFrame.from_dict(res_dict, orient="index", columns=COLUMNS)
+        res = extremes.loc[gaps == 1, COLUMNS].copy()
         res.index.name = "name"
         return res
 
@@ -181,7 +267,29 @@ class GeoGraph(nx.DiGraph):
         res.index.name = "name"
         return res
 
-    def layer_edges(self, layer: int) -> Set[tuple]:
+    def _layer_edgelists(self) -> Dict[int, DataFrame]:
+        """Gather edgelists in all the layers, which are cached.
+
+        Note:
+            The cache is dropped whenever edges are added or removed. It
+            is not aware of in-place modification of edge attributes.
+
+        Returns:
+            Edgelists keyed by integer indices of layers.
+        """
+        if self._layer_edges is None:
+            edge_list = to_pandas_edgelist(self)
+            if "layer" in edge_list:
+                self._layer_edges = {
+                    layer: edges
+                    for layer, edges in edge_list.groupby("layer", sort=False)
+                }
+            else:
+                self._layer_edges = {}
+            self._layer_edges_empty = edge_list.iloc[:0]
+        return self._layer_edges
+
+    def layer_edges(self, layer: int) -> Optional[DataFrame]:
         """Gather all the edges and edge attributes in one layer.
 
         Args:
@@ -191,13 +299,15 @@ class GeoGraph(nx.DiGraph):
             An edgelist for those in one layer.
         """
         if layer in self.layers:
-            edge_list = nx.to_pandas_edgelist(self)
-            res = edge_list[edge_list["layer"] == layer]
+            edgelists = self._layer_edgelists()
+            res = edgelists.get(layer, self._layer_edges_empty).copy()
         else:
             res = None
         return res
 
-    def layer_graph(self, layer: int) -> nx.DiGraph:
+    def layer_graph(
+        self, layer: int, copy: Optional[bool] = True
+    ) -> nx.DiGraph:
         """Build a directed graph for one layer.
 
         Note:
@@ -205,14 +315,21 @@ class GeoGraph(nx.DiGraph):
 
         Args:
             layer: integer index of a layer.
+            copy: whether to return an independent copy. Otherwise, a
+                read-only view sharing nodes and edges with this graph
+                is returned, which is invalid once this graph changes.
 
         Returns:
             A directed graph representing a given layer.
         """
         if layer in self.layers:
-            edges = self.layer_edges(layer)
+            edges = self._layer_edgelists().get(
+                layer, self._layer_edges_empty
+            )
             ite_edges = edges[COLUMNS_DI].itertuples(index=False, name=None)
-            res = self.edge_subgraph(ite_edges).copy()
+            res = self.edge_subgraph(ite_edges)
+            if copy:
+                res = res.copy()
         else:
             res = None
         return res
@@ -221,6 +338,10 @@ class GeoGraph(nx.DiGraph):
         """Find layer(s) of a given node.
 
         Note:
+            - Layers are looked up in an index, which is maintained when
+              edges are added or removed and when inter-nodes are
+              specified. Layers of nodes not in the index are found from
+              incident edges.
             - It is assumed that there is no isolated planar node, or
               its layer must be specified by node attribute.
             - If an inter-node is isolated in some layer, only the other
@@ -232,22 +353,293 @@ class GeoGraph(nx.DiGraph):
         Returns:
             Integer indices of upper and lower layers.
         """
-        if (self.inter_nodes is not None) and (node in self.inter_nodes.index):
+        if self._node_layers and node in self._node_layers:
+            res = self._node_layers[node]
+        elif (self.inter_nodes is not None) and (
+            node in self.inter_nodes.index
+        ):
             upper = self.inter_nodes.loc[node, "upper"]
             lower = self.inter_nodes.loc[node, "lower"]
+            res = (upper, lower)
+        else:
+            res = self._scan_layers(node)
+
+        return res
+
+    def _scan_layers(self, node: str) -> Optional[Tuple[int, int]]:
+        """Find layers of a node from its incident edges.
+
+        Args:
+            node: name of a planar node.
+
+        Returns:
+            Integer indices of upper and lower layers, or None if there
+            is no incident edge with layer.
+        """
+        layers = [
+            layer
+            for _, _, layer in chain(
+                self.in_edges(node, data="layer"),
+                self.out_edges(node, data="layer"),
+            )
+            if layer is not None
+        ]
+        if layers:
+            res = (min(layers), max(layers))
+        else:
+            res = None
+        return res
+
+    def _is_inter_node(self, node: str) -> bool:
+        """Check if a node has been specified as an inter-node.
+
+        Args:
+            node: name of a planar node.
+
+        Returns:
+            Whether the node is an inter-node.
+        """
+        return (self.inter_nodes is not None) and (
+            node in self.inter_nodes.index
+        )
+
+    def _widen_node_layers(self, node: str, layer: Optional[int]):
+        """Widen layers of a node in the index by a new incident edge.
+
+        Note:
+            Layers of inter-nodes are fixed by ``inter_nodes``, so they
+            are not changed by incident edges.
+
+        Args:
+            node: name of a planar node.
+            layer: layer of the new incident edge.
+        """
+        if layer is None or self._is_inter_node(node):
+            return
+
+        upper, lower = self._node_layers.get(node, (layer, layer))
+        self._node_layers[node] = (min(upper, layer), max(lower, layer))
+
+    def _refresh_node_layers(self, nodes: Iterable[str]):
+        """Find layers of some nodes again after removal of edges.
+
+        Args:
+            nodes: names of planar nodes, which might have been removed.
+        """
+        for node in nodes:
+            if node not in self:
+                self._node_layers.pop(node, None)
+            elif not self._is_inter_node(node):
+                layers = self._scan_layers(node)
+                if layers is None:
+                    self._node_layers.pop(node, None)
+                else:
+                    self._node_layers[node] = layers
+
+    def _edge_layer(self, u, v) -> Optional[int]:
+        """Find the layer of an edge if it exists.
+
+        Args:
+            u: source of the edge.
+            v: target of the edge.
+
+        Returns:
+            Layer of the edge, or None if it does not exist.
+        """
+        return self._succ.get(u, {}).get(v, {}).get("layer")
+
+    def _update_node_layers(self, u, v, layer_old: Optional[int]):
+        """Update layers of terminals of a new or modified edge.
+
+        Note:
+            If an existing edge is moved to another layer, its old layer
+            may no longer bound its terminals, so they are found again.
+
+        Args:
+            u: source of the edge.
+            v: target of the edge.
+            layer_old: layer of the edge before, or None if it is new.
+        """
+        layer = self._succ[u][v].get("layer")
+        if layer_old is not None and layer_old != layer:
+            self._refresh_node_layers([u, v])
         else:
-            layers = [
-                layer
-                for _, _, layer in chain(
-                    self.in_edges(node, data="layer"),
-                    self.out_edges(node, data="layer"),
-                )
+            self._widen_node_layers(u, layer)
+            self._widen_node_layers(v, layer)
+
+    def add_edge(self, u_of_edge, v_of_edge, **attr):
+        """Add an edge and update layers of its terminals.
+
+        Args:
+            u_of_edge: source of the edge.
+            v_of_edge: target of the edge.
+            attr: edge attributes, like ``layer``.
+
+        .. # noqa: DAR101 attr
+        """
+        layer_old = self._edge_layer(u_of_edge, v_of_edge)
+        super().add_edge(u_of_edge, v_of_edge, **attr)
+        self._layer_edges = None
+        if self._node_layers is not None:
+            self._update_node_layers(u_of_edge, v_of_edge, layer_old)
+
+    def add_edges_from(self, ebunch_to_add, **attr):
+        """Add some edges and update layers of their terminals.
+
+        Args:
+            ebunch_to_add: container of edges, see ``networkx``.
+            attr: edge attributes shared by all the edges.
+
+        .. # noqa: DAR101 attr
+        """
+        self._layer_edges = None
+        if self._node_layers is None:
+            super().add_edges_from(ebunch_to_add, **attr)
+        else:
+            ebunch_to_add = list(ebunch_to_add)
+            layers_old = [
+                self._edge_layer(edge[0], edge[1]) for edge in ebunch_to_add
             ]
+            super().add_edges_from(ebunch_to_add, **attr)
+            for edge, layer_old in zip(ebunch_to_add, layers_old):
+                self._update_node_layers(edge[0], edge[1], layer_old)
+
+    def remove_edge(self, u, v):
+        """Remove an edge and update layers of its terminals.
+
+        Args:
+            u: source of the edge.
+            v: target of the edge.
+        """
+        super().remove_edge(u, v)
+        self._layer_edges = None
+        if self._node_layers is not None:
+            self._refresh_node_layers([u, v])
+
+    def remove_edges_from(self, ebunch):
+        """Remove some edges and update layers of their terminals.
+
+        Args:
+            ebunch: container of edges, see ``networkx``.
+        """
+        ebunch = list(ebunch)
+        super().remove_edges_from(ebunch)
+        self._layer_edges = None
+        if self._node_layers is not None:
+            self._refresh_node_layers({n for e in ebunch for n in e[:2]})
+
+    def remove_node(self, n):
+        """Remove a node and update layers of its neighbours.
+
+        Args:
+            n: name of the node.
+        """
+        neighbours = set(self._succ.get(n, {})) | set(self._pred.get(n, {}))
+        super().remove_node(n)
+        self._layer_edges = None
+        if self._node_layers is not None:
+            self._refresh_node_layers(neighbours | {n})
+
+    def remove_nodes_from(self, nodes):
+        """Remove some nodes and update layers of their neighbours.
+
+        Args:
+            nodes: container of nodes.
+        """
+        nodes = [n for n in nodes if n in self]
+        neighbours = {
+            nbr
+            for n in nodes
+            for nbr in chain(self._succ[n], self._pred[n])
+        }
+        super().remove_nodes_from(nodes)
+        self._layer_edges = None
+        if self._node_layers is not None:
+            self._refresh_node_layers(neighbours | set(nodes))
+
+    @staticmethod
+    def _records2frame(
+        records: Union[DataFrame, Iterable[tuple]], columns: List[str]
+    ) -> DataFrame:
+        """Gather records for a batch of nodes or elements in a dataframe.
+
+        Args:
+            records: a dataframe indexed by names, or an iterable of
+                tuples starting with names followed by ``columns``.
+                Trailing values in tuples can be omitted.
+            columns: names of columns following names.
+
+        Returns:
+            A dataframe indexed by names, with all the given columns.
+        """
+        if isinstance(records, DataFrame):
+            res = records.copy()
+        else:
+            records = [tuple(record) for record in records]
+            width = max((len(record) for record in records), default=1)
+            res = pd.DataFrame.from_records(
+                records, columns=["name"] + columns[: width - 1]
+            ).set_index("name")
+        for col in columns:
+            if col not in res:
+                res[col] = np.nan
+        res.index.name = "name"
+        return res
+
+    def _add_layers(self, layers: Iterable[int]):
+        """Add new layers resulted from new inter-nodes.
+
+        Args:
+            layers: integer indices of layers, which might exist.
+        """
+        layers_new = sorted(set(layers) - self.layers)
+        if layers_new:
+            self.layers.update(layers_new)
+            LOGGER.info(f"New layers {layers_new} resulted from inter-nodes.")
 
-            upper = min(layers)
-            lower = max(layers)
+            df_new = pd.DataFrame(
+                {"name": ["layer" + str(idx) for idx in layers_new]},
+                index=pd.Index(layers_new, name="idx"),
+            )
+            self.df_layers = pd.concat([self.df_layers, df_new]).sort_index()
 
-        return (upper, lower)
+    def _add_inter_nodes(self, uppers: DataFrame) -> DataFrame:
+        """Specify a batch of planar nodes as inter-nodes.
+
+        Args:
+            uppers: a dataframe indexed by names of inter-nodes, with a
+                boolean column ``upper`` indicating whether the other
+                terminal of the corresponding inter-edge is on upper
+                layer. Missing values are seen as true.
+
+        Returns:
+            Upper and lower layers of new inter-nodes.
+        """
+        names = uppers.index
+        is_node = np.array([name in self._node for name in names], dtype=bool)
+        is_inter = names.isin(self.inter_nodes.index)
+        for name in names[~is_node]:
+            LOGGER.error(f"Node {name} does not exist.")
+        for name in names[is_node & is_inter]:
+            LOGGER.error(f"Inter-node {name} already exist.")
+
+        uppers = uppers[is_node & ~is_inter]
+        layers = np.array(
+            [self.find_layer(name)[0] for name in uppers.index], dtype=int
+        )
+        upper = uppers["upper"].fillna(True).astype(bool).to_numpy()
+        res = pd.DataFrame(
+            {"upper": np.where(upper, layers - 1, layers)}, index=uppers.index
+        )
+        res["lower"] = res["upper"] + 1
+
+        self._add_layers(chain(res["upper"], res["lower"]))
+        self.inter_nodes = pd.concat([self.inter_nodes, res])
+        self._node_layers.update(
+            zip(res.index, zip(res["upper"], res["lower"]))
+        )
+        LOGGER.debug(f"{len(res)} new inter-node(s) have been specified.")
+        return res
 
     def add_inter_node(self, name: str, upper: Optional[bool] = True):
         """Specify a planar node as inter-node with an adjacent layer.
@@ -264,42 +656,26 @@ class GeoGraph(nx.DiGraph):
             upper: whether the other terminal of the corresponding
                 inter-edge is on upper layer.
         """
-        if name not in self.nodes:
-            LOGGER.error(f"Node {name} does not exist.")
-        elif name in self.inter_nodes.index:
-            LOGGER.error(f"Inter-node {name} already exist.")
-        else:
-            layer = self.find_layer(name)[0]
-            if upper:
-                upper = layer - 1
-                lower = layer
-
-                if upper not in self.layers:
-                    self.layers.add(upper)
-                    LOGGER.info(
-                        f"New top layer {upper} resulted from node {name}."
-                    )
+        self.add_inter_nodes([(name, upper)])
 
-                    layer_new = pd.DataFrame({"name": ["layer" + str(upper)]})
-                    layer_new.index.name = "idx"
-                    self.df_layers = layer_new.append(self.df_layers)
-            else:
-                upper = layer
-                lower = layer + 1
+    def add_inter_nodes(
+        self, inter_nodes: Union[DataFrame, Iterable[Tuple[str, bool]]]
+    ):
+        """Specify a batch of planar nodes as inter-nodes.
 
-                if lower not in self.layers:
-                    self.layers.add(lower)
-                    LOGGER.info(
-                        f"New bottom layer {lower} resulted from {name}."
-                    )
+        Note:
+            Layers of all the nodes are resolved at once, and they are
+            attached to ``inter_nodes`` with one concatenation.
 
-                    layer_new = pd.DataFrame({"name": ["layer" + str(lower)]})
-                    self.df_layers = self.df_layers.append(layer_new)
+        Args:
+            inter_nodes: a dataframe indexed by names of inter-nodes, or
+                an iterable of ``(name, upper)`` tuples.
 
-            df_new = pd.DataFrame(
-                {"upper": upper, "lower": lower}, index=[name]
-            )
-            self.inter_nodes = self.inter_nodes.append(df_new)
-            LOGGER.debug(
-                f"New inter-node {name} for layer {upper} and {lower}."
-            )
+                .. csv-table::
+                    :header: name, dtype, definition
+
+                    name (index), object, name of the inter-node
+                    upper (optional), bool, whether the other terminal
+                    is on upper layer. Default to be true.
+        """
+        self._add_inter_nodes(self._records2frame(inter_nodes, ["upper"]))
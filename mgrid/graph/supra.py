@@ -1,10 +1,12 @@
 """Class for multilayer network in supra-graph format."""
-from typing import Optional
+from typing import Optional, Union
 
 import networkx as nx
 import pandas as pd
 from pandas.core.frame import DataFrame
 
+from mgrid.graph.compact import EdgeArrays, install
+
 
 class SupraGraph(nx.DiGraph):
     """Multilayer network as a supra graph.
@@ -47,9 +49,17 @@ class SupraGraph(nx.DiGraph):
                 lower, int64, integer index of lower layer
                 source, object, source node in supra graph
                 target, object, target node in supra graph
+
+        bus_index (DataFrame): buses of terminals of inter-edges, keyed
+            by original nodes and layers. See
+            :attr:`SupraGraph.nodes_new`. It is filled when the supra
+            graph is converted, and None otherwise.
     """
 
-    def __init__(self, dg: Optional[nx.DiGraph] = None):
+    #: compact storage of edges, if any.
+    _arrays: Optional[EdgeArrays] = None
+
+    def __init__(self, dg: Optional[Union[nx.DiGraph, EdgeArrays]] = None):
         """Init an empty directed graph or existing directed graph.
 
         Note:
@@ -58,9 +68,13 @@ class SupraGraph(nx.DiGraph):
             why.
 
         Args:
-            dg: an existing directed graph. Default to be None.
+            dg: an existing directed graph, or edges in arrays. Default
+                to be None.
         """
-        if not dg:
+        if isinstance(dg, EdgeArrays):
+            super().__init__()
+            install(self, dg)
+        elif not dg:
             super().__init__()
         else:
             super().__init__(dg)
@@ -69,11 +83,18 @@ class SupraGraph(nx.DiGraph):
 
         self.intra_edges = None
         self.inter_edges = None
+        self.bus_index = None
 
     @property
     def nodes_new(self) -> DataFrame:
         """Gather information on terminals of inter-edges.
 
+        Note:
+            Nodes are scanned only if :attr:`SupraGraph.bus_index` is
+            missing, and the result is not kept, so it follows later
+            modification of the graph. Otherwise, the index is shared,
+            so it must not be modified.
+
         Returns:
             Correspondance between original nodes, layers and buses for
             terminals of inter-edges.
@@ -85,6 +106,9 @@ class SupraGraph(nx.DiGraph):
                 layer (index), int64, to which layer the node belongs
                 bus, object, node name in supra graph
         """
+        if self.bus_index is not None:
+            return self.bus_index
+
         data = {}
         for node in self.nodes.data():
             if "origin" in node[1]:
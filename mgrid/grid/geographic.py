@@ -1,14 +1,17 @@
 """Class for grid in planar graph format."""
-from typing import Optional, Union
+from typing import Dict, Iterable, Optional, Tuple, Union
 
 import networkx as nx
 import numpy as np
 import pandas as pd
+from pandas.core.frame import DataFrame
 
+from mgrid.graph.compact import EdgeArrays
 from mgrid.graph.geographic import GeoGraph
 from mgrid.log import LOGGER
 from mgrid.power_flow.conversion import Ejection
 from mgrid.power_flow.delivery import Transformer, TransformerStd
+from mgrid.power_flow.table import compact_edges, ElementTable, tabulate
 
 
 class GeoGrid(GeoGraph):
@@ -63,7 +66,7 @@ class GeoGrid(GeoGraph):
                 voltage, float64, voltage levels
     """
 
-    def __init__(self, dg: Optional[nx.DiGraph] = None):
+    def __init__(self, dg: Optional[Union[nx.DiGraph, EdgeArrays]] = None):
         """Init an empty directed graph or from existing directed graph.
 
         Note:
@@ -77,7 +80,8 @@ class GeoGrid(GeoGraph):
               corresponding inter-node cannot be detected.
 
         Args:
-            dg: an existing directed graph. Default to be None.
+            dg: an existing directed graph, or edges in arrays. Default
+                to be None.
         """
         if not dg:
             super().__init__()
@@ -119,17 +123,51 @@ class GeoGrid(GeoGraph):
             upper: whether the other terminal of the corresponding
                 inter-edge is on upper layer.
         """
-        if name not in self.inter_nodes.index:
-            super().add_inter_node(name, upper)
+        self.add_inter_nodes([(name, element, upper)])
 
-        self.inter_nodes.loc[name, "element"] = element
+    def add_inter_nodes(
+        self,
+        inter_nodes: Union[
+            DataFrame, Iterable[Tuple[str, Union[Transformer, TransformerStd]]]
+        ],
+    ):
+        """Specify transformer models for a batch of inter-nodes.
+
+        Note:
+            Nodes not yet recognised as inter-nodes are specified at
+            once, and all the models are attached in one assignment.
+
+        Args:
+            inter_nodes: a dataframe indexed by names of inter-nodes, or
+                an iterable of ``(name, element, upper)`` tuples, where
+                ``upper`` can be omitted.
+
+                .. csv-table::
+                    :header: name, dtype, definition
+
+                    name (index), object, name of the inter-node
+                    element, object, transformer model
+                    upper (optional), bool, whether the other terminal
+                    is on upper layer. Default to be true.
+        """
+        df = self._records2frame(inter_nodes, ["element", "upper"])
+
+        is_new = ~df.index.isin(self.inter_nodes.index)
+        if is_new.any():
+            self._add_inter_nodes(df.loc[is_new, ["upper"]])
+
+        names = df.index[df.index.isin(self.inter_nodes.index)]
+        self.inter_nodes["element"] = self.inter_nodes["element"].astype(
+            object
+        )
+        self.inter_nodes.loc[names, "element"] = df.loc[names, "element"]
 
     def add_conversion(
         self,
         name: str,
         node: str,
         element: Ejection,
-        layer: Optional[str] = None,
+        layer: Optional[int] = None,
     ):
         """Add a conversion element to the grid.
 
@@ -147,25 +185,75 @@ class GeoGrid(GeoGraph):
                 ``node`` is an inter-node and it is not specified, a
                 warning will be echoed.
         """
-        if node in self.nodes:
-            upper, lower = self.find_layer(node)
-
-            if not layer and upper == lower:
-                layer = upper
-            elif not layer and upper < lower:
-                LOGGER.warning(
-                    f'Layer of conversion element "{name}" is not specified.'
-                )
-
-            _new = pd.DataFrame(
-                {"node": node, "element": element, "layer": layer},
-                index=[name],
-            )
-            _new.index.name = "name"
-            self.conversions = self.conversions.append(_new)
-            LOGGER.debug(
-                f'New conversion element "{element}" called "{name}" is '
-                f'attached to node "{node}."'
+        self.add_conversions([(name, node, element, layer)])
+
+    def add_conversions(
+        self,
+        conversions: Union[DataFrame, Iterable[Tuple[str, str, Ejection]]],
+    ):
+        """Add a batch of conversion elements to the grid.
+
+        Note:
+            Layers of all the nodes are resolved at once, and elements
+            are attached to ``conversions`` with one concatenation.
+
+        Args:
+            conversions: a dataframe indexed by names of conversion
+                elements, or an iterable of ``(name, node, element,
+                layer)`` tuples, where ``layer`` can be omitted.
+
+                .. csv-table::
+                    :header: name, dtype, definition
+
+                    name (index), object, name of the conversion element
+                    node, object, node to which the element is attached
+                    element, object, element model
+                    layer (optional), int64, layer of the element. See
+                    :meth:`GeoGrid.add_conversion`.
+        """
+        df = self._records2frame(conversions, ["node", "element", "layer"])
+
+        is_node = np.array([node in self._node for node in df["node"]])
+        for node in df.loc[~is_node, "node"]:
+            LOGGER.error(f'There is no node called "{node}".')
+        df = df[is_node]
+
+        layers = [self.find_layer(node) for node in df["node"]]
+        upper = np.array([layer[0] for layer in layers])
+        lower = np.array([layer[1] for layer in layers])
+        is_missing = df["layer"].isna().to_numpy()
+
+        is_intra = is_missing & (upper == lower)
+        df["layer"] = df["layer"].astype(object)
+        df.loc[is_intra, "layer"] = upper[is_intra]
+        for name in df.index[is_missing & (upper < lower)]:
+            LOGGER.warning(
+                f'Layer of conversion element "{name}" is not specified.'
             )
+
+        self.conversions = pd.concat(
+            [self.conversions, df[["node", "element", "layer"]]]
+        )
+        LOGGER.debug(f"{len(df)} new conversion element(s) are attached.")
+
+    def compact_elements(self) -> Dict[str, Dict[type, ElementTable]]:
+        """Store all the elements in columnar tables.
+
+        Elements on edges, of inter-nodes and of conversions are stored
+        in tables, one for each data-class, and replaced by views. See
+        :mod:`mgrid.power_flow.table` for details. Elements on edges in
+        compact storage are in tables already.
+
+        Returns:
+            Tables keyed by data-classes, for ``"edges"``,
+            ``"inter_nodes"`` and ``"conversions"`` respectively.
+        """
+        if self._arrays is None:
+            res = {"edges": compact_edges(self)}
         else:
-            LOGGER.error(f'There is no node called "{node}".')
+            res = {"edges": {t.cls: t for t in self._arrays.tables}}
+        for key in ["inter_nodes", "conversions"]:
+            df = getattr(self, key)
+            views, res[key] = tabulate(df["element"].tolist())
+            df["element"] = pd.Series(views, index=df.index, dtype=object)
+        return res
@@ -11,10 +11,11 @@ Usually, in the literature, three types of buses, PQ, PV, and slack, are
 considered, but it is not necessary. Those features are resulted from
 attached conversion elements. There is only one type of node here.
 """
-from typing import Optional
+from typing import Optional, Union
 
 import networkx as nx
 
+from mgrid.graph.compact import EdgeArrays
 from mgrid.graph.supra import SupraGraph
 
 
@@ -45,7 +46,7 @@ class SupraGrid(SupraGraph):
                 original, object, original node name
     """
 
-    def __init__(self, dg: Optional[nx.DiGraph] = None):
+    def __init__(self, dg: Optional[Union[nx.DiGraph, EdgeArrays]] = None):
         """Init an empty directed graph or existing directed graph.
 
         Note:
@@ -54,7 +55,8 @@ class SupraGrid(SupraGraph):
             why.
 
         Args:
-            dg: an existing directed graph. Default to be None.
+            dg: an existing directed graph, or edges in arrays. Default
+                to be None.
         """
         if not dg:
             super().__init__()
@@ -15,10 +15,14 @@ to an inter-node, which spans two layers. See
 :mod:`mgrid.grid.planar` for more details.
 """
 from dataclasses import dataclass
+from typing import List
 
+import numpy as np
 import pandapower as pp
 from pandapower.auxiliary import pandapowerNet
 
+from mgrid.power_flow.table import ElementTable
+
 
 @dataclass
 class Ejection:
@@ -51,7 +55,8 @@ class Ejection:
 
         Note:
             When the value of ``p_mw`` is negative, a generator without
-            voltage control ability is added.
+            voltage control ability is added, which generates
+            ``-p_mw``.
 
         Args:
             net: a pandapower network model.
@@ -75,10 +80,67 @@ class Ejection:
                 net,
                 name=name,
                 bus=bus_idx,
-                p_mw=self.p_mw,
+                p_mw=-self.p_mw,
                 q_mvar=self.q_mvar,
             )
 
+    @classmethod
+    def update_pandapower_bulk(
+        cls,
+        net: pandapowerNet,
+        elements: List["Ejection"],
+        names: List[str],
+        buses: np.ndarray,
+    ):
+        """Update a pandapower model by adding some ejections at once.
+
+        Args:
+            net: a pandapower network model.
+            elements: ejections to be added.
+            names: names of the ejections.
+            buses: indices of buses to which ejections are attached.
+        """
+        columns = ElementTable.gather(elements).columns
+        names = np.asarray(names, dtype=object)
+        p_mw = columns["p_mw"]
+        q_mvar = ((p_mw / columns["power_factor"]) ** 2 - p_mw ** 2) ** 0.5
+
+        is_load = p_mw > 0
+        if is_load.any():
+            pp.create_loads(
+                net,
+                name=names[is_load],
+                buses=buses[is_load],
+                p_mw=p_mw[is_load],
+                q_mvar=q_mvar[is_load],
+                const_i_percent=0,
+                const_z_percent=0,
+                in_service=True,
+            )
+
+        is_sgen = p_mw < 0
+        if is_sgen.any():
+            pp.create_sgens(
+                net,
+                name=names[is_sgen],
+                buses=buses[is_sgen],
+                p_mw=-p_mw[is_sgen],
+                q_mvar=q_mvar[is_sgen],
+            )
+
+
+@dataclass
+class EjectionPhase(Ejection):
+    """Essential parameters for single- or two-phase ejections.
+
+    Note:
+        - The ejected power is evenly distributed among phases, which
+          are named by "a", "b" and "c".
+        - It is exported to ``pandapower`` as a balanced ejection.
+    """
+
+    phases: List[str]  #: phase(s) to which the ejection is attached
+
 
 @dataclass
 class Capacitor:
@@ -114,6 +176,36 @@ class Capacitor:
             loss_factor=self.loss_factor,
         )
 
+    @classmethod
+    def update_pandapower_bulk(
+        cls,
+        net: pandapowerNet,
+        elements: List["Capacitor"],
+        names: List[str],
+        buses: np.ndarray,
+    ):
+        """Update a pandapower model by adding some capacitors.
+
+        Note:
+            Capacitors are created one by one, because there is no
+            function in ``pandapower`` to create shunts in bulk, but
+            indices of buses are not searched again.
+
+        Args:
+            net: a pandapower network model.
+            elements: capacitors to be added.
+            names: names of the capacitors.
+            buses: indices of buses to which capacitors are attached.
+        """
+        for element, name, bus in zip(elements, names, buses):
+            pp.create_shunt_as_capacitor(
+                net,
+                name=name,
+                bus=bus,
+                q_mvar=element.q_mvar,
+                loss_factor=element.loss_factor,
+            )
+
 
 @dataclass
 class Slack:
@@ -145,6 +237,25 @@ class Slack:
         bus_idx = pp.get_element_index(net, "bus", bus)
         pp.create_ext_grid(net, name=name, bus=bus_idx)
 
+    @classmethod
+    def update_pandapower_bulk(
+        cls,
+        net: pandapowerNet,
+        elements: List["Slack"],
+        names: List[str],
+        buses: np.ndarray,
+    ):
+        """Update a pandapower model by adding some external grids.
+
+        Args:
+            net: a pandapower network model.
+            elements: slack specifications to be added.
+            names: names of the external grids.
+            buses: indices of buses to which external grids are attached.
+        """
+        for name, bus in zip(names, buses):
+            pp.create_ext_grid(net, name=name, bus=bus)
+
 
 @dataclass
 class SlackMulti:
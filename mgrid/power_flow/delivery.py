@@ -19,6 +19,8 @@ import numpy as np
 import pandapower as pp
 from pandapower.auxiliary import pandapowerNet
 
+from mgrid.power_flow.table import ElementTable
+
 
 @dataclass
 class CableEssential:
@@ -83,6 +85,36 @@ class Cable(CableEssential):
             parallel=self.parallel,
         )
 
+    @classmethod
+    def update_pandapower_bulk(
+        cls,
+        net: pandapowerNet,
+        elements: List["Cable"],
+        from_buses: np.ndarray,
+        to_buses: np.ndarray,
+    ):
+        """Update a pandapower model by adding some cables at once.
+
+        Args:
+            net: a pandapower network model.
+            elements: cables to be added.
+            from_buses: indices of buses corresponding to ``source``.
+            to_buses: indices of buses corresponding to ``target``.
+        """
+        columns = ElementTable.gather(elements).columns
+        pp.create_lines_from_parameters(
+            net,
+            name=columns["name"],
+            from_buses=from_buses,
+            to_buses=to_buses,
+            length_km=columns["length_km"],
+            r_ohm_per_km=columns["r_ohm"],
+            x_ohm_per_km=columns["x_ohm"],
+            c_nf_per_km=columns["c_nf"],
+            max_i_ka=columns["max_i_ka"],
+            parallel=columns["parallel"],
+        )
+
 
 @dataclass
 class CableStd(CableEssential):
@@ -122,6 +154,63 @@ class TransformerStd:
             parallel=self.parallel,
         )
 
+    @classmethod
+    def update_pandapower_bulk(
+        cls,
+        net: pandapowerNet,
+        elements: List["TransformerStd"],
+        from_buses: np.ndarray,
+        to_buses: np.ndarray,
+    ):
+        """Update a pandapower model by adding some transformers at once.
+
+        Note:
+            Parameters are copied from standard types like
+            ``pp.create_transformer`` does, because there is no function
+            in ``pandapower`` to create transformers from standard types
+            in bulk.
+
+        Args:
+            net: a pandapower network model.
+            elements: transformers to be added.
+            from_buses: indices of high voltage buses.
+            to_buses: indices of low voltage buses.
+        """
+        columns = ElementTable.gather(elements).columns
+        std_types = {
+            std_type: pp.load_std_type(net, std_type, "trafo")
+            for std_type in set(columns["std_type"])
+        }
+        types = [std_types[std_type] for std_type in columns["std_type"]]
+
+        def gather(param: str, default=np.nan) -> list:
+            return [std_type.get(param, default) for std_type in types]
+
+        index = pp.create_transformers_from_parameters(
+            net,
+            name=columns["name"],
+            hv_buses=from_buses,
+            lv_buses=to_buses,
+            sn_mva=gather("sn_mva"),
+            vn_hv_kv=gather("vn_hv_kv"),
+            vn_lv_kv=gather("vn_lv_kv"),
+            vk_percent=gather("vk_percent"),
+            vkr_percent=gather("vkr_percent"),
+            pfe_kw=gather("pfe_kw"),
+            i0_percent=gather("i0_percent"),
+            shift_degree=gather("shift_degree", 0),
+            tap_side=gather("tap_side", None),
+            tap_neutral=gather("tap_neutral"),
+            tap_max=gather("tap_max"),
+            tap_min=gather("tap_min"),
+            tap_step_percent=gather("tap_step_percent"),
+            tap_step_degree=gather("tap_step_degree"),
+            tap_pos=gather("tap_neutral"),
+            tap_phase_shifter=gather("tap_phase_shifter", False),
+            parallel=columns["parallel"],
+        )
+        net.trafo.loc[index, "std_type"] = columns["std_type"]
+
 
 @dataclass
 class Transformer:
@@ -1 +1,775 @@
-"""Direct impedance method for power flow of unbalanced RDF."""
+"""Direct impedance method for power flow of unbalanced RDF.
+
+Radial distribution feeders (RDF) can be solved without building and
+factorising any Jacobian matrix. Following [teng2003direct]_, two
+matrices are built from the topology only:
+
+- **BIBC** (bus-injection to branch-current): a branch current is the
+  sum of currents injected at all the buses downstream of the branch.
+- **BCBV** (branch-current to bus-voltage): the voltage drop from the
+  slack bus to a bus is the sum of voltage drops over branches on the
+  path between them.
+
+Then, in every iteration of a backward/forward sweep, bus currents
+follow from voltages and power demands, branch currents from bus
+currents (backward), and voltages from branch currents (forward). Both
+matrices are sparse, and they are built once for a topology, so
+different loads can be solved again and again.
+
+:class:`RadialPowerFlow` solves balanced grids phase "a" only, while
+:class:`RadialPowerFlowPhase` solves all the three phases, so that
+single-phase ejections and cables can be studied.
+
+All the quantities are in per unit, with a base of :data:`BASE_MVA` for
+the whole grid and the nominal voltage of each bus. Any transformer is
+assumed to have the nominal voltages of its buses.
+
+Warning:
+    Capacitance of cables, and magnetising losses of transformers are
+    ignored.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from pandas.core.frame import DataFrame
+from scipy import sparse
+from scipy.sparse import csgraph
+
+from mgrid.grid import SupraGrid
+from mgrid.log import LOGGER
+from mgrid.power_flow.conversion import (
+    Capacitor,
+    Ejection,
+    EjectionPhase,
+    Slack,
+)
+from mgrid.power_flow.delivery import Cable, CablePhase, TransformerStd
+from mgrid.power_flow.table import ElementTable
+
+BASE_MVA = 1.0  #: base of power in mega-voltampere
+
+
+def _cable_impedance(
+    elements: list, vn_kv: np.ndarray, base_mva: float
+) -> np.ndarray:
+    """Calculate series impedances of cables in per unit.
+
+    Args:
+        elements: cables modelled by :class:`Cable`.
+        vn_kv: nominal voltages of cables.
+        base_mva: base of power.
+
+    Returns:
+        Complex series impedances.
+    """
+    col = ElementTable.gather(elements).columns
+    z_ohm = (col["r_ohm"] + 1j * col["x_ohm"]) * col["length_km"]
+    return z_ohm / col["parallel"] / (vn_kv ** 2 / base_mva)
+
+
+def _transformer_impedance(
+    elements: list, types: dict, base_mva: float
+) -> np.ndarray:
+    """Calculate series impedances of transformers in per unit.
+
+    Args:
+        elements: transformers modelled by :class:`TransformerStd`.
+        types: standard types of transformers, keyed by names.
+        base_mva: base of power.
+
+    Returns:
+        Complex series impedances.
+    """
+    col = ElementTable.gather(elements).columns
+    params = np.array(
+        [
+            [types[t].s_mva, types[t].vk_percent, types[t].vkr_percent]
+            for t in col["std_type"]
+        ]
+    )
+    s_mva, vk_percent, vkr_percent = params.T
+    z = vk_percent / 100 * base_mva / s_mva
+    r = vkr_percent / 100 * base_mva / s_mva
+    return (r + 1j * np.sqrt(z ** 2 - r ** 2)) / col["parallel"]
+
+
+def _series_impedance(
+    elements: pd.Series, vn_kv: np.ndarray, types: dict, base_mva: float
+) -> np.ndarray:
+    """Calculate series impedances of balanced branches class by class.
+
+    Args:
+        elements: delivery elements of branches.
+        vn_kv: nominal voltages of downstream buses of branches.
+        types: standard types of transformers, keyed by names.
+        base_mva: base of power.
+
+    Raises:
+        ValueError: if some delivery element is not supported.
+
+    Returns:
+        Complex series impedances in per unit.
+    """
+    classes = elements.map(type)
+    is_cable = classes.map(lambda cls: issubclass(cls, Cable)).to_numpy()
+    is_trans = classes.map(lambda cls: issubclass(cls, TransformerStd))
+    is_trans = is_trans.to_numpy()
+    if not (is_cable | is_trans).all():
+        LOGGER.critical("Only cables and transformers are supported.")
+        raise ValueError("Unsupported delivery elements.")
+
+    res = np.full(len(elements), np.nan, dtype=complex)
+    if is_cable.any():
+        res[is_cable] = _cable_impedance(
+            list(elements[is_cable]), vn_kv[is_cable], base_mva
+        )
+    if is_trans.any():
+        res[is_trans] = _transformer_impedance(
+            list(elements[is_trans]), types, base_mva
+        )
+    return res
+
+
+class RadialPowerFlow:
+    """Backward/forward sweep for radial grids based on BIBC and BCBV.
+
+    Note:
+        - Every connected component must be radial and have exactly one
+          slack bus, specified by a :class:`Slack` conversion element.
+        - :class:`Ejection` elements are constant power demands, where
+          negative real power means generation. :class:`Capacitor`
+          elements are constant impedances.
+
+    Attributes:
+        buses (Index): names of buses, in the order of all the arrays
+            for buses.
+        vn_kv (np.ndarray): nominal voltages of buses in kilo-volt.
+        slack (np.ndarray): positions of slack buses.
+        vm_slack (np.ndarray): voltage magnitudes of slack buses in per
+            unit.
+        parent (np.ndarray): position of the upstream bus of each bus,
+            which is -1 for slack buses.
+        root (np.ndarray): position of the slack bus upstream of each
+            bus.
+        branches (DataFrame): branches ordered like columns of BIBC,
+            with the delivery element for each.
+
+            .. csv-table::
+                :header: name, dtype, definition
+
+                source, object, source bus of the edge
+                target, object, target bus of the edge
+                bus, int64, position of the downstream bus
+                element, object, delivery element of the edge
+                z_pu, complex128, series impedance in per unit
+
+        bibc (csr_matrix): branch-by-bus matrix, from bus currents to
+            branch currents.
+        bcbv (csr_matrix): bus-by-branch matrix, from branch currents
+            to voltage drops from slack buses.
+        ejections (DataFrame): ejections ordered like arrays for them.
+
+            .. csv-table::
+                :header: name, dtype, definition
+
+                name (index), object, name of the element
+                bus, int64, position of the bus
+                p_mw, float64, real power demand
+                tan_phi, float64, ratio of reactive to real power
+                q_mvar, float64, reactive power demand
+
+        y_shunt (np.ndarray): shunt admittances at buses in per unit.
+        iterations (int): iterations in the last calculation.
+        converged (bool): whether the last calculation has converged.
+    """
+
+    def __init__(self, supra: SupraGrid, base_mva: float = BASE_MVA):
+        """Build the topology and matrices for a radial grid.
+
+        Args:
+            supra: a radial supra-grid.
+            base_mva: base of power in mega-voltampere.
+
+        Raises:
+            ValueError: if some element is not supported, or some
+                connected component is not radial with one slack bus.
+        """
+        self.base_mva = base_mva
+        self.buses = supra.buses.index
+        self.vn_kv = supra.buses["voltage"].to_numpy(dtype=float)
+        num_buses = len(self.buses)
+        pos = pd.Series(np.arange(num_buses), index=self.buses)
+
+        # Sort conversion elements.
+        conversions = supra.conversions
+        classes = conversions["element"].map(type)
+        is_slack = classes.map(lambda cls: issubclass(cls, Slack))
+        is_ejection = classes.map(lambda cls: issubclass(cls, Ejection))
+        is_capacitor = classes.map(lambda cls: issubclass(cls, Capacitor))
+        unsupported = conversions.index[
+            ~(is_slack | is_ejection | is_capacitor)
+        ]
+        if len(unsupported) > 0:
+            LOGGER.critical(
+                f"Conversion elements {list(unsupported)} not supported."
+            )
+            raise ValueError("Unsupported conversion elements.")
+
+        slacks = conversions[is_slack]
+        self.slack = pos[slacks["bus"]].to_numpy()
+        self.vm_slack = np.array(
+            [element.vm_pu for element in slacks["element"]], dtype=float
+        )
+
+        ejections = conversions[is_ejection]
+        self.ejections = pd.DataFrame(
+            {"bus": pos[ejections["bus"]].to_numpy()}, index=ejections.index
+        )
+        if len(ejections) > 0:
+            col = ElementTable.gather(list(ejections["element"])).columns
+            self.ejections["p_mw"] = col["p_mw"]
+            self.ejections["tan_phi"] = np.sqrt(
+                1 / col["power_factor"] ** 2 - 1
+            )
+        else:
+            self.ejections["p_mw"] = np.array([], dtype=float)
+            self.ejections["tan_phi"] = np.array([], dtype=float)
+        self.ejections["q_mvar"] = (
+            self.ejections["p_mw"] * self.ejections["tan_phi"]
+        )
+
+        capacitors = conversions[is_capacitor]
+        y_shunt = np.zeros(num_buses, dtype=complex)
+        for bus, element in zip(capacitors["bus"], capacitors["element"]):
+            q_mvar = abs(element.q_mvar)
+            y_shunt[pos[bus]] += (
+                element.loss_factor * q_mvar + 1j * q_mvar
+            ) / base_mva
+        self.y_shunt = y_shunt
+
+        self._init_topology(supra, pos)
+        self._init_impedance(supra)
+        self.iterations = 0
+        self.converged = False
+
+    def _init_topology(self, supra: SupraGrid, pos: pd.Series):
+        """Find upstream buses and build the BIBC matrix.
+
+        Args:
+            supra: a radial supra-grid.
+            pos: positions of buses keyed by names.
+
+        Raises:
+            ValueError: if some component is not radial with one slack
+                bus.
+        """
+        num_buses = len(pos)
+        edges = pd.DataFrame(
+            list(supra.edges(data="element")),
+            columns=["source", "target", "element"],
+        )
+        edges["from"] = pos[edges["source"]].to_numpy()
+        edges["to"] = pos[edges["target"]].to_numpy()
+
+        # Find upstream buses by searching from a virtual root connected to
+        # all the slack buses.
+        num_slack = len(self.slack)
+        root = num_buses
+        adjacency = sparse.coo_matrix(
+            (
+                np.ones(len(edges) + num_slack),
+                (
+                    np.concatenate([edges["from"], np.full(num_slack, root)]),
+                    np.concatenate([edges["to"], self.slack]),
+                ),
+            ),
+            shape=(num_buses + 1, num_buses + 1),
+        ).tocsr()
+        order, predecessors = csgraph.breadth_first_order(
+            adjacency, root, directed=False, return_predecessors=True
+        )
+        if len(order) != num_buses + 1 or len(edges) != num_buses - num_slack:
+            LOGGER.critical(
+                "Every component should be radial with one slack bus, but "
+                f"there are {num_buses} buses, {len(edges)} edges, "
+                f"{num_slack} slack buses, and {num_buses + 1 - len(order)} "
+                "buses without slack."
+            )
+            raise ValueError("The grid is not radial.")
+        parent = predecessors[:num_buses]
+        parent[self.slack] = -1
+        self.parent = parent
+
+        # Sort branches by downstream buses in the order of search.
+        downstream = order[1:][parent[order[1:]] >= 0]
+        edges["bus"] = np.where(
+            parent[edges["to"]] == edges["from"], edges["to"], edges["from"]
+        )
+        edges = edges.set_index("bus", drop=False).loc[downstream]
+        self.branches = edges[["source", "target", "bus", "element"]]
+        self.branches = self.branches.reset_index(drop=True)
+
+        # Build BIBC by walking from each bus up to its slack bus.
+        branch_of_bus = np.full(num_buses, -1)
+        branch_of_bus[downstream] = np.arange(len(downstream))
+        rows = []
+        cols = []
+        buses = np.arange(num_buses)
+        current = buses.copy()
+        active = branch_of_bus[current] >= 0
+        while active.any():
+            rows.append(branch_of_bus[current[active]])
+            cols.append(buses[active])
+            current[active] = parent[current[active]]
+            active &= branch_of_bus[current] >= 0
+        self.root = current
+        rows = np.concatenate(rows) if rows else np.array([], dtype=int)
+        cols = np.concatenate(cols) if cols else np.array([], dtype=int)
+        self.bibc = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(len(downstream), num_buses),
+        )
+
+    def _init_impedance(self, supra: SupraGrid):
+        """Calculate series impedances of branches and build BCBV matrix.
+
+        Args:
+            supra: a radial supra-grid.
+        """
+        z_pu = _series_impedance(
+            self.branches["element"],
+            self.vn_kv[self.branches["bus"]],
+            supra.types,
+            self.base_mva,
+        )
+        self.branches["z_pu"] = z_pu
+        self.bcbv = (self.bibc.T @ sparse.diags(z_pu)).tocsr()
+
+    def _drop(self, i_bus: np.ndarray) -> np.ndarray:
+        """Calculate voltage drops from slack buses by bus currents.
+
+        Args:
+            i_bus: complex currents injected to buses in per unit.
+
+        Returns:
+            Complex voltage drops of buses in per unit.
+        """
+        return self.bcbv @ (self.bibc @ i_bus)
+
+    def v_slack(self) -> np.ndarray:
+        """Get voltages of slack buses upstream of all the buses.
+
+        Returns:
+            Complex voltages in per unit, which are the initial guess.
+        """
+        vm = np.ones(len(self.buses))
+        vm[self.slack] = self.vm_slack
+        return vm[self.root].astype(complex)
+
+    def demand(
+        self,
+        p_mw: Optional[np.ndarray] = None,
+        q_mvar: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Aggregate power demands of ejections at buses.
+
+        Args:
+            p_mw: real power demands of ejections, in the order of
+                ``ejections``. Default to be those of elements.
+            q_mvar: reactive power demands of ejections. Default to be
+                those of elements.
+
+        Returns:
+            Complex power demands at buses in per unit.
+        """
+        if p_mw is None:
+            p_mw = self.ejections["p_mw"].to_numpy()
+        if q_mvar is None:
+            q_mvar = self.ejections["q_mvar"].to_numpy()
+        num_buses = len(self.buses)
+        bus = self.ejections["bus"].to_numpy()
+        p = np.bincount(bus, weights=p_mw, minlength=num_buses)
+        q = np.bincount(bus, weights=q_mvar, minlength=num_buses)
+        return (p + 1j * q) / self.base_mva
+
+    def solve(
+        self,
+        s_pu: Optional[np.ndarray] = None,
+        v_init: Optional[np.ndarray] = None,
+        tol: float = 1e-8,
+        max_iter: int = 100,
+    ) -> np.ndarray:
+        """Calculate bus voltages by backward/forward sweep.
+
+        Args:
+            s_pu: complex power demands at buses in per unit. Default to
+                be those from :meth:`RadialPowerFlow.demand`.
+            v_init: complex bus voltages as the initial guess, like
+                results from the last calculation. Default to be
+                voltages of slack buses.
+            tol: tolerance for the maximum change of voltages.
+            max_iter: maximum number of iterations.
+
+        Returns:
+            Complex bus voltages in per unit.
+        """
+        if s_pu is None:
+            s_pu = self.demand()
+        v_slack = self.v_slack()
+        v = v_slack.copy() if v_init is None else np.array(v_init)
+
+        self.converged = False
+        for self.iterations in range(1, max_iter + 1):
+            i_bus = np.conj(s_pu / v) + self.y_shunt * v
+            v_new = v_slack - self._drop(i_bus)
+            change = np.max(np.abs(v_new - v), initial=0)
+            v = v_new
+            if change < tol:
+                self.converged = True
+                break
+
+        if not self.converged:
+            LOGGER.warning(
+                f"Power flow has not converged after {max_iter} iterations."
+            )
+        return v
+
+    def branch_currents(self, v: np.ndarray, s_pu=None) -> np.ndarray:
+        """Calculate branch currents from bus voltages.
+
+        Args:
+            v: complex bus voltages in per unit.
+            s_pu: complex power demands at buses in per unit. Default to
+                be those from :meth:`RadialPowerFlow.demand`.
+
+        Returns:
+            Complex branch currents in per unit, in the order of
+            ``branches``.
+        """
+        if s_pu is None:
+            s_pu = self.demand()
+        return self.bibc @ (np.conj(s_pu / v) + self.y_shunt * v)
+
+    def slack_power(self, v: np.ndarray, s_pu=None) -> np.ndarray:
+        """Calculate power supplied by slack buses.
+
+        Note:
+            Without any shunt branch, the current from a slack bus is the
+            sum of currents into all the buses downstream.
+
+        Args:
+            v: complex bus voltages in per unit.
+            s_pu: complex power demands at buses in per unit. Default to
+                be those from the method ``demand``.
+
+        Returns:
+            Complex power in mega-voltampere, in the order of ``slack``.
+        """
+        if s_pu is None:
+            s_pu = self.demand()
+        i_bus = np.conj(s_pu / v) + self.y_shunt * v
+        i_root = np.zeros((len(self.buses),) + i_bus.shape[1:], complex)
+        np.add.at(i_root, self.root, i_bus)
+        s_slack = v[self.slack] * np.conj(i_root[self.slack])
+        if s_slack.ndim > 1:
+            s_slack = s_slack.sum(axis=1) / 3
+        return s_slack * self.base_mva
+
+    def i_ka(self, v: np.ndarray, s_pu=None) -> np.ndarray:
+        """Calculate magnitudes of branch currents in kilo-ampere.
+
+        Args:
+            v: complex bus voltages in per unit.
+            s_pu: complex power demands at buses in per unit. Default to
+                be those from the method ``demand``.
+
+        Returns:
+            Magnitudes of branch currents, in the order of ``branches``.
+        """
+        vn_kv = self.vn_kv[self.branches["bus"]]
+        i_base = self.base_mva / (np.sqrt(3) * vn_kv)
+        return (np.abs(self.branch_currents(v, s_pu)).T * i_base).T
+
+    def to_frame(self, v: np.ndarray) -> DataFrame:
+        """Gather bus voltages in a dataframe.
+
+        Args:
+            v: complex bus voltages in per unit.
+
+        Returns:
+            Bus voltages indexed by names of buses.
+
+            .. csv-table::
+                :header: name, dtype, definition
+
+                node (index), object, name of the bus
+                vm_pu, float64, voltage magnitude in per unit
+                va_degree, float64, voltage angle in degree
+        """
+        res = pd.DataFrame(
+            {"vm_pu": np.abs(v), "va_degree": np.degrees(np.angle(v))},
+            index=self.buses,
+        )
+        return res
+
+
+PHASES = ["a", "b", "c"]  #: names of phases, in the order of arrays
+ROTATION = np.exp(-2j * np.pi / 3 * np.arange(3))  #: positive sequence
+
+
+def _cable_phase_impedance(
+    elements: list, vn_kv: np.ndarray, base_mva: float
+) -> np.ndarray:
+    """Stack series impedance matrices of cables in per unit.
+
+    Note:
+        Rows and columns of missing phases are left to be zero.
+
+    Args:
+        elements: cables modelled by :class:`CablePhase`.
+        vn_kv: nominal voltages of cables.
+        base_mva: base of power.
+
+    Returns:
+        Complex series impedance matrices, of shape ``(len(elements), 3,
+        3)``.
+    """
+    res = np.zeros((len(elements), 3, 3), dtype=complex)
+    z_base = vn_kv ** 2 / base_mva
+    for i, element in enumerate(elements):
+        idx = [PHASES.index(phase) for phase in element.phases]
+        res[i][np.ix_(idx, idx)] = (
+            element.z_ohm_mat
+            * element.length_km
+            / element.parallel
+            / z_base[i]
+        )
+    return res
+
+
+class RadialPowerFlowPhase(RadialPowerFlow):
+    """Three-phase backward/forward sweep for unbalanced radial grids.
+
+    All the phases of all the feeders are solved together, where series
+    impedances of branches are stacked in a batch of 3-by-3 matrices,
+    and every array for buses has one column for each phase in
+    :data:`PHASES`.
+
+    Note:
+        - Quantities are in per unit of the phase-to-neutral voltage and
+          one third of :data:`BASE_MVA`, so a balanced grid has the same
+          results in phase "a" as :class:`RadialPowerFlow`.
+        - Slack buses have balanced positive-sequence voltages.
+        - :class:`Cable` and transformers are balanced without mutual
+          coupling between phases, like a YNyn0 transformer. Phase
+          coupling is modelled by :class:`CablePhase`.
+        - :class:`Ejection` is balanced, and :class:`EjectionPhase` is
+          evenly distributed among its phases.
+
+    Attributes:
+        z_pu (np.ndarray): series impedance matrices of branches in the
+            order of ``branches``, of shape ``(len(branches), 3, 3)``.
+        shares (np.ndarray): share of power of each ejection in each
+            phase, of shape ``(len(ejections), 3)``.
+        missing (np.ndarray): whether a phase is missing at a bus,
+            because a cable upstream of the bus does not have it.
+    """
+
+    def __init__(self, supra: SupraGrid, base_mva: float = BASE_MVA):
+        """Build the topology and matrices for a radial grid.
+
+        Args:
+            supra: a radial supra-grid.
+            base_mva: base of power in mega-voltampere.
+
+        Raises:
+            ValueError: if some element is not supported, some connected
+                component is not radial with one slack bus, or some
+                ejection is attached to a missing phase.
+        """
+        super().__init__(supra, base_mva)
+        self.shares = np.full((len(self.ejections), 3), 1 / 3)
+        elements = supra.conversions.loc[self.ejections.index, "element"]
+        for i, element in enumerate(elements):
+            if isinstance(element, EjectionPhase):
+                self.shares[i] = np.isin(PHASES, element.phases)
+                self.shares[i] /= len(element.phases)
+
+        buses = self.ejections["bus"].to_numpy()
+        on_missing = ((self.shares > 0) & self.missing[buses]).any(axis=1)
+        if on_missing.any():
+            LOGGER.critical(
+                f"Ejections {list(self.ejections.index[on_missing])} are "
+                "attached to missing phases."
+            )
+            raise ValueError("Ejections attached to missing phases.")
+        self.y_shunt = np.where(self.missing, 0, self.y_shunt[:, None])
+
+    def _init_impedance(self, supra: SupraGrid):
+        """Stack series impedance matrices of branches.
+
+        Args:
+            supra: a radial supra-grid.
+        """
+        elements = self.branches["element"]
+        vn_kv = self.vn_kv[self.branches["bus"]]
+        classes = elements.map(type)
+        is_phase = classes.map(lambda cls: issubclass(cls, CablePhase))
+        is_phase = is_phase.to_numpy()
+
+        z_pu = np.zeros((len(elements), 3, 3), dtype=complex)
+        if is_phase.any():
+            z_pu[is_phase] = _cable_phase_impedance(
+                list(elements[is_phase]), vn_kv[is_phase], self.base_mva
+            )
+        if not is_phase.all():
+            z_diag = _series_impedance(
+                elements[~is_phase],
+                vn_kv[~is_phase],
+                supra.types,
+                self.base_mva,
+            )
+            z_pu[~is_phase] = z_diag[:, None, None] * np.eye(3)
+        self.z_pu = z_pu
+
+        # A phase is missing at a bus if any branch upstream misses it.
+        absent = np.zeros((len(elements), 3))
+        for i in np.flatnonzero(is_phase):
+            absent[i] = ~np.isin(PHASES, elements.iloc[i].phases)
+        self.missing = self.bibc.T @ absent > 0
+
+    def _drop(self, i_bus: np.ndarray) -> np.ndarray:
+        """Calculate voltage drops from slack buses by bus currents.
+
+        Args:
+            i_bus: complex currents injected to buses in per unit, of
+                shape ``(len(buses), 3)``.
+
+        Returns:
+            Complex voltage drops of buses in per unit.
+        """
+        i_branch = self.bibc @ i_bus
+        return self.bibc.T @ np.einsum("bij,bj->bi", self.z_pu, i_branch)
+
+    def v_slack(self) -> np.ndarray:
+        """Get voltages of slack buses upstream of all the buses.
+
+        Returns:
+            Complex voltages in per unit, of shape ``(len(buses), 3)``.
+        """
+        return super().v_slack()[:, None] * ROTATION
+
+    def demand(
+        self,
+        p_mw: Optional[np.ndarray] = None,
+        q_mvar: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Aggregate power demands of ejections at buses phase by phase.
+
+        Args:
+            p_mw: real power demands of ejections, in the order of
+                ``ejections``. Default to be those of elements.
+            q_mvar: reactive power demands of ejections. Default to be
+                those of elements.
+
+        Returns:
+            Complex power demands at buses in per unit, of shape
+            ``(len(buses), 3)``.
+        """
+        if p_mw is None:
+            p_mw = self.ejections["p_mw"].to_numpy()
+        if q_mvar is None:
+            q_mvar = self.ejections["q_mvar"].to_numpy()
+        s_pu = (p_mw + 1j * q_mvar)[:, None] * self.shares * 3
+        matrix = sparse.csr_matrix(
+            (
+                np.ones(len(self.ejections)),
+                (self.ejections["bus"], np.arange(len(self.ejections))),
+            ),
+            shape=(len(self.buses), len(self.ejections)),
+        )
+        return matrix @ s_pu / self.base_mva
+
+    def solve(
+        self,
+        s_pu: Optional[np.ndarray] = None,
+        v_init: Optional[np.ndarray] = None,
+        tol: float = 1e-8,
+        max_iter: int = 100,
+    ) -> np.ndarray:
+        """Calculate bus voltages by backward/forward sweep.
+
+        Note:
+            Voltages of missing phases are not a number.
+
+        Args:
+            s_pu: complex power demands at buses in per unit. Default to
+                be those from :meth:`RadialPowerFlowPhase.demand`.
+            v_init: complex bus voltages as the initial guess, like
+                results from the last calculation. Default to be
+                voltages of slack buses.
+            tol: tolerance for the maximum change of voltages.
+            max_iter: maximum number of iterations.
+
+        Returns:
+            Complex bus voltages in per unit, of shape ``(len(buses),
+            3)``.
+        """
+        if v_init is not None:
+            v_init = np.where(self.missing, self.v_slack(), v_init)
+        v = super().solve(s_pu, v_init, tol, max_iter)
+        return np.where(self.missing, np.nan, v)
+
+    def branch_currents(self, v: np.ndarray, s_pu=None) -> np.ndarray:
+        """Calculate branch currents from bus voltages.
+
+        Args:
+            v: complex bus voltages in per unit, of shape ``(len(buses),
+                3)``.
+            s_pu: complex power demands at buses in per unit. Default to
+                be those from :meth:`RadialPowerFlowPhase.demand`.
+
+        Returns:
+            Complex branch currents in per unit, of shape
+            ``(len(branches), 3)``, which are zero in missing phases.
+        """
+        return super().branch_currents(np.where(self.missing, 1, v), s_pu)
+
+    def unbalance(self, v: np.ndarray) -> np.ndarray:
+        """Calculate voltage unbalance factors of buses.
+
+        Args:
+            v: complex bus voltages in per unit.
+
+        Returns:
+            Ratios of negative- to positive-sequence voltage magnitudes.
+        """
+        v_pos = v @ ROTATION.conj() / 3
+        v_neg = v @ ROTATION / 3
+        return np.abs(v_neg) / np.abs(v_pos)
+
+    def to_frame(self, v: np.ndarray) -> DataFrame:
+        """Gather bus voltages in a dataframe.
+
+        Args:
+            v: complex bus voltages in per unit.
+
+        Returns:
+            Bus voltages indexed by names of buses.
+
+            .. csv-table::
+                :header: name, dtype, definition
+
+                node (index), object, name of the bus
+                vm_pu_a, float64, voltage magnitude of phase "a"
+                va_degree_a, float64, voltage angle of phase "a"
+                ..., ..., same for phases "b" and "c"
+                vuf, float64, voltage unbalance factor
+        """
+        res = pd.DataFrame(index=self.buses)
+        for i, phase in enumerate(PHASES):
+            res[f"vm_pu_{phase}"] = np.abs(v[:, i])
+            res[f"va_degree_{phase}"] = np.degrees(np.angle(v[:, i]))
+        res["vuf"] = self.unbalance(v)
+        return res
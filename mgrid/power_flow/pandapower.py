@@ -1,13 +1,27 @@
 """Build pandapower model.
 
 Three functions to add buses, delivery elements, and conversion elements.
+
+Note:
+    Elements are added in bulk, class by class. Classes of elements are
+    expected to have a class method ``update_pandapower_bulk``, which
+    accepts indices of buses directly. For other classes, elements are
+    added one by one using their ``update_pandapower`` method.
 """
+from collections import defaultdict
+from copy import deepcopy
+from functools import lru_cache
+from typing import Dict, Hashable, Iterable, List, Tuple
+
 import networkx as nx
+import numpy as np
 import pandapower as pp
 from pandapower.auxiliary import pandapowerNet
+from pandas.core.frame import DataFrame
 
-from mgrid.grid import SupraGrid
+from mgrid.grid import GeoGrid, SupraGrid
 from mgrid.log import LOGGER
+from mgrid.transformation import planar2frames
 
 
 def _complete_edge_attr(g, attr: str) -> bool:
@@ -32,6 +46,115 @@ def _complete_edge_attr(g, attr: str) -> bool:
     return res
 
 
+@lru_cache(maxsize=None)
+def _empty_network_template() -> pandapowerNet:
+    """Create an empty pandapower model once, which is never modified.
+
+    Returns:
+        An empty ``pandapower`` model.
+    """
+    return pp.create_empty_network()
+
+
+def _empty_network() -> pandapowerNet:
+    """Create an empty pandapower model by copying a template.
+
+    Note:
+        ``pp.create_empty_network`` builds dozens of empty tables one by
+        one, which dominates the time for small grids.
+
+    Returns:
+        An empty ``pandapower`` model.
+    """
+    return deepcopy(_empty_network_template())
+
+
+def _group_by_class(rows: Iterable[tuple]) -> Dict[type, List[tuple]]:
+    """Group rows by classes of elements in their last entries.
+
+    Args:
+        rows: tuples ending with an element.
+
+    Returns:
+        Rows keyed by classes of elements, where the order is kept.
+    """
+    res = defaultdict(list)
+    for row in rows:
+        res[type(row[-1])].append(row)
+    return res
+
+
+def add_buses(net: pandapowerNet, buses: DataFrame) -> Dict[Hashable, int]:
+    """Add all the buses to a pandapower model at once.
+
+    Args:
+        net: a pandapower network model.
+        buses: buses indexed by names, with a column for ``voltage``.
+
+    Returns:
+        Indices of buses in the pandapower model keyed by names.
+    """
+    index = pp.create_buses(
+        net,
+        len(buses),
+        vn_kv=buses["voltage"].to_numpy(),
+        name=buses.index.to_numpy(),
+    )
+    return dict(zip(buses.index, index))
+
+
+def add_delivery_elements(
+    net: pandapowerNet,
+    edges: Iterable[Tuple[str, str, object]],
+    bus_idx: Dict[Hashable, int],
+):
+    """Add delivery elements to a pandapower model class by class.
+
+    Args:
+        net: a pandapower network model.
+        edges: tuples for sources, targets, and elements of edges.
+        bus_idx: indices of buses in the model keyed by names.
+    """
+    for cls, rows in _group_by_class(edges).items():
+        sources, targets, elements = zip(*rows)
+        if hasattr(cls, "update_pandapower_bulk"):
+            cls.update_pandapower_bulk(
+                net,
+                list(elements),
+                np.array([bus_idx[source] for source in sources]),
+                np.array([bus_idx[target] for target in targets]),
+            )
+        else:
+            for source, target, element in rows:
+                element.update_pandapower(net, source, target)
+
+
+def add_conversion_elements(
+    net: pandapowerNet,
+    conversions: Iterable[Tuple[str, str, object]],
+    bus_idx: Dict[Hashable, int],
+):
+    """Add conversion elements to a pandapower model class by class.
+
+    Args:
+        net: a pandapower network model.
+        conversions: tuples for names, buses, and elements.
+        bus_idx: indices of buses in the model keyed by names.
+    """
+    for cls, rows in _group_by_class(conversions).items():
+        names, buses, elements = zip(*rows)
+        if hasattr(cls, "update_pandapower_bulk"):
+            cls.update_pandapower_bulk(
+                net,
+                list(elements),
+                list(names),
+                np.array([bus_idx[bus] for bus in buses]),
+            )
+        else:
+            for name, bus, element in rows:
+                element.update_pandapower(net, name, bus)
+
+
 def supra2pandapower(supra: SupraGrid) -> pandapowerNet:
     """Build ``pandapower`` model based on supra format.
 
@@ -45,22 +168,80 @@ def supra2pandapower(supra: SupraGrid) -> pandapowerNet:
     _complete_edge_attr(supra, "element")
 
     # Init an empty pandapower model.
-    net = pp.create_empty_network()
+    net = _empty_network()
 
     # Add all the element types.
     for key, std_type in supra.types.items():
         std_type.update_pandapower(net, key)
 
-    # Add all the buses.
-    for node, row in supra.buses.iterrows():
-        pp.create_bus(net, name=node, vn_kv=row["voltage"])
+    # Add all the buses, and map their names to indices.
+    bus_idx = add_buses(net, supra.buses)
+
+    # Add all the delivery elements.
+    add_delivery_elements(net, supra.edges(data="element"), bus_idx)
+
+    # Add all the conversion elements (if any).
+    add_conversion_elements(
+        net,
+        zip(
+            supra.conversions.index,
+            supra.conversions["bus"],
+            supra.conversions["element"],
+        ),
+        bus_idx,
+    )
+
+    return net
+
+
+def geo2pandapower(g: GeoGrid) -> pandapowerNet:
+    """Build ``pandapower`` model from a planar grid directly.
+
+    Note:
+        Tables of the supra grid are found by
+        :func:`mgrid.transformation.planar2frames`, without building
+        the supra graph. The model is the same as the one built by
+        :func:`supra2pandapower` after :func:`planar2supra`, including
+        the order of all the elements.
+
+    Args:
+        g: a planar grid.
+
+    Returns:
+        A ``pandapower`` model.
+    """
+    frames = planar2frames(g)
+    edges = frames.edges(g)
+
+    # Check if all the edges have the "element" attribute.
+    num_missing = edges["element"].isna().sum()
+    if num_missing > 0:
+        LOGGER.critical(
+            f"There are {num_missing} edges without the attribute "
+            '"element".'
+        )
+
+    # Init an empty pandapower model.
+    net = _empty_network()
+
+    # Add all the element types.
+    for key, std_type in g.types.items():
+        std_type.update_pandapower(net, key)
+
+    # Add all the buses, and map their names to indices.
+    bus_idx = add_buses(net, frames.buses)
 
     # Add all the delivery elements.
-    for source, target, data in supra.edges.data():
-        data["element"].update_pandapower(net, source, target)
+    add_delivery_elements(
+        net, edges.itertuples(index=False, name=None), bus_idx
+    )
 
     # Add all the conversion elements (if any).
-    for name, row in supra.conversions.iterrows():
-        row["element"].update_pandapower(net, name, row["bus"])
+    conversions = frames.conversions
+    add_conversion_elements(
+        net,
+        zip(conversions.index, conversions["bus"], conversions["element"]),
+        bus_idx,
+    )
 
     return net
@@ -0,0 +1,559 @@
+"""Split a supra grid into feeders and solve them in parallel.
+
+A supra grid usually falls apart into many independent feeders below
+transformers, which are inter-edges in the supra graph. When some
+inter-edges are cut, the grid is partitioned into pieces, and every
+piece is a supra grid itself with boundary equivalents:
+
+- In the piece below a cut inter-edge, the upper terminal of the
+  inter-edge is a slack bus, whose voltage magnitude follows the piece
+  above.
+- In the piece above, the piece below is an ejection attached to the
+  upper terminal, whose demand follows the power supplied by the slack
+  bus below.
+
+Then all the pieces are solved at the same time in a process pool, and
+boundary voltages and demands are exchanged after each round, until
+they are consistent. Pieces are radial and solved by
+:class:`RadialPowerFlow`.
+
+Note:
+    Voltage angles of a piece below are shifted by the angle of its
+    boundary bus when results are merged. Constant power demands and
+    constant impedances do not depend on the reference of angles.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.core.frame import DataFrame
+from scipy import sparse
+from scipy.sparse import csgraph
+
+from mgrid.grid import SupraGrid
+from mgrid.log import LOGGER
+from mgrid.power_flow.conversion import Ejection, Slack
+from mgrid.power_flow.impedance import RadialPowerFlow
+
+#: pieces, boundaries, solvers and last voltages in a worker process,
+#: keyed by positions of pieces
+_WORKER_GRIDS: Dict[int, SupraGrid] = {}
+_WORKER_BOUNDARIES: Dict[int, Tuple[Optional[str], List[str]]] = {}
+_WORKER_SOLVERS: Dict[int, Tuple[RadialPowerFlow, int, np.ndarray]] = {}
+_WORKER_VOLTAGES: Dict[int, np.ndarray] = {}
+
+
+@dataclass
+class Partition:
+    """Pieces of a supra grid and boundaries between them.
+
+    Attributes:
+        boundaries: cut inter-edges, indexed by positions of pieces below.
+
+            .. csv-table::
+                :header: name, dtype, definition
+
+                child (index), int64, position of the piece below
+                parent, int64, position of the piece above
+                bus, object, upper terminal of the inter-edge
+                slack, object, name of the slack in the piece below
+                equivalent, object, name of the ejection in the piece above
+                depth, int64, number of boundaries above the piece below
+    """
+
+    grids: List[SupraGrid]  #: pieces of the supra grid
+    boundaries: DataFrame  #: cut inter-edges between pieces
+
+
+def _piece(supra: SupraGrid, nodes: pd.Index, members: pd.Index):
+    """Build one piece of a supra grid.
+
+    Args:
+        supra: a supra grid.
+        nodes: all the buses in the piece, including boundary buses.
+        members: buses owned by the piece, excluding boundary buses.
+
+    Returns:
+        A supra grid with buses, conversion elements, and types.
+    """
+    res = SupraGrid(supra.subgraph(nodes))
+    res.types = supra.types
+    res.buses = supra.buses[supra.buses.index.isin(nodes)]
+    res.conversions = supra.conversions[
+        supra.conversions["bus"].isin(members)
+    ]
+    if supra.intra_edges is not None:
+        edges = supra.intra_edges
+        res.intra_edges = edges[
+            edges["source"].isin(nodes) & edges["target"].isin(nodes)
+        ]
+    if supra.inter_edges is not None:
+        edges = supra.inter_edges
+        res.inter_edges = edges[
+            edges["source"].isin(nodes) & edges["target"].isin(nodes)
+        ]
+    return res
+
+
+def partition(supra: SupraGrid, layers: Iterable[int]) -> Partition:
+    """Split a supra grid at inter-edges from some layers.
+
+    Note:
+        Ejections as boundary equivalents are initialised with demands
+        of all the ejections below, ignoring losses.
+
+    Args:
+        supra: a supra grid with inter-edges.
+        layers: upper layers of inter-edges to be cut.
+
+    Raises:
+        ValueError: if some piece is below more than one cut inter-edge.
+
+    Returns:
+        Pieces of the grid, and boundaries between them.
+    """
+    cut = supra.inter_edges[supra.inter_edges["upper"].isin(list(layers))]
+    buses = supra.buses.index
+    num_buses = len(buses)
+    pos = pd.Series(np.arange(num_buses), index=buses)
+
+    # Find connected components after removing cut inter-edges.
+    edges = pd.DataFrame(list(supra.edges()), columns=["source", "target"])
+    edges = edges.set_index(["source", "target"])
+    edges = edges.drop(list(zip(cut["source"], cut["target"])))
+    edges = edges.index.to_frame(index=False)
+    adjacency = sparse.coo_matrix(
+        (
+            np.ones(len(edges)),
+            (
+                pos[edges["source"]].to_numpy(),
+                pos[edges["target"]].to_numpy(),
+            ),
+        ),
+        shape=(num_buses, num_buses),
+    )
+    _, labels = csgraph.connected_components(adjacency, directed=False)
+    labels = pd.Series(labels, index=buses)
+
+    boundaries = pd.DataFrame(
+        {
+            "child": labels[cut["target"]].to_numpy(),
+            "parent": labels[cut["source"]].to_numpy(),
+            "bus": cut["source"].to_numpy(),
+            "slack": "slack_" + cut["target"].astype(str).to_numpy(),
+            "equivalent": "equivalent_"
+            + cut["target"].astype(str).to_numpy(),
+        }
+    )
+    if boundaries["child"].duplicated().any():
+        LOGGER.critical(
+            "Some piece is below more than one cut inter-edge, so it "
+            "cannot be solved with one slack bus."
+        )
+        raise ValueError("Piece with multiple boundaries.")
+    boundaries = boundaries.set_index("child").sort_index()
+
+    # Count boundaries above each piece, so that pieces are ordered.
+    depth = pd.Series(0, index=boundaries.index)
+    for child in boundaries.index:
+        parent = child
+        while parent in boundaries.index:
+            parent = boundaries.at[parent, "parent"]
+            depth[child] += 1
+    boundaries["depth"] = depth
+
+    grids = []
+    for k in range(labels.max() + 1):
+        members = buses[labels.to_numpy() == k]
+        nodes = members
+        if k in boundaries.index:
+            nodes = members.append(pd.Index([boundaries.at[k, "bus"]]))
+        grids.append(_piece(supra, nodes, members))
+        if k in boundaries.index:
+            grids[k].conversions = pd.concat(
+                [
+                    grids[k].conversions,
+                    pd.DataFrame(
+                        {
+                            "element": [Slack()],
+                            "bus": [boundaries.at[k, "bus"]],
+                        },
+                        index=pd.Index([boundaries.at[k, "slack"]]),
+                    ),
+                ]
+            )
+
+    # Attach equivalents from the deepest pieces, so that demands below
+    # are aggregated.
+    for child in boundaries.sort_values("depth", ascending=False).index:
+        conversions = grids[child].conversions
+        s_mva = sum(
+            complex(element.p_mw, np.copysign(element.q_mvar, element.p_mw))
+            for element in conversions["element"]
+            if isinstance(element, Ejection)
+        )
+        power_factor = 1 if s_mva.real == 0 else abs(s_mva.real / s_mva)
+        element = Ejection(s_mva.real, power_factor)
+        parent = boundaries.at[child, "parent"]
+        grids[parent].conversions = pd.concat(
+            [
+                grids[parent].conversions,
+                pd.DataFrame(
+                    {
+                        "element": [element],
+                        "bus": [boundaries.at[child, "bus"]],
+                    },
+                    index=pd.Index([boundaries.at[child, "equivalent"]]),
+                ),
+            ]
+        )
+    for grid in grids:
+        grid.conversions.index.name = supra.conversions.index.name
+
+    LOGGER.debug(
+        f"The grid is partitioned into {len(grids)} piece(s) at "
+        f"{len(boundaries)} inter-edge(s)."
+    )
+    return Partition(grids, boundaries)
+
+
+def _init_worker(
+    grids: Dict[int, SupraGrid],
+    boundaries: Dict[int, Tuple[Optional[str], List[str]]],
+):
+    """Keep pieces in a worker process.
+
+    Args:
+        grids: pieces to be solved by the worker, keyed by positions.
+        boundaries: boundary bus of each piece, and names of its
+            equivalents, keyed by positions.
+    """
+    _WORKER_GRIDS.clear()
+    _WORKER_GRIDS.update(grids)
+    _WORKER_BOUNDARIES.clear()
+    _WORKER_BOUNDARIES.update(boundaries)
+    _WORKER_SOLVERS.clear()
+    _WORKER_VOLTAGES.clear()
+
+
+def _worker_solver(k: int) -> Tuple[RadialPowerFlow, int, np.ndarray]:
+    """Get the solver of a piece, which is built when first used.
+
+    Args:
+        k: position of the piece.
+
+    Returns:
+        The solver, position of the boundary slack in ``solver.slack``
+        (-1 if the piece is on the top), and positions of equivalents in
+        ``solver.ejections``.
+    """
+    if k not in _WORKER_SOLVERS:
+        solver = RadialPowerFlow(_WORKER_GRIDS[k])
+        bus, equivalents = _WORKER_BOUNDARIES[k]
+        slack = -1
+        if bus is not None:
+            slack = np.flatnonzero(solver.slack == solver.buses.get_loc(bus))
+            slack = slack[0]
+        columns = solver.ejections.index.get_indexer(equivalents)
+        _WORKER_SOLVERS[k] = (solver, slack, columns)
+    return _WORKER_SOLVERS[k]
+
+
+def _solve_chunk(
+    tasks: List[Tuple[int, float, np.ndarray]], tol: float, max_iter: int
+) -> List[Tuple[int, np.ndarray, np.ndarray, complex, bool]]:
+    """Solve some pieces kept in a worker process.
+
+    Args:
+        tasks: position of each piece, voltage magnitude of its boundary
+            bus, and complex demands of its equivalents in
+            mega-voltampere.
+        tol: tolerance for the maximum change of voltages.
+        max_iter: maximum number of iterations.
+
+    Returns:
+        Position of each piece, its bus voltages, its branch currents in
+        kilo-ampere, power supplied by the boundary bus, and whether it
+        has converged.
+    """
+    res = []
+    for k, vm_pu, s_mva in tasks:
+        solver, slack, columns = _worker_solver(k)
+        if slack >= 0:
+            solver.vm_slack[slack] = vm_pu
+        p_mw = solver.ejections["p_mw"].to_numpy(copy=True)
+        q_mvar = solver.ejections["q_mvar"].to_numpy(copy=True)
+        p_mw[columns] = s_mva.real
+        q_mvar[columns] = s_mva.imag
+
+        s_pu = solver.demand(p_mw, q_mvar)
+        v = solver.solve(s_pu, _WORKER_VOLTAGES.get(k), tol, max_iter)
+        _WORKER_VOLTAGES[k] = v
+        s_slack = 0j if slack < 0 else solver.slack_power(v, s_pu)[slack]
+        res.append((k, v, solver.i_ka(v, s_pu), s_slack, solver.converged))
+    return res
+
+
+def _branches_chunk(chunk: List[int]) -> Dict[int, DataFrame]:
+    """Get branches of some pieces kept in a worker process.
+
+    Args:
+        chunk: positions of pieces.
+
+    Returns:
+        Source and target buses of branches in the order of currents,
+        keyed by positions of pieces.
+    """
+    return {
+        k: _worker_solver(k)[0].branches[["source", "target"]]
+        for k in chunk
+    }
+
+
+class ParallelPowerFlow:
+    """Solve pieces of a partitioned grid in worker processes.
+
+    Note:
+        Every worker process is an executor of its own, and keeps some
+        pieces and their solvers, so that solvers are built only once.
+        Pieces are assigned to workers with balanced numbers of buses.
+        Workers are shut down by :meth:`ParallelPowerFlow.close`, or
+        when leaving the ``with`` statement.
+
+    Attributes:
+        partition (Partition): pieces of a grid and boundaries.
+        chunks (List[List[int]]): positions of pieces kept by each
+            worker.
+        rounds (int): rounds of exchange in the last calculation.
+        converged (bool): whether the last calculation has converged.
+    """
+
+    def __init__(self, partition: Partition, max_workers: int = 1):
+        """Start worker processes and send pieces to them.
+
+        Args:
+            partition: pieces of a grid and boundaries.
+            max_workers: number of worker processes.
+        """
+        self.partition = partition
+        grids = partition.grids
+        boundaries = partition.boundaries
+        sizes = [len(grid.buses) for grid in grids]
+        num_workers = max(1, min(max_workers, len(sizes)))
+        self.chunks = [[] for _ in range(num_workers)]
+        loads = np.zeros(num_workers)
+        for k in np.argsort(sizes, kind="stable")[::-1]:
+            worker = loads.argmin()
+            self.chunks[worker].append(int(k))
+            loads[worker] += sizes[k]
+
+        # Boundaries are in arrays, where each piece has its own row (if
+        # it is below a boundary) and rows of pieces below.
+        parents = boundaries["parent"].to_numpy()
+        self._row = np.full(len(grids), -1)
+        self._row[boundaries.index] = np.arange(len(boundaries))
+        self._below = [np.flatnonzero(parents == k) for k in range(len(grids))]
+        self._positions = np.array(
+            [
+                grids[parent].buses.index.get_loc(bus)
+                for parent, bus in zip(parents, boundaries["bus"])
+            ],
+            dtype=int,
+        )
+        equivalents = boundaries["equivalent"].to_numpy()
+        buses = boundaries["bus"].to_numpy()
+        self._executors = [
+            ProcessPoolExecutor(
+                1,
+                initializer=_init_worker,
+                initargs=(
+                    {k: grids[k] for k in chunk},
+                    {
+                        k: (
+                            None if self._row[k] < 0 else buses[self._row[k]],
+                            list(equivalents[self._below[k]]),
+                        )
+                        for k in chunk
+                    },
+                ),
+            )
+            for chunk in self.chunks
+        ]
+        self.rounds = 0
+        self.converged = False
+
+    def close(self):
+        """Shut down all the worker processes."""
+        for executor in self._executors:
+            executor.shutdown()
+
+    def __enter__(self) -> "ParallelPowerFlow":
+        """Use the runner in a ``with`` statement.
+
+        Returns:
+            The runner itself.
+        """
+        return self
+
+    def __exit__(self, *args):
+        """Shut down all the worker processes when leaving.
+
+        Args:
+            args: information about any exception.
+        """
+        self.close()
+
+    def run(
+        self,
+        tol: float = 1e-8,
+        max_rounds: int = 20,
+        max_iter: int = 100,
+    ) -> Tuple[DataFrame, DataFrame]:
+        """Solve all the pieces until boundaries are consistent.
+
+        Note:
+            Pieces are solved with a tolerance ten times smaller, so
+            that changes of boundaries are not blurred by them.
+
+        Args:
+            tol: tolerance for changes of voltages in per unit, and of
+                boundary demands in mega-voltampere.
+            max_rounds: maximum rounds of exchange between pieces.
+            max_iter: maximum number of iterations in each piece.
+
+        Raises:
+            ValueError: if ``max_rounds`` is less than one.
+
+        Returns:
+            Bus voltages indexed by names of buses, and branch currents.
+
+            .. csv-table::
+                :header: name, dtype, definition
+
+                node (index), object, name of the bus
+                vm_pu, float64, voltage magnitude in per unit
+                va_degree, float64, voltage angle in degree
+
+            .. csv-table::
+                :header: name, dtype, definition
+
+                source, object, source bus of the edge
+                target, object, target bus of the edge
+                i_ka, float64, current magnitude in kilo-ampere
+        """
+        if max_rounds < 1:
+            LOGGER.critical("At least one round is needed.")
+            raise ValueError(f"Invalid number of rounds {max_rounds}.")
+
+        grids = self.partition.grids
+        boundaries = self.partition.boundaries
+        parents = boundaries["parent"].to_numpy()
+        equivalents = [
+            grids[parent].conversions.at[name, "element"]
+            for parent, name in zip(parents, boundaries["equivalent"])
+        ]
+        s_mva = np.array(
+            [
+                complex(e.p_mw, np.copysign(e.q_mvar, e.p_mw))
+                for e in equivalents
+            ],
+            dtype=complex,
+        )
+        vm_pu = np.ones(len(boundaries))
+
+        self.converged = False
+        for self.rounds in range(1, max_rounds + 1):
+            futures = [
+                executor.submit(
+                    _solve_chunk,
+                    [
+                        (
+                            k,
+                            vm_pu[self._row[k]] if self._row[k] >= 0 else 1,
+                            s_mva[self._below[k]],
+                        )
+                        for k in chunk
+                    ],
+                    tol / 10,
+                    max_iter,
+                )
+                for executor, chunk in zip(self._executors, self.chunks)
+            ]
+            results = {}
+            for future in futures:
+                for k, *res in future.result():
+                    results[k] = res
+
+            vm_new = np.array(
+                [
+                    abs(results[parent][0][pos])
+                    for parent, pos in zip(parents, self._positions)
+                ]
+            )
+            s_new = np.array(
+                [results[child][2] for child in boundaries.index],
+                dtype=complex,
+            )
+            change = max(
+                np.max(np.abs(vm_new - vm_pu), initial=0),
+                np.max(np.abs(s_new - s_mva), initial=0),
+            )
+            vm_pu, s_mva = vm_new, s_new
+            LOGGER.debug(f"Boundaries change by {change} in a round.")
+            if change < tol and all(res[3] for res in results.values()):
+                self.converged = True
+                break
+
+        if not self.converged:
+            LOGGER.warning(
+                f"Boundaries are not consistent after {max_rounds} rounds."
+            )
+        return self._merge(results)
+
+    def _merge(self, results: dict) -> Tuple[DataFrame, DataFrame]:
+        """Merge results of pieces under original names.
+
+        Args:
+            results: bus voltages, branch currents, boundary power and
+                convergence of each piece.
+
+        Returns:
+            Bus voltages and branch currents.
+        """
+        grids = self.partition.grids
+        boundaries = self.partition.boundaries
+
+        # Shift angles of pieces from the top down.
+        rotation = np.ones(len(grids), dtype=complex)
+        for child in boundaries.sort_values("depth").index:
+            parent = boundaries.at[child, "parent"]
+            v_bus = results[parent][0][self._positions[self._row[child]]]
+            rotation[child] = rotation[parent] * v_bus / abs(v_bus)
+
+        voltages = []
+        for k, grid in enumerate(grids):
+            v = pd.Series(results[k][0] * rotation[k], index=grid.buses.index)
+            if k in boundaries.index:
+                v = v.drop(boundaries.at[k, "bus"])
+            voltages.append(v)
+        v = pd.concat(voltages)
+        buses = pd.DataFrame(
+            {"vm_pu": np.abs(v), "va_degree": np.degrees(np.angle(v))},
+            index=v.index,
+        )
+
+        branches = {}
+        futures = [
+            executor.submit(_branches_chunk, chunk)
+            for executor, chunk in zip(self._executors, self.chunks)
+        ]
+        for future in futures:
+            branches.update(future.result())
+        for k in branches:
+            branches[k] = branches[k].assign(i_ka=results[k][1])
+        branches = pd.concat(
+            [branches[k] for k in range(len(grids))], ignore_index=True
+        )
+        return buses, branches
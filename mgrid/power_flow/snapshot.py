@@ -6,4 +6,179 @@ consecutive time indices, the system state is assumed to remain steady,
 so small variations are ignored. Usually, the duration between indices
 is long compared to the frequency of alternating current (50 Hz in
 Europe and 60 Hz in the US).
+
+A time-series study solves one power flow for each time index, where
+only demands change while the topology is the same. So the radial
+solvers in :mod:`mgrid.power_flow.impedance` are built only once, and
+results of one index are the initial guess for the next.
 """
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from mgrid.log import LOGGER
+from mgrid.power_flow.impedance import RadialPowerFlow
+
+
+def _allocate(
+    shape: Tuple[int, ...], dtype: type, path: Optional[str] = None
+) -> np.ndarray:
+    """Allocate an array in memory, or map it to a ``.npy`` file.
+
+    Args:
+        shape: shape of the array.
+        dtype: data type of the array.
+        path: path of the ``.npy`` file. Default to be in memory.
+
+    Returns:
+        An array filled with zeros, or not initialised if mapped.
+    """
+    if path is None:
+        return np.zeros(shape, dtype=dtype)
+    return np.lib.format.open_memmap(path, "w+", dtype, shape)
+
+
+@dataclass
+class TimeSeriesResult:
+    """Preallocated results of a time-series power flow study.
+
+    Note:
+        The first axis is always time. For three-phase solvers, the
+        last axis of ``vm_pu``, ``va_degree`` and ``i_ka`` is phase.
+    """
+
+    vm_pu: np.ndarray  #: bus voltage magnitudes in per unit
+    va_degree: np.ndarray  #: bus voltage angles in degree
+    i_ka: np.ndarray  #: branch current magnitudes in kilo-ampere
+    converged: np.ndarray  #: whether the step has converged
+    iterations: np.ndarray  #: number of iterations of the step
+
+    @classmethod
+    def allocate(
+        cls,
+        num_steps: int,
+        solver: RadialPowerFlow,
+        directory: Optional[str] = None,
+    ) -> "TimeSeriesResult":
+        """Allocate result arrays for a solver.
+
+        Args:
+            num_steps: number of time indices.
+            solver: a radial power flow solver.
+            directory: a directory where every array is mapped to a
+                ``.npy`` file named after it. Default to be in memory.
+
+        Returns:
+            Result arrays of proper shapes.
+        """
+        phases = solver.v_slack().shape[1:]
+        bus_shape = (num_steps, len(solver.buses)) + phases
+        branch_shape = (num_steps, len(solver.branches)) + phases
+
+        def path(name: str) -> Optional[str]:
+            return None if directory is None else f"{directory}/{name}.npy"
+
+        return cls(
+            vm_pu=_allocate(bus_shape, np.float64, path("vm_pu")),
+            va_degree=_allocate(bus_shape, np.float64, path("va_degree")),
+            i_ka=_allocate(branch_shape, np.float64, path("i_ka")),
+            converged=_allocate((num_steps,), np.bool_, path("converged")),
+            iterations=_allocate((num_steps,), np.int32, path("iterations")),
+        )
+
+
+class TimeSeriesPowerFlow:
+    """Solve power flow of a radial grid for a series of demands.
+
+    Attributes:
+        solver (RadialPowerFlow): a balanced or three-phase solver built
+            for the topology.
+        columns (np.ndarray): positions of ejections in
+            ``solver.ejections`` for columns of profiles.
+    """
+
+    def __init__(
+        self, solver: RadialPowerFlow, names: Optional[Sequence] = None
+    ):
+        """Prepare to solve with profiles of some ejections.
+
+        Args:
+            solver: a balanced or three-phase solver.
+            names: names of ejections corresponding to columns of
+                profiles. Default to be all the ejections in the order
+                of ``solver.ejections``.
+
+        Raises:
+            ValueError: if some ejection cannot be found.
+        """
+        self.solver = solver
+        ejections = solver.ejections.index
+        if names is None:
+            names = ejections
+        self.columns = ejections.get_indexer(names)
+        if (self.columns < 0).any():
+            unknown = [n for n, c in zip(names, self.columns) if c < 0]
+            LOGGER.critical(f"Ejections {unknown} cannot be found.")
+            raise ValueError("Profiles for unknown ejections.")
+
+    def run(
+        self,
+        p_mw: np.ndarray,
+        q_mvar: Optional[np.ndarray] = None,
+        res: Optional[TimeSeriesResult] = None,
+        tol: float = 1e-8,
+        max_iter: int = 100,
+    ) -> TimeSeriesResult:
+        """Solve power flow for every time index.
+
+        Note:
+            - Profiles can be memory-mapped arrays, which are read one
+              row at a time.
+            - Ejections without profiles keep their own demands.
+            - If a step does not converge, the next one starts from
+              voltages of slack buses again.
+
+        Args:
+            p_mw: real power demands, time by ejection.
+            q_mvar: reactive power demands, time by ejection. Default to
+                follow power factors of ejections.
+            res: preallocated results. Default to be allocated in
+                memory.
+            tol: tolerance for the maximum change of voltages.
+            max_iter: maximum number of iterations in each step.
+
+        Returns:
+            Results of all the time indices.
+        """
+        solver = self.solver
+        num_steps = len(p_mw)
+        if res is None:
+            res = TimeSeriesResult.allocate(num_steps, solver)
+
+        p_step = solver.ejections["p_mw"].to_numpy(copy=True)
+        q_step = solver.ejections["q_mvar"].to_numpy(copy=True)
+        tan_phi = solver.ejections["tan_phi"].to_numpy()[self.columns]
+        v = None
+        for t in range(num_steps):
+            p_step[self.columns] = p_mw[t]
+            if q_mvar is None:
+                q_step[self.columns] = p_step[self.columns] * tan_phi
+            else:
+                q_step[self.columns] = q_mvar[t]
+            s_pu = solver.demand(p_step, q_step)
+
+            v = solver.solve(s_pu, v, tol, max_iter)
+            res.vm_pu[t] = np.abs(v)
+            res.va_degree[t] = np.degrees(np.angle(v))
+            res.i_ka[t] = solver.i_ka(v, s_pu)
+            res.converged[t] = solver.converged
+            res.iterations[t] = solver.iterations
+            if not solver.converged:
+                v = None
+
+        LOGGER.debug(
+            f"{num_steps} step(s) are solved, {(~res.converged).sum()} of "
+            "which have not converged."
+        )
+        return res
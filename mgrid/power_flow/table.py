@@ -0,0 +1,298 @@
+"""Columnar tables for elements of the same data-class.
+
+Elements of power grids are modelled by data-classes, see
+:mod:`mgrid.power_flow.delivery` and :mod:`mgrid.power_flow.conversion`.
+When there are millions of cables, one Python object per cable takes
+most of the memory, and any calculation must loop over those objects.
+Instead, elements of the same data-class can be stored in an
+:class:`ElementTable`, with one NumPy array for each field.
+
+To keep existing code working, a table hands out **views**. A view is an
+instance of a subclass of the data-class, which only holds the table
+and its row, and reads or writes fields from or to the arrays. So views
+can be used as elements on edges, and in ``conversions`` or
+``inter_nodes``, while bulk functions can work on arrays directly. A
+view equals any instance of the data-class with equal field values.
+
+.. note::
+    Fields annotated as ``float`` or ``int`` are stored in arrays of
+    ``float64`` or ``int64``. Fields annotated as ``np.ndarray`` are
+    stacked to one more dimension when all the arrays share the same
+    shape. Other fields are stored in arrays of objects.
+"""
+from dataclasses import fields, is_dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+from pandas.core.frame import DataFrame
+
+_DTYPES = {float: np.float64, int: np.int64}
+_VIEW_CLASSES = {}
+
+
+def _column(field_type: type, values: list) -> np.ndarray:
+    """Build an array for values of one field.
+
+    Args:
+        field_type: annotated type of the field.
+        values: values of the field for all the elements.
+
+    Returns:
+        An array with one entry for each element.
+    """
+    if field_type in _DTYPES:
+        res = np.array(values, dtype=_DTYPES[field_type])
+    elif (
+        field_type is np.ndarray
+        and len(values) > 0
+        and len({np.shape(value) for value in values}) == 1
+    ):
+        res = np.stack(values)
+    else:
+        res = np.empty(len(values), dtype=object)
+        res[:] = values
+    return res
+
+
+def _view_class(cls: type) -> type:
+    """Get the view class for a data-class.
+
+    Args:
+        cls: a data-class for elements.
+
+    Returns:
+        A subclass of the data-class, whose fields are read from and
+        written to columns of a table.
+    """
+    if cls not in _VIEW_CLASSES:
+
+        def make_property(name: str) -> property:
+            def getter(self):
+                return self._table.columns[name][self._row]
+
+            def setter(self, value):
+                self._table.columns[name][self._row] = value
+
+            return property(getter, setter)
+
+        def eq(self, other) -> bool:
+            # Views equal any instance of the data-class in values, unlike
+            # the data-class, which requires the same class.
+            if not isinstance(other, cls):
+                return NotImplemented
+            names = [field.name for field in fields(cls)]
+            return tuple(getattr(self, name) for name in names) == tuple(
+                getattr(other, name) for name in names
+            )
+
+        namespace = {
+            "__slots__": ("_table", "_row"),
+            "__qualname__": cls.__qualname__,
+            "__module__": cls.__module__,
+            "__reduce__": lambda self: (_make_view, (self._table, self._row)),
+            "__eq__": eq,
+            "__hash__": cls.__hash__,
+        }
+        for field in fields(cls):
+            namespace[field.name] = make_property(field.name)
+        _VIEW_CLASSES[cls] = type(cls.__name__, (cls,), namespace)
+    return _VIEW_CLASSES[cls]
+
+
+def _make_view(table: "ElementTable", row: int):
+    """Rebuild a view when it is unpickled.
+
+    Args:
+        table: the table to which the view refers.
+        row: integer index of the row.
+
+    Returns:
+        A view of the row.
+    """
+    return table.view(row)
+
+
+class ElementTable:
+    """Elements of one data-class stored column by column.
+
+    Attributes:
+        cls (type): data-class of elements.
+        columns (Dict[str, np.ndarray]): one array for each field of the
+            data-class, all of which have the same length.
+    """
+
+    def __init__(self, cls: type, columns: Dict[str, np.ndarray]):
+        """Init a table from arrays for all the fields.
+
+        Args:
+            cls: data-class of elements.
+            columns: one array for each field of the data-class.
+        """
+        self.cls = cls
+        self.columns = columns
+
+    @classmethod
+    def from_elements(cls, elements: Sequence) -> "ElementTable":
+        """Init a table from elements of the same data-class.
+
+        Args:
+            elements: instances (or views) of one data-class.
+
+        Returns:
+            A table with one row for each element, in the same order.
+
+        Raises:
+            TypeError: if elements are not instances of a data-class.
+        """
+        element_cls = type(elements[0])
+        if element_cls in _VIEW_CLASSES.values():
+            element_cls = element_cls.__mro__[1]
+        if not is_dataclass(element_cls):
+            raise TypeError(f"{element_cls} is not a data-class.")
+
+        columns = {
+            field.name: _column(
+                field.type, [getattr(e, field.name) for e in elements]
+            )
+            for field in fields(element_cls)
+        }
+        return cls(element_cls, columns)
+
+    @classmethod
+    def gather(cls, elements: Sequence) -> "ElementTable":
+        """Gather elements of the same data-class in a table.
+
+        Note:
+            When all the elements are views of the same table, rows are
+            taken from the table without visiting fields one by one.
+
+        Args:
+            elements: instances (or views) of one data-class.
+
+        Returns:
+            A table with one row for each element, in the same order.
+        """
+        table = getattr(elements[0], "_table", None)
+        if table is not None and all(
+            getattr(element, "_table", None) is table for element in elements
+        ):
+            res = table.take([element._row for element in elements])
+        else:
+            res = cls.from_elements(elements)
+        return res
+
+    def __len__(self) -> int:
+        """Count rows in the table.
+
+        Returns:
+            Number of elements.
+        """
+        return len(next(iter(self.columns.values()), ()))
+
+    def __getitem__(self, row: int):
+        """Get a view of one row.
+
+        Args:
+            row: integer index of the row.
+
+        Returns:
+            A view of the row.
+        """
+        return self.view(row)
+
+    def view(self, row: int):
+        """Get a view of one row, which behaves like the data-class.
+
+        Args:
+            row: integer index of the row.
+
+        Returns:
+            A view of the row.
+        """
+        res = object.__new__(_view_class(self.cls))
+        res._table = self
+        res._row = row
+        return res
+
+    def views(self) -> List:
+        """Get views of all the rows.
+
+        Returns:
+            Views in the order of rows.
+        """
+        return [self.view(row) for row in range(len(self))]
+
+    def take(self, rows: Sequence[int]) -> "ElementTable":
+        """Build a new table from some rows.
+
+        Args:
+            rows: integer indices of rows.
+
+        Returns:
+            A table with copies of given rows.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        return ElementTable(
+            self.cls, {key: col[rows] for key, col in self.columns.items()}
+        )
+
+    def to_frame(self) -> DataFrame:
+        """Convert one-dimensional columns to a dataframe.
+
+        Returns:
+            A dataframe with one column for each one-dimensional field.
+        """
+        return pd.DataFrame(
+            {key: col for key, col in self.columns.items() if col.ndim == 1}
+        )
+
+
+def tabulate(elements: Sequence) -> Tuple[list, Dict[type, ElementTable]]:
+    """Store elements in tables, one for each data-class.
+
+    Args:
+        elements: elements of any classes.
+
+    Returns:
+        Views replacing the elements, in the same order, and tables
+        keyed by data-classes. Elements not being instances of
+        data-classes are returned as they are.
+    """
+    groups: Dict[type, List[int]] = {}
+    for i, element in enumerate(elements):
+        if is_dataclass(element) and not hasattr(element, "_table"):
+            groups.setdefault(type(element), []).append(i)
+
+    res = list(elements)
+    tables = {}
+    for cls, positions in groups.items():
+        table = ElementTable.from_elements([res[i] for i in positions])
+        for row, i in enumerate(positions):
+            res[i] = table.view(row)
+        tables[cls] = table
+    return res, tables
+
+
+def compact_edges(
+    g: nx.DiGraph, attr: str = "element"
+) -> Dict[type, ElementTable]:
+    """Store elements on edges in tables, and replace them by views.
+
+    Note:
+        Each edge keeps a view, which knows its row in the table of its
+        data-class.
+
+    Args:
+        g: a graph with elements as edge attributes.
+        attr: name of the edge attribute for elements.
+
+    Returns:
+        Tables keyed by data-classes of elements.
+    """
+    data = [d for _, _, d in g.edges(data=True) if attr in d]
+    views, res = tabulate([d[attr] for d in data])
+    for d, view in zip(data, views):
+        d[attr] = view
+    return res
@@ -0,0 +1,195 @@
+"""Keep recently read snapshots of a graph in memory.
+
+Committed snapshots never change, so a graph reconstructed once stays
+valid for as long as its snapshot exists. The cache can be shared by
+reader threads.
+"""
+from collections import OrderedDict
+import threading
+from typing import Iterable, Optional, Tuple
+
+import networkx as nx
+
+from mgrid.log import LOGGER
+
+
+def derive(
+    graph: nx.DiGraph, toggles: Iterable[Tuple[str, str, int]]
+) -> nx.DiGraph:
+    """Copy a frozen graph with some edges toggled.
+
+    Note:
+        Adjacency of nodes without toggled edges is shared with the
+        original graph, and only touched nodes are copied, so the cost
+        is about the number of nodes rather than edges. Nodes left
+        without edges are dropped, like in reconstructed snapshots.
+
+    Args:
+        graph: a frozen graph, which is never modified.
+        toggles: tuples of source, target and element index, where an
+            existing edge is removed, or a new one is added.
+
+    Returns:
+        A new graph, which is not frozen.
+    """
+    res = nx.DiGraph()
+    res._node.update(graph._node)
+    res._succ.update(graph._succ)
+    res._pred.update(graph._pred)
+
+    copied = {"succ": set(), "pred": set()}
+    for source, target, element in toggles:
+        for node in (source, target):
+            if node not in res._node:
+                res._node[node] = {}
+                res._succ[node] = {}
+                res._pred[node] = {}
+                copied["succ"].add(node)
+                copied["pred"].add(node)
+        if source not in copied["succ"]:
+            res._succ[source] = dict(res._succ[source])
+            copied["succ"].add(source)
+        if target not in copied["pred"]:
+            res._pred[target] = dict(res._pred[target])
+            copied["pred"].add(target)
+
+        if target in res._succ[source]:
+            del res._succ[source][target]
+            del res._pred[target][source]
+        else:
+            attr = {"element": element}
+            res._succ[source][target] = attr
+            res._pred[target][source] = attr
+
+    for node in copied["succ"] | copied["pred"]:
+        if not res._succ[node] and not res._pred[node]:
+            del res._node[node], res._succ[node], res._pred[node]
+    return res
+
+
+class SnapshotCache:
+    """Least recently used graphs of snapshots, bounded by edges.
+
+    Attributes:
+        max_edges (int): maximum total number of edges in cached graphs.
+        edges (int): total number of edges in cached graphs.
+        hits (int): number of snapshots found in the cache.
+        misses (int): number of snapshots not found in the cache.
+        reuses (int): number of misses, which are built from a cached
+            ancestor.
+    """
+
+    def __init__(self, max_edges: int):
+        """Initialise an empty cache.
+
+        Args:
+            max_edges: maximum total number of edges in cached graphs.
+        """
+        self.max_edges = max_edges
+        self.edges = 0
+        self.hits = 0
+        self.misses = 0
+        self.reuses = 0
+        self._graphs = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.RLock()
+
+    def __contains__(self, snapshot: str) -> bool:
+        """Check if the graph of a snapshot is cached.
+
+        Args:
+            snapshot: name of a snapshot.
+
+        Returns:
+            Whether the graph of the snapshot is cached.
+        """
+        return snapshot in self._graphs
+
+    def __len__(self) -> int:
+        """Count cached graphs.
+
+        Returns:
+            Number of cached graphs.
+        """
+        return len(self._graphs)
+
+    def get(self, snapshot: str) -> Optional[nx.DiGraph]:
+        """Get the graph of a snapshot and count a hit or a miss.
+
+        Args:
+            snapshot: name of a snapshot.
+
+        Returns:
+            The frozen graph, or None if it is not cached.
+        """
+        with self._lock:
+            graph = self._graphs.get(snapshot)
+            if graph is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._graphs.move_to_end(snapshot)
+        return graph
+
+    def put(self, snapshot: str, graph: nx.DiGraph) -> nx.DiGraph:
+        """Cache the graph of a snapshot and evict the least recent ones.
+
+        Note:
+            The graph is frozen, so it cannot be modified by anyone
+            sharing it. A graph larger than the cache is not cached.
+
+        Args:
+            snapshot: name of a committed snapshot.
+            graph: graph of the snapshot.
+
+        Returns:
+            The frozen graph.
+        """
+        graph = nx.freeze(graph)
+        size = graph.number_of_edges()
+        if size > self.max_edges:
+            LOGGER.debug(f'Snapshot "{snapshot}" is too large to be cached.')
+            return graph
+
+        with self._lock:
+            self.discard([snapshot])
+            self._graphs[snapshot] = graph
+            self._sizes[snapshot] = size
+            self.edges += size
+            while self.edges > self.max_edges:
+                evicted, _ = self._graphs.popitem(last=False)
+                self.edges -= self._sizes.pop(evicted)
+        return graph
+
+    def reuse(self, snapshot: str) -> Optional[nx.DiGraph]:
+        """Get the graph of an ancestor and count a reuse.
+
+        Args:
+            snapshot: name of a cached snapshot.
+
+        Returns:
+            The frozen graph, or None if it is not cached.
+        """
+        with self._lock:
+            graph = self._graphs.get(snapshot)
+            if graph is not None:
+                self.reuses += 1
+        return graph
+
+    def discard(self, snapshots: Iterable[str]):
+        """Drop graphs of some snapshots if they are cached.
+
+        Args:
+            snapshots: names of snapshots.
+        """
+        with self._lock:
+            for snapshot in snapshots:
+                if self._graphs.pop(snapshot, None) is not None:
+                    self.edges -= self._sizes.pop(snapshot)
+
+    def clear(self):
+        """Drop all the cached graphs, but keep the counters."""
+        with self._lock:
+            self._graphs.clear()
+            self._sizes.clear()
+            self.edges = 0
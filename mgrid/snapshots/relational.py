@@ -1,71 +1,469 @@
-"""Store snapshots for a graph in an SQLite database."""
+"""Store snapshots for a graph in an SQLite database.
+
+Every snapshot is stored as an increment, which is a set of events.
+Each event toggles one edge, so a snapshot is the symmetric difference
+between its own increment and increments of all the snapshots it is
+linked to, directly or not. Snapshot "head" is empty, and all the other
+snapshots are linked to it eventually.
+
+Names of nodes and snapshots are interned as integer keys, so events
+and links only hold integers. Names are translated in bulk, when edges
+are written or read.
+
+A new snapshot is posed as a pending one, which is modified in an open
+transaction until it is committed or rolled back. Queries to read
+snapshots do not end the transaction. In the pooled mode, other threads
+read committed snapshots through their own read-only connections, which
+are not blocked by the pending snapshot.
+
+To bound the cost of reading snapshots with a long history, some
+snapshots are **checkpoints**, whose entire edge sets are materialised.
+A snapshot is read from its checkpoint ancestor covering most events,
+plus increments not covered by that checkpoint.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import partial
+import gc
+from itertools import islice
 import pathlib
 import sqlite3
-from typing import Generator, List, Optional, Set, Tuple, Union
+import threading
+from time import perf_counter
+from typing import Iterable, List, Optional, Set, Tuple, Union
 
 import networkx as nx
+from pandas.core.frame import DataFrame
 
 from mgrid.log import LOGGER
+from mgrid.snapshots.cache import derive, SnapshotCache
+
+SCHEMA_VERSION = 1  #: version of the schema in ``PRAGMA user_version``
 
 INIT_TABLES = """
+    CREATE TABLE nodes (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    );
+
     CREATE TABLE edges (
-        source TEXT,
-        target TEXT,
+        id INTEGER PRIMARY KEY,
+        source INTEGER NOT NULL,
+        target INTEGER NOT NULL,
         element INTEGER,
-        PRIMARY KEY (source, target)
+        UNIQUE (source, target),
+        FOREIGN KEY (source) REFERENCES nodes (id),
+        FOREIGN KEY (target) REFERENCES nodes (id)
     );
-    CREATE UNIQUE INDEX edges_inv ON edges (target, source);
 
-    CREATE TABLE snapshots (name TEXT PRIMARY KEY);
+    CREATE TABLE snapshots (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    );
 
     CREATE TABLE events (
-        snapshot TEXT NOT NULL,
-        source TEXT NOT NULL,
-        target TEXT NOT NULL,
-        FOREIGN KEY (snapshot) REFERENCES snapshots (name),
-        FOREIGN KEY (source, target) REFERENCES edges (source, target)
-    );
+        snapshot INTEGER NOT NULL,
+        edge INTEGER NOT NULL,
+        PRIMARY KEY (snapshot, edge),
+        FOREIGN KEY (snapshot) REFERENCES snapshots (id),
+        FOREIGN KEY (edge) REFERENCES edges (id)
+    ) WITHOUT ROWID;
 
     CREATE TABLE links (
-        snapshot TEXT NOT NULL,
-        link TEXT NOT NULL,
-        FOREIGN KEY (snapshot) REFERENCES snapshots (name),
-        FOREIGN KEY (link) REFERENCES snapshots (name)
+        snapshot INTEGER NOT NULL,
+        link INTEGER NOT NULL,
+        FOREIGN KEY (snapshot) REFERENCES snapshots (id),
+        FOREIGN KEY (link) REFERENCES snapshots (id)
     );
+    CREATE INDEX links_snapshot ON links (snapshot);
+
+    CREATE TABLE checkpoints (
+        snapshot INTEGER PRIMARY KEY,
+        events INTEGER NOT NULL,
+        FOREIGN KEY (snapshot) REFERENCES snapshots (id)
+    );
+
+    CREATE TABLE checkpoint_edges (
+        snapshot INTEGER NOT NULL,
+        edge INTEGER NOT NULL,
+        PRIMARY KEY (snapshot, edge),
+        FOREIGN KEY (snapshot) REFERENCES checkpoints (snapshot),
+        FOREIGN KEY (edge) REFERENCES edges (id)
+    ) WITHOUT ROWID;
 """
 
+#: secondary indices, which can be built after a bulk ingest
+INDICES = {
+    "edges_inv": "CREATE INDEX edges_inv ON edges (target, source);",
+    "events_edge": "CREATE INDEX events_edge ON events (edge, snapshot);",
+}
+
+#: migration from the schema keyed by names, where checkpoints are
+#: dropped, and duplicated events of the same edge cancel each other
+MIGRATE_V0 = (
+    """
+    BEGIN;
+    DROP TABLE IF EXISTS checkpoint_edges;
+    DROP TABLE IF EXISTS checkpoints;
+    DROP INDEX IF EXISTS edges_inv;
+    DROP INDEX IF EXISTS links_snapshot;
+    DROP INDEX IF EXISTS events_snapshot;
+    DROP INDEX IF EXISTS events_edge;
+    ALTER TABLE edges RENAME TO edges_v0;
+    ALTER TABLE snapshots RENAME TO snapshots_v0;
+    ALTER TABLE events RENAME TO events_v0;
+    ALTER TABLE links RENAME TO links_v0;
+"""
+    + INIT_TABLES
+    + "".join(INDICES.values())
+    + f"""
+    INSERT INTO nodes (name)
+    SELECT source FROM edges_v0 UNION SELECT target FROM edges_v0;
+
+    INSERT INTO edges (source, target, element)
+    SELECT s.id, t.id, edges_v0.element FROM edges_v0
+    JOIN nodes AS s ON s.name = edges_v0.source
+    JOIN nodes AS t ON t.name = edges_v0.target;
+
+    INSERT INTO snapshots (name)
+    SELECT name FROM snapshots_v0 ORDER BY rowid;
+
+    INSERT INTO links (snapshot, link)
+    SELECT s.id, l.id FROM links_v0
+    JOIN snapshots AS s ON s.name = links_v0.snapshot
+    JOIN snapshots AS l ON l.name = links_v0.link;
+
+    INSERT INTO events (snapshot, edge)
+    SELECT snapshots.id, edges.id FROM events_v0
+    JOIN snapshots ON snapshots.name = events_v0.snapshot
+    JOIN nodes AS s ON s.name = events_v0.source
+    JOIN nodes AS t ON t.name = events_v0.target
+    JOIN edges ON edges.source = s.id AND edges.target = t.id
+    GROUP BY snapshots.id, edges.id
+    HAVING (COUNT(*) % 2) > 0;
+
+    DROP TABLE links_v0;
+    DROP TABLE events_v0;
+    DROP TABLE snapshots_v0;
+    DROP TABLE edges_v0;
+    PRAGMA user_version = {SCHEMA_VERSION};
+    COMMIT;
+"""
+)
+
+CHUNK_SIZE = 50000  #: rows per ``executemany`` in bulk ingest
+
+CHECKPOINT_EVENTS = 100000  #: default events between checkpoints
+
+#: the integer key of a snapshot by its name
+SNAPSHOT_ID = "(SELECT id FROM snapshots WHERE name = :snapshot)"
+
+#: all the snapshots linked to a snapshot, including itself
+SELECT_ANCESTORS = """
+    WITH RECURSIVE ancestors (id) AS (
+        SELECT id FROM snapshots WHERE name = :snapshot
+        UNION
+        SELECT links.link FROM links
+        JOIN ancestors ON links.snapshot = ancestors.id
+    )
+"""
+
+#: increments not covered by a checkpoint, which covers nothing if NULL
+UNCOVERED = """
+    covered (id) AS (
+        SELECT id FROM snapshots WHERE name = :checkpoint
+        UNION
+        SELECT links.link FROM links
+        JOIN covered ON links.snapshot = covered.id
+    ),
+    uncovered (id) AS (
+        SELECT id FROM {increments}
+        EXCEPT SELECT id FROM covered
+    )
+"""
+
+#: edges toggled an odd number of times by some increments, starting from
+#: edges in a checkpoint
+TOGGLED = (
+    UNCOVERED
+    + """,
+    toggled (edge) AS (
+        SELECT edge FROM (
+            SELECT edge FROM checkpoint_edges
+            WHERE snapshot = (
+                SELECT id FROM snapshots WHERE name = :checkpoint
+            )
+            UNION ALL
+            SELECT edge FROM events
+            WHERE snapshot IN (SELECT id FROM uncovered)
+        )
+        GROUP BY edge
+        HAVING (COUNT(*) % 2) > 0
+    )
+"""
+)
+
+#: edges in a snapshot, where names are joined after grouping, so only
+#: remaining edges are searched
+SELECT_EDGES = (
+    SELECT_ANCESTORS
+    + ","
+    + TOGGLED.format(increments="ancestors")
+    + """
+    SELECT s.name, t.name, edges.element FROM toggled
+    JOIN edges ON edges.id = toggled.edge
+    JOIN nodes AS s ON s.id = edges.source
+    JOIN nodes AS t ON t.id = edges.target;
+"""
+)
+
+#: edges toggled by increments linked to a snapshot, which are not covered
+#: by another snapshot
+SELECT_TOGGLES = (
+    SELECT_ANCESTORS
+    + ","
+    + UNCOVERED.format(increments="ancestors")
+    + """,
+    toggled (edge) AS (
+        SELECT edge FROM events
+        WHERE snapshot IN (SELECT id FROM uncovered)
+        GROUP BY edge
+        HAVING (COUNT(*) % 2) > 0
+    )
+    SELECT s.name, t.name, edges.element FROM toggled
+    JOIN edges ON edges.id = toggled.edge
+    JOIN nodes AS s ON s.id = edges.source
+    JOIN nodes AS t ON t.id = edges.target;
+"""
+)
+
+#: edges differing between two snapshots, where increments shared by both
+#: cancel out, and an edge in snapshot A is removed by snapshot B
+SELECT_DIFF = """
+    WITH RECURSIVE
+    a_ancestors (id) AS (
+        SELECT id FROM snapshots WHERE name = :a
+        UNION
+        SELECT links.link FROM links
+        JOIN a_ancestors ON links.snapshot = a_ancestors.id
+    ),
+    b_ancestors (id) AS (
+        SELECT id FROM snapshots WHERE name = :b
+        UNION
+        SELECT links.link FROM links
+        JOIN b_ancestors ON links.snapshot = b_ancestors.id
+    ),
+    exclusive (id) AS (
+        SELECT id FROM (
+            SELECT id FROM a_ancestors
+            UNION ALL SELECT id FROM b_ancestors
+        )
+        GROUP BY id HAVING COUNT(*) = 1
+    ),
+    changed (edge) AS (
+        SELECT edge FROM events
+        WHERE snapshot IN (SELECT id FROM exclusive)
+        GROUP BY edge
+        HAVING (COUNT(*) % 2) > 0
+    )
+    SELECT s.name, t.name, edges.element, (
+        SELECT COUNT(*) % 2 = 0 FROM events
+        WHERE events.edge = changed.edge
+            AND events.snapshot IN (SELECT id FROM a_ancestors)
+    )
+    FROM changed
+    JOIN edges ON edges.id = changed.edge
+    JOIN nodes AS s ON s.id = edges.source
+    JOIN nodes AS t ON t.id = edges.target;
+"""
+
+#: statements to fold the increment of snapshot X into its only child C,
+#: where events in both cancel out, and links of X are inherited by C
+FOLD = [
+    "UPDATE OR IGNORE events SET snapshot = :c WHERE snapshot = :x;",
+    """
+    DELETE FROM events WHERE snapshot = :c
+        AND edge IN (SELECT edge FROM events WHERE snapshot = :x);
+    """,
+    "DELETE FROM events WHERE snapshot = :x;",
+    "DELETE FROM links WHERE snapshot = :c AND link = :x;",
+    """
+    INSERT INTO links (snapshot, link)
+    SELECT :c, link FROM links WHERE snapshot = :x
+        AND link NOT IN (SELECT link FROM links WHERE snapshot = :c);
+    """,
+    "DELETE FROM links WHERE snapshot = :x;",
+    "DELETE FROM checkpoint_edges WHERE snapshot = :x;",
+    "DELETE FROM checkpoints WHERE snapshot = :x;",
+    "DELETE FROM snapshots WHERE id = :x;",
+]
+
+#: statements to delete edges and nodes, which are no longer referred to
+PRUNE = [
+    """
+    DELETE FROM edges
+    WHERE id NOT IN (SELECT edge FROM events)
+        AND id NOT IN (SELECT edge FROM checkpoint_edges);
+    """,
+    """
+    DELETE FROM nodes
+    WHERE id NOT IN (SELECT source FROM edges)
+        AND id NOT IN (SELECT target FROM edges);
+    """,
+]
+
+#: ancestors of a snapshot from the latest to the earliest
+SELECT_LATEST = (
+    SELECT_ANCESTORS
+    + """
+    SELECT snapshots.name FROM ancestors
+    JOIN snapshots ON snapshots.id = ancestors.id
+    WHERE snapshots.name != :snapshot
+    ORDER BY snapshots.id DESC;
+"""
+)
+
+#: the checkpoint ancestor of a snapshot covering most events
+SELECT_CHECKPOINT = (
+    SELECT_ANCESTORS
+    + """
+    SELECT snapshots.name FROM checkpoints
+    JOIN ancestors ON checkpoints.snapshot = ancestors.id
+    JOIN snapshots ON snapshots.id = checkpoints.snapshot
+    ORDER BY checkpoints.events DESC LIMIT 1;
+"""
+)
+
+#: number of events linked to a snapshot not covered by a checkpoint, where
+#: its own increment is not counted, because it is read as fast as a
+#: checkpoint
+COUNT_UNCOVERED = (
+    SELECT_ANCESTORS
+    + ","
+    + UNCOVERED.format(increments="ancestors")
+    + f"""
+    SELECT COUNT(*) FROM events
+    WHERE snapshot IN (
+        SELECT id FROM uncovered WHERE id != {SNAPSHOT_ID}
+    );
+"""
+)
+
+
+@dataclass
+class Compaction:
+    """Report of a compaction of snapshots."""
+
+    squashed: List[str]  #: names of snapshots squashed into their children
+    bytes_before: int  #: size of the database before the compaction
+    bytes_after: int  #: size of the database after the compaction
+    seconds_before: float  #: time to reconstruct absorbing snapshots before
+    seconds_after: float  #: time to reconstruct absorbing snapshots after
+
+    @property
+    def bytes_reclaimed(self) -> int:
+        """Get the number of reclaimed bytes.
+
+        Returns:
+            Difference in the size of the database.
+        """
+        return self.bytes_before - self.bytes_after
+
+
+@contextmanager
+def _gc_paused():
+    """Pause garbage collection while building large graphs.
+
+    Millions of new attribute dictionaries trigger garbage collection
+    again and again in vain.
+
+    Yields:
+        Nothing, while garbage collection is paused.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
 
 class GraphSnapshots:
     """Database for snapshots of a directed graph.
 
     Attributes:
-        cursor (Union[sqlite3.Cursor, None]): a temporary cursor.
+        cursor (Union[sqlite3.Cursor, None]): a temporary cursor for the
+            pending snapshot.
+        pending (Union[str, None]): name of the pending snapshot.
+        checkpoint_events (Union[int, None]): a committed snapshot
+            becomes a checkpoint, if at least this number of events in
+            its linked increments are not covered by any checkpoint.
+            None to disable.
+        cache (Union[SnapshotCache, None]): recently read graphs of
+            committed snapshots, with counters of hits and misses.
+        executor (Union[ThreadPoolExecutor, None]): reader threads for
+            asynchronous reads in the pooled mode.
     """
 
-    def __init__(self, path: str):
+    def __init__(
+        self,
+        path: str,
+        checkpoint_events: Optional[int] = CHECKPOINT_EVENTS,
+        cache_edges: Optional[int] = None,
+        readers: Optional[int] = None,
+    ):
         """Initialise an object for a database for snapshots.
 
-        If the path is not directed to a database file.
+        If the path is not directed to a database file. An existing
+        database in an earlier schema is migrated.
 
         Args:
             path: to the database file.
+            checkpoint_events: minimum number of uncovered events for a
+                new checkpoint. None to create checkpoints manually.
+            cache_edges: maximum total number of edges in cached
+                graphs. None to disable the cache.
+            readers: number of reader threads in the pooled mode, where
+                every other thread than the creating one reads through
+                its own read-only connection. None to disable it.
         """
         if path == ":memory:":
             self.conn = self._init_conn(path)
             self._init_tables()
         elif pathlib.Path(path).is_file() and path.endswith(".db"):
             self.conn = self._init_conn(path)
+            self._migrate()
         elif not pathlib.Path(path).exists() and path.endswith(".db"):
             self.conn = self._init_conn(path)
             self._init_tables()
 
         self.cursor = None
-        self.pending_snapshot = None
+        self.pending = None
+        self.checkpoint_events = checkpoint_events
+        self.cache = None
+        if cache_edges is not None:
+            self.cache = SnapshotCache(cache_edges)
+
+        self.path = path
+        self.executor = None
+        self._owner = threading.get_ident()
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        if readers is not None:
+            self._init_pool(readers)
 
     def _init_tables(self):
         """Initialise tables in a database for snapshots."""
         with self.conn:
-            self.conn.executescript(INIT_TABLES)
+            self.conn.executescript(
+                INIT_TABLES
+                + "".join(INDICES.values())
+                + f"PRAGMA user_version = {SCHEMA_VERSION};"
+            )
             LOGGER.info(
                 "A new database for snapshots of a graph has been initiated."
             )
@@ -75,6 +473,114 @@ class GraphSnapshots:
                 'A new snapshot "head" without any link has been posed.'
             )
 
+    def _migrate(self):
+        """Migrate an existing database to the current schema."""
+        version = self.conn.execute("PRAGMA user_version;").fetchone()[0]
+        if version == 0:
+            self.conn.executescript(MIGRATE_V0)
+            LOGGER.info(
+                f"The database has been migrated to schema {SCHEMA_VERSION}."
+            )
+        elif version != SCHEMA_VERSION:
+            LOGGER.critical(f"Schema {version} of the database is unknown.")
+
+    def _init_pool(self, readers: int):
+        """Switch to the pooled mode for concurrent readers.
+
+        Note:
+            In WAL journal mode, readers of committed snapshots are not
+            blocked by a pending snapshot, and vice versa.
+
+        Args:
+            readers: number of reader threads.
+        """
+        if self.path == ":memory:":
+            LOGGER.error("An in-memory database cannot be pooled.")
+            return
+        self.conn.execute("PRAGMA journal_mode = WAL;")
+        self.executor = ThreadPoolExecutor(
+            max_workers=readers, thread_name_prefix="snapshots"
+        )
+        LOGGER.info(f"Snapshots are read by {readers} threads.")
+
+    def _reader(self) -> sqlite3.Connection:
+        """Get the connection for reading in the current thread.
+
+        Note:
+            The creating thread reads through the main connection, so it
+            can read its pending snapshot. Without the pooled mode, all
+            the threads share the main connection.
+
+        Returns:
+            Connection to the database.
+        """
+        if self.executor is None or threading.get_ident() == self._owner:
+            return self.conn
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            path = pathlib.Path(self.path).resolve().as_uri()
+            conn = sqlite3.connect(
+                f"{path}?mode=ro", uri=True, check_same_thread=False
+            )
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    async def read_async(
+        self, snapshot: str, create_using=None
+    ) -> Optional[nx.DiGraph]:
+        """Read a snapshot in a reader thread without blocking the loop.
+
+        Note:
+            Without the pooled mode, the snapshot is read in the
+            current thread, which blocks the loop.
+
+        Args:
+            snapshot: the name of a committed snapshot.
+            create_using: graph type or instance to be filled.
+
+        Returns:
+            A ``networkx`` directed graph, or None if the snapshot does
+            not exist.
+        """
+        if self.executor is None:
+            return self.read(snapshot, create_using)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, partial(self.read, snapshot, create_using)
+        )
+
+    async def diff_async(self, a: str, b: str) -> Optional[DataFrame]:
+        """Compare two snapshots in a reader thread.
+
+        Args:
+            a: the name of the snapshot before.
+            b: the name of the snapshot after.
+
+        Returns:
+            Edges added or removed from snapshot A to snapshot B, or None
+            if any snapshot does not exist.
+        """
+        if self.executor is None:
+            return self.diff(a, b)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, partial(self.diff, a, b)
+        )
+
+    def close(self):
+        """Stop reader threads and close all the connections."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+        self.conn.close()
+
     @staticmethod
     def _init_conn(path: str) -> sqlite3.Connection:
         """Initialise database connection.
@@ -99,12 +605,15 @@ class GraphSnapshots:
         Returns:
             A set of all the directly linked snapshots.
         """
-        with self.conn:
-            links = self.conn.execute(
-                "SELECT * FROM links WHERE snapshot = :snapshot",
-                {"snapshot": snapshot},
-            ).fetchmany()
-            res = {link[1] for link in links}
+        links = self._reader().execute(
+            f"""
+            SELECT snapshots.name FROM links
+            JOIN snapshots ON snapshots.id = links.link
+            WHERE links.snapshot = {SNAPSHOT_ID};
+            """,
+            {"snapshot": snapshot},
+        ).fetchall()
+        res = {link[0] for link in links}
 
         if len(res) == 0:
             LOGGER.critical(f'Snapshot "{snapshot}" has no link.')
@@ -114,49 +623,485 @@ class GraphSnapshots:
     def _get_links(self, snapshot: str) -> Set[str]:
         """Get all the links of a given snapshot.
 
+        Note:
+            All the ancestors are resolved by one recursive query, where
+            ``UNION`` discards visited snapshots, so shared ancestors
+            are not walked again.
+
         Args:
             snapshot: the name of an existing snapshot.
 
         Returns:
             A set of all the linked snapshots.
         """
-        checked = {"head"}
-        links = self._select_direct_links(snapshot)
-        while len(links - checked) > 0:
-            poped = (links - checked).pop()
-            checked.update(poped)
-            links.update(self._select_direct_links(poped))
+        query = (
+            SELECT_ANCESTORS
+            + """
+            SELECT snapshots.name FROM ancestors
+            JOIN snapshots ON snapshots.id = ancestors.id;
+            """
+        )
+        rows = self._reader().execute(query, {"snapshot": snapshot})
+        links = {row[0] for row in rows} - {snapshot}
 
-        LOGGER.debug(f'Snapshot "{snapshot}" is linked to "{links}".')
+        if len(links) == 0:
+            LOGGER.critical(f'Snapshot "{snapshot}" has no link.')
+        else:
+            LOGGER.debug(
+                f'Snapshot "{snapshot}" is linked to {len(links)} snapshots.'
+            )
         return links
 
-    # def read(self, snapshot: str) -> nx.DiGraph:
-    #     """Get the corresponding directed graph of a snapshot.
+    def _exists(self, snapshot: str) -> bool:
+        """Check if a snapshot exists.
 
-    #     Args:
-    #         snapshot: the name of an existing snapshot.
+        Args:
+            snapshot: the name of a snapshot.
 
-    #     Returns:
-    #         A ``networkx`` directed graph.
-    #     """
-    #     increments = self._get_links(snapshot)
-    #     self.gather_events(increments)
+        Returns:
+            Whether the snapshot exists.
+        """
+        row = self._reader().execute(
+            "SELECT 1 FROM snapshots WHERE name = :name", {"name": snapshot}
+        ).fetchone()
+        return row is not None
+
+    def _nearest_checkpoint(self, snapshot: str) -> Optional[str]:
+        """Find the checkpoint ancestor covering most events.
+
+        Args:
+            snapshot: the name of an existing snapshot.
+
+        Returns:
+            Name of the checkpoint, which can be the snapshot itself, or
+            None if there is no checkpoint ancestor.
+        """
+        row = self._reader().execute(
+            SELECT_CHECKPOINT, {"snapshot": snapshot}
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def checkpoint(self, snapshot: str):
+        """Materialise all the edges of a committed snapshot.
+
+        Note:
+            Checkpoints are committed at once, so they cannot be taken
+            while a snapshot is pending.
+
+        Args:
+            snapshot: the name of an existing snapshot.
+        """
+        if self.cursor is not None:
+            LOGGER.error(
+                f'Snapshot "{self.pending}" must be committed or rolled '
+                "back first."
+            )
+            return
+        if not self._exists(snapshot):
+            LOGGER.error(f'Snapshot "{snapshot}" has not been committed.')
+            return
+        if self._nearest_checkpoint(snapshot) == snapshot:
+            LOGGER.debug(f'Snapshot "{snapshot}" is a checkpoint already.')
+            return
+
+        params = {
+            "snapshot": snapshot,
+            "checkpoint": self._nearest_checkpoint(snapshot),
+        }
+        with self.conn:
+            events = self.conn.execute(
+                SELECT_ANCESTORS
+                + """
+                SELECT COUNT(*) FROM events
+                WHERE snapshot IN (SELECT id FROM ancestors);
+                """,
+                params,
+            ).fetchone()[0]
+            self.conn.execute(
+                "INSERT INTO checkpoints (snapshot, events) "
+                f"VALUES ({SNAPSHOT_ID}, :events);",
+                {"snapshot": snapshot, "events": events},
+            )
+            self.conn.execute(
+                SELECT_ANCESTORS
+                + ","
+                + TOGGLED.format(increments="ancestors")
+                + f"""
+                INSERT INTO checkpoint_edges (snapshot, edge)
+                SELECT {SNAPSHOT_ID}, edge FROM toggled;
+                """,
+                params,
+            )
+        LOGGER.info(
+            f'Snapshot "{snapshot}" covering {events} events has become a '
+            "checkpoint."
+        )
+
+    def _read(self, snapshot: str, create_using=None) -> nx.DiGraph:
+        """Reconstruct the graph of a snapshot from the database.
+
+        Note:
+            Reading starts from the checkpoint ancestor covering most
+            events, if any. Rows of edges are streamed from a cursor
+            into the graph, without being gathered in a list first.
+
+        Args:
+            snapshot: the name of an existing snapshot.
+            create_using: graph type or instance to be filled.
+
+        Returns:
+            A ``networkx`` directed graph.
+        """
+        res = nx.empty_graph(0, create_using or nx.DiGraph)
+        params = {
+            "snapshot": snapshot,
+            "checkpoint": self._nearest_checkpoint(snapshot),
+        }
+        rows = self._reader().execute(SELECT_EDGES, params)
+        res.add_edges_from(
+            (source, target, {"element": element})
+            for source, target, element in rows
+        )
+        return res
+
+    def _read_cached(self, snapshot: str) -> nx.DiGraph:
+        """Reconstruct the graph of a snapshot and cache it.
+
+        Note:
+            If an ancestor is cached, the latest one is derived with
+            edges toggled by increments not covered by it.
+
+        Args:
+            snapshot: the name of a committed snapshot.
 
-    def add_edges(self, edges: Generator[Tuple[str, str, int], None, None]):
+        Returns:
+            A frozen ``networkx`` directed graph.
+        """
+        rows = self._reader().execute(SELECT_LATEST, {"snapshot": snapshot})
+        base = next((row[0] for row in rows if row[0] in self.cache), None)
+        if base is None:
+            return self.cache.put(snapshot, self._read(snapshot))
+
+        toggles = self._reader().execute(
+            SELECT_TOGGLES, {"snapshot": snapshot, "checkpoint": base}
+        )
+        res = derive(self.cache.reuse(base), toggles)
+        return self.cache.put(snapshot, res)
+
+    def read(
+        self, snapshot: str, create_using=None
+    ) -> Optional[nx.DiGraph]:
+        """Get the corresponding directed graph of a snapshot.
+
+        Note:
+            The index of the element is the edge attribute ``element``,
+            which is the only attribute stored. Without layers, a graph
+            like :class:`mgrid.graph.geographic.GeoGraph` cannot be
+            restored from a snapshot.
+
+            With the cache, graphs of committed snapshots are frozen and
+            shared, unless ``create_using`` is given, where a copy is
+            returned.
+
+        Args:
+            snapshot: the name of an existing snapshot, which can be the
+                pending one.
+            create_using: graph type or instance to be filled. Default
+                to be ``nx.DiGraph``.
+
+        Returns:
+            A ``networkx`` directed graph, or None if the snapshot does
+            not exist.
+        """
+        if not self._exists(snapshot):
+            LOGGER.error(f'Snapshot "{snapshot}" does not exist.')
+            return None
+
+        if self.cache is None or snapshot == self.pending:
+            with _gc_paused():
+                res = self._read(snapshot, create_using)
+        else:
+            res = self.cache.get(snapshot)
+            with _gc_paused():
+                if res is None:
+                    res = self._read_cached(snapshot)
+                if create_using is not None:
+                    graph = res
+                    res = nx.empty_graph(0, create_using)
+                    res.add_edges_from(graph.edges(data=True))
+        LOGGER.debug(f'Snapshot "{snapshot}" has been read.')
+        return res
+
+    def diff(self, a: str, b: str) -> Optional[DataFrame]:
+        """Compare two snapshots without reconstructing them.
+
+        Note:
+            Increments linked to both snapshots cancel out, so only
+            events in the others are grouped. For each changed edge,
+            its existence in snapshot A is checked by its own events.
+
+        Args:
+            a: the name of the snapshot before.
+            b: the name of the snapshot after.
+
+        Returns:
+            Edges added or removed from snapshot A to snapshot B, or None
+            if any snapshot does not exist.
+
+            .. csv-table::
+                :header: name, dtype, definition
+
+                source, object, source of the edge
+                target, object, target of the edge
+                element, int64, index of the element
+                added, bool, whether the edge is in B but not in A
+        """
+        for snapshot in (a, b):
+            if not self._exists(snapshot):
+                LOGGER.error(f'Snapshot "{snapshot}" does not exist.')
+                return None
+
+        rows = self._reader().execute(SELECT_DIFF, {"a": a, "b": b}).fetchall()
+        res = DataFrame(rows, columns=["source", "target", "element", "added"])
+        res["added"] = res["added"].astype(bool)
+        LOGGER.debug(
+            f'{len(res)} edges differ from snapshot "{a}" to snapshot "{b}".'
+        )
+        return res
+
+    def _size(self) -> int:
+        """Get the size of the database.
+
+        Returns:
+            Size in bytes.
+        """
+        page_count = self.conn.execute("PRAGMA page_count;").fetchone()[0]
+        page_size = self.conn.execute("PRAGMA page_size;").fetchone()[0]
+        return page_count * page_size
+
+    def _time_reconstruction(self, snapshots: Iterable[str]) -> float:
+        """Time reconstructing edges of snapshots in SQL.
+
+        Args:
+            snapshots: names of existing snapshots.
+
+        Returns:
+            Duration in seconds.
+        """
+        start = perf_counter()
+        for snapshot in snapshots:
+            params = {
+                "snapshot": snapshot,
+                "checkpoint": self._nearest_checkpoint(snapshot),
+            }
+            self.conn.execute(SELECT_EDGES, params).fetchall()
+        return perf_counter() - start
+
+    def compact(
+        self, keep: Iterable[str], checkpoint: bool = False
+    ) -> Optional[Compaction]:
+        """Squash linear history into snapshots to keep.
+
+        Note:
+            Every snapshot not to keep with exactly one child is folded
+            into that child, whose increment becomes the symmetric
+            difference of both, and whose links are inherited. Reading
+            any remaining snapshot gives the same graph. Edges and nodes
+            no longer referred to are deleted, and the database is
+            vacuumed.
+
+        Args:
+            keep: names of snapshots, which stay readable. Snapshot
+                "head" is always kept.
+            checkpoint: whether snapshots absorbing increments become
+                checkpoints.
+
+        Returns:
+            Report of the compaction, or None if a snapshot is pending.
+        """
+        if self.cursor is not None:
+            LOGGER.error(
+                f'Snapshot "{self.pending}" must be committed or rolled '
+                "back first."
+            )
+            return None
+
+        keep = set(keep) | {"head"}
+        children = """
+            SELECT links.snapshot, snapshots.name FROM links
+            JOIN snapshots ON snapshots.id = links.snapshot
+            WHERE links.link = :x;
+        """
+        squashed = {}
+        for x, name in self.conn.execute("SELECT id, name FROM snapshots;"):
+            rows = self.conn.execute(children, {"x": x}).fetchall()
+            if name not in keep and len(rows) == 1:
+                squashed[name] = (x, rows[0][1])
+        absorbing = set()
+        for _, child in squashed.values():
+            while child in squashed:
+                child = squashed[child][1]
+            absorbing.add(child)
+
+        bytes_before = self._size()
+        seconds_before = self._time_reconstruction(absorbing)
+        with self.conn:
+            for x, _ in squashed.values():
+                # The child can have been folded into a grandchild.
+                c = self.conn.execute(children, {"x": x}).fetchone()[0]
+                for statement in FOLD:
+                    self.conn.execute(statement, {"x": x, "c": c})
+            for statement in PRUNE:
+                self.conn.execute(statement)
+        self.conn.execute("VACUUM;")
+        if self.cache is not None:
+            self.cache.discard(squashed)
+        if checkpoint:
+            for snapshot in absorbing:
+                self.checkpoint(snapshot)
+
+        res = Compaction(
+            squashed=list(squashed),
+            bytes_before=bytes_before,
+            bytes_after=self._size(),
+            seconds_before=seconds_before,
+            seconds_after=self._time_reconstruction(absorbing),
+        )
+        LOGGER.info(
+            f"{len(res.squashed)} snapshots have been squashed, and "
+            f"{res.bytes_reclaimed} bytes have been reclaimed."
+        )
+        return res
+
+    def _stage(
+        self, edges: Iterable[Tuple[str, str, Optional[int]]], chunk_size: int
+    ) -> int:
+        """Load edges by names into a temporary table in chunks.
+
+        Args:
+            edges: tuples with source, target and element index.
+            chunk_size: number of rows per ``executemany``.
+
+        Returns:
+            Number of staged rows.
+        """
+        self.cursor.execute(
+            "CREATE TEMP TABLE staged (source TEXT, target TEXT, element);"
+        )
+        edges = iter(edges)
+        num_rows = 0
+        chunk = list(islice(edges, chunk_size))
+        while chunk:
+            self.cursor.executemany(
+                "INSERT INTO temp.staged (source, target, element) "
+                "VALUES (?, ?, ?);",
+                chunk,
+            )
+            num_rows += len(chunk)
+            chunk = list(islice(edges, chunk_size))
+        return num_rows
+
+    def _intern(self, insert: bool = True):
+        """Translate staged edges into integer keys in bulk.
+
+        Note:
+            Keys of staged edges are gathered in the temporary table
+            ``wanted``. Without insertion, unknown edges are skipped,
+            which are not in any snapshot anyway.
+
+        Args:
+            insert: whether unknown nodes and edges are inserted.
+        """
+        if insert:
+            self.cursor.execute(
+                """
+                INSERT OR IGNORE INTO nodes (name)
+                SELECT source FROM temp.staged
+                UNION ALL SELECT target FROM temp.staged;
+                """
+            )
+        self.cursor.execute(
+            """
+            CREATE TEMP TABLE keyed AS
+            SELECT s.id AS source, t.id AS target, staged.element
+            FROM temp.staged
+            JOIN nodes AS s ON s.name = staged.source
+            JOIN nodes AS t ON t.name = staged.target;
+            """
+        )
+        if insert:
+            self.cursor.execute(
+                """
+                INSERT OR IGNORE INTO edges (source, target, element)
+                SELECT source, target, element FROM temp.keyed;
+                """
+            )
+        self.cursor.execute(
+            "CREATE TEMP TABLE wanted (edge INTEGER PRIMARY KEY);"
+        )
+        self.cursor.execute(
+            """
+            INSERT OR IGNORE INTO temp.wanted (edge)
+            SELECT edges.id FROM temp.keyed
+            JOIN edges USING (source, target);
+            """
+        )
+        self.cursor.execute("DROP TABLE temp.keyed;")
+        self.cursor.execute("DROP TABLE temp.staged;")
+
+    def _set_edges(
+        self, edges: Iterable[Tuple[str, str, Optional[int]]], parity: int
+    ):
+        """Add or remove edges in the pending snapshot.
+
+        Note:
+            An edge is toggled in the pending increment if and only if
+            its existence differs from that in linked snapshots, so the
+            operation is idempotent.
+
+        Args:
+            edges: tuples with source, target and element index.
+            parity: 1 to add edges, and 0 to remove them.
+        """
+        self._stage(edges, CHUNK_SIZE)
+        self._intern(insert=bool(parity))
+        params = {"snapshot": self.pending, "parity": parity}
+        self.cursor.execute(
+            f"""
+            DELETE FROM events
+            WHERE snapshot = {SNAPSHOT_ID}
+                AND edge IN (SELECT edge FROM temp.wanted);
+            """,
+            params,
+        )
+        self.cursor.execute(
+            f"""
+            INSERT INTO events (snapshot, edge)
+            SELECT {SNAPSHOT_ID}, edge FROM temp.wanted
+            WHERE (
+                SELECT COUNT(*) % 2 FROM events
+                WHERE events.edge = wanted.edge
+                    AND events.snapshot IN (SELECT id FROM temp.linked)
+            ) != :parity;
+            """,
+            params,
+        )
+        self.cursor.execute("DROP TABLE temp.wanted;")
+
+    def add_edges(self, edges: Iterable[Tuple[str, str, int]]):
         """Add multiple edges to the pending snapshot.
 
+        Note:
+            An edge keeps its first element index in the database.
+
         Args:
-            edges: a generator for tuples with three values indicating
+            edges: an iterable for tuples with three values indicating
                 source, target and element index.
         """
         if self.cursor is None:
             LOGGER.error("A new pose must be created first.")
         else:
-            query = """
-                INSERT INTO edges (source, target, element)
-                VALUES(?, ?, ?);
-            """
-            self.cursor.executemany(query, edges)
+            self._set_edges(edges, 1)
 
     def add_edge(self, source: str, target: str, element: Optional[int] = 0):
         """Add a new edge to the pending snapshot.
@@ -166,16 +1111,27 @@ class GraphSnapshots:
             target: the other terminal of the edge.
             element: index of the element representing the edge.
         """
+        self.add_edges([(source, target, element)])
+
+    def remove_edges(self, edges: Iterable[Tuple[str, str]]):
+        """Remove multiple edges from the pending snapshot.
+
+        Args:
+            edges: an iterable for tuples of source and target.
+        """
         if self.cursor is None:
             LOGGER.error("A new pose must be created first.")
         else:
-            query = """
-                INSERT INTO edges (source, target, element)
-                VALUES(:source, :target, :element);
-            """
-            self.cursor.execute(
-                query, {"source": source, "target": target, "element": element}
-            )
+            self._set_edges(((u, v, None) for u, v in edges), 0)
+
+    def remove_edge(self, source: str, target: str):
+        """Remove an edge from the pending snapshot.
+
+        Args:
+            source: one terminal of the edge.
+            target: the other terminal of the edge.
+        """
+        self.remove_edges([(source, target)])
 
     def sym_diff(self, increments: Set[str]) -> Set[Tuple[str, str]]:
         """Gather events from symmetric difference of some increments.
@@ -186,16 +1142,78 @@ class GraphSnapshots:
         Returns:
             A set of edges.
         """
-        with self.conn:
-            query = f"""
-                SELECT source, target FROM events
-                WHERE snapshot IN ({','.join(['?'] * len(increments))})
-                GROUP BY source, target
-                HAVING (COUNT(*) % 2) > 0;
-            """
-            events = self.conn.execute(query, tuple(increments)).fetchall()
+        query = f"""
+            SELECT s.name, t.name FROM (
+                SELECT edge FROM events
+                WHERE snapshot IN (
+                    SELECT id FROM snapshots
+                    WHERE name IN ({','.join(['?'] * len(increments))})
+                )
+                GROUP BY edge
+                HAVING (COUNT(*) % 2) > 0
+            ) AS odd
+            JOIN edges ON edges.id = odd.edge
+            JOIN nodes AS s ON s.id = edges.source
+            JOIN nodes AS t ON t.id = edges.target;
+        """
+        events = self._reader().execute(query, tuple(increments)).fetchall()
         return {event for event in events}
 
+    def _replace_pending(self, num_rows: int, defer_indices: bool = False):
+        """Replace the pending snapshot by staged edges.
+
+        Args:
+            num_rows: number of staged rows.
+            defer_indices: whether secondary indices are dropped and
+                built again, if the staged rows outnumber existing edges.
+        """
+        params = {"snapshot": self.pending}
+        self.cursor.execute(
+            f"DELETE FROM events WHERE snapshot = {SNAPSHOT_ID};", params
+        )
+        checkpoint = self.conn.execute(
+            """
+            SELECT snapshots.name FROM checkpoints
+            JOIN snapshots ON snapshots.id = checkpoints.snapshot
+            WHERE checkpoints.snapshot IN (SELECT id FROM temp.linked)
+            ORDER BY checkpoints.events DESC LIMIT 1;
+            """
+        ).fetchone()
+        params["checkpoint"] = None if checkpoint is None else checkpoint[0]
+
+        deferred = []
+        if defer_indices:
+            num_edges = self.conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM edges;"
+            ).fetchone()[0]
+            if num_rows >= num_edges:
+                deferred = list(INDICES)
+        for index in deferred:
+            self.cursor.execute(f"DROP INDEX IF EXISTS {index};")
+
+        self._intern()
+        self.cursor.execute(
+            "WITH RECURSIVE"
+            + TOGGLED.format(increments="temp.linked")
+            + f""",
+            linked_edges AS (SELECT edge FROM toggled)
+            INSERT INTO events (snapshot, edge)
+            SELECT {SNAPSHOT_ID}, edge FROM (
+                SELECT edge FROM temp.wanted
+                EXCEPT SELECT edge FROM linked_edges
+            )
+            UNION ALL
+            SELECT {SNAPSHOT_ID}, edge FROM (
+                SELECT edge FROM linked_edges
+                EXCEPT SELECT edge FROM temp.wanted
+            );
+            """,
+            params,
+        )
+        self.cursor.execute("DROP TABLE temp.wanted;")
+        for index in deferred:
+            self.cursor.execute(INDICES[index])
+
     def replace_pending_snapshot(self, graph: nx.DiGraph):
         """Replace the entire pending snapshot by a directed graph.
 
@@ -203,28 +1221,82 @@ class GraphSnapshots:
         :meth:`GraphSnapshots.pending_snapshot` using `networkx` and
         feed the modified version back through this function.
 
+        Note:
+            The pending increment is rewritten as the symmetric
+            difference between edges in the graph and those in linked
+            snapshots. Missing element indices are zero.
+
         Args:
             graph: a ``networkx`` directed graph.
         """
-        pass
+        if self.cursor is None:
+            LOGGER.error("A new pose must be created first.")
+            return
+
+        edges = graph.edges(data="element", default=0)
+        self._replace_pending(self._stage(edges, CHUNK_SIZE))
+        LOGGER.debug(
+            f'Pending snapshot "{self.pending}" has been replaced by a graph '
+            f"with {graph.number_of_edges()} edges."
+        )
+
+    def ingest(
+        self,
+        name: str,
+        edges: Iterable[Tuple[str, str, int]],
+        links: Union[str, List[str]] = "head",
+        chunk_size: int = CHUNK_SIZE,
+    ):
+        """Take a new snapshot of many edges in one go.
+
+        Note:
+            - Settings of the connection and the database file, like
+              the journal mode, are not changed.
+            - Edges are staged in chunks and the snapshot is committed
+              in one transaction. If the edges outnumber existing rows,
+              secondary indices are built again after inserting.
+            - Like :meth:`GraphSnapshots.replace_pending_snapshot`,
+              edges missing from the iterable are removed from linked
+              snapshots.
+
+        Args:
+            name: name of the snapshot.
+            edges: tuples with source, target and element index, like
+                rows of an edgelist of a
+                :class:`mgrid.grid.geographic.GeoGrid`.
+            links: other snapshots to which it is linked.
+            chunk_size: number of rows per ``executemany``.
+        """
+        if self.cursor is not None:
+            LOGGER.error(
+                f'Snapshot "{self.pending}" must be committed or rolled '
+                "back first."
+            )
+            return
+
+        self.pose(name, links)
+        num_rows = self._stage(edges, chunk_size)
+        self._replace_pending(num_rows, defer_indices=True)
+        LOGGER.debug(f'{num_rows} edges have been ingested for "{name}".')
+        self.commit()
 
-    # @property
-    # def pending_snapshot(self) -> nx.DiGraph:
-    #     """Get the graph based on the pending snapshot.
+    @property
+    def pending_snapshot(self) -> Optional[nx.DiGraph]:
+        """Get the graph based on the pending snapshot.
 
-    #     Because the increment for the pending snapshot has been inserted
-    #     (but not committed), a graph can be returned efficiently if the
-    #     pending snapshot is forgotten. The pending snapshot is the
-    #     symmetric difference between the pending increment and all the
-    #     linked increments.
+        Because the increment for the pending snapshot has been inserted
+        (but not committed), a graph can be returned efficiently if the
+        pending snapshot is forgotten. The pending snapshot is the
+        symmetric difference between the pending increment and all the
+        linked increments.
 
-    #     Returns:
-    #         A ``networkx`` directed graph based on the pending snapshot.
-    #     """
-    #     if self.cursor is None:
-    #         LOGGER.error('A new pose must be created first.')
-    #     else:
-    #         pass
+        Returns:
+            A ``networkx`` directed graph based on the pending snapshot.
+        """
+        if self.cursor is None:
+            LOGGER.error("A new pose must be created first.")
+            return None
+        return self.read(self.pending)
 
     def pose(self, name: str, links: Union[str, List[str]]):
         """Specify links for a new pending snapshot.
@@ -240,30 +1312,94 @@ class GraphSnapshots:
         Args:
             name: name of the snapshot.
             links: other snapshots to which it is linked.
+
+        Raises:
+            sqlite3.Error: if the snapshot cannot be inserted, like when
+                the name exists, where nothing becomes pending.
         """
-        with self.conn:
-            self.conn.execute(
+        if self.cursor is not None:
+            LOGGER.error(
+                f'Snapshot "{self.pending}" must be committed or rolled '
+                "back first."
+            )
+            return
+
+        if isinstance(links, str):
+            links = [links]
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(
                 "INSERT INTO snapshots (name) VALUES (:name);", {"name": name}
             )
+            cursor.executemany(
+                f"""
+                INSERT INTO links (snapshot, link)
+                SELECT {SNAPSHOT_ID}, id FROM snapshots WHERE name = :link;
+                """,
+                ({"snapshot": name, "link": link} for link in links),
+            )
+            if cursor.rowcount < len(links):
+                LOGGER.error(f"Some of links {links} do not exist.")
 
-            # Insert snapshot links one-by-one.
-            insertion = """
-                INSERT INTO links (snapshot, link) VALUES (:snapshot, :link)
-            """
-            if isinstance(links, str):
-                links = [links]
-            for link in links:
-                self.conn.execute(insertion, {"snapshot": name, "link": link})
-            LOGGER.info(
-                f'A new snapshot "{name}" linked to {links} has been branched.'
+            # Linked snapshots are fixed until the pending one is committed.
+            cursor.execute(
+                "CREATE TEMP TABLE linked (id INTEGER PRIMARY KEY);"
             )
+            cursor.executemany(
+                "INSERT INTO temp.linked (id) "
+                "SELECT id FROM snapshots WHERE name = ?;",
+                ((link,) for link in self._get_links(name)),
+            )
+        except sqlite3.Error:
+            # Nothing is pending, if the snapshot cannot be posed.
+            self.conn.rollback()
+            self.conn.execute("DROP TABLE IF EXISTS temp.linked;")
+            cursor.close()
+            raise
+        self.cursor = cursor
+        self.pending = name
+        LOGGER.info(
+            f'A new snapshot "{name}" linked to {links} has been branched.'
+        )
 
-        self.cursor = self.conn.cursor()
+    def _close_pending(self):
+        """Forget the pending snapshot after committing or rolling back."""
+        self.conn.execute("DROP TABLE IF EXISTS temp.linked;")
+        self.cursor.close()
+        self.cursor = None
+        self.pending = None
 
     def rollback(self):
         """Drop the new snapshot and delete all the modifications."""
-        pass
+        if self.cursor is None:
+            LOGGER.error("There is no pending snapshot.")
+            return
+        self.conn.rollback()
+        LOGGER.info(f'Pending snapshot "{self.pending}" has been dropped.')
+        self._close_pending()
 
     def commit(self):
-        """Take the new snapshot and forbid further modification."""
-        pass
+        """Take the new snapshot and forbid further modification.
+
+        Note:
+            The snapshot becomes a checkpoint if there are too many
+            events in linked increments not covered by checkpoints,
+            based on ``checkpoint_events``. Its own increment is not
+            counted, because it is read as fast as a checkpoint.
+        """
+        if self.cursor is None:
+            LOGGER.error("There is no pending snapshot.")
+            return
+        self.conn.commit()
+        snapshot = self.pending
+        LOGGER.info(f'Snapshot "{snapshot}" has been committed.')
+        self._close_pending()
+
+        if self.checkpoint_events is not None:
+            params = {
+                "snapshot": snapshot,
+                "checkpoint": self._nearest_checkpoint(snapshot),
+            }
+            uncovered = self.conn.execute(COUNT_UNCOVERED, params).fetchone()
+            if uncovered[0] >= self.checkpoint_events:
+                self.checkpoint(snapshot)
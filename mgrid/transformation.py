@@ -1,12 +1,27 @@
-"""Function to convert planar graph to supra graph."""
+"""Function to convert planar graph to supra graph.
+
+A planar graph can be converted to a new supra graph, whose memory is
+about the same as the planar graph, or viewed as a supra graph with
+:class:`SupraGridView`, where nodes and edges are computed on the fly.
+"""
+from collections.abc import Mapping
 from copy import deepcopy
-from itertools import chain
-from statistics import mean
-from typing import Dict, Set, Tuple, Union
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, Iterator, List, Optional, Set, Tuple, Union
 
 import networkx as nx
+import numpy as np
 import pandas as pd
+from pandas.core.frame import DataFrame
+from pandas.core.indexes.base import Index
+from pandas.core.series import Series
 
+from mgrid.graph.compact import (
+    arrays_of,
+    EdgeArrays,
+    tabulate_rows,
+    to_pandas_edgelist,
+)
 from mgrid.graph.geographic import COLUMNS, COLUMNS_DI, GeoGraph
 from mgrid.grid import GeoGrid, SupraGrid
 from mgrid.log import LOGGER
@@ -14,146 +29,1127 @@ from mgrid.log import LOGGER
 COLUMNS_DI_ORIGINAL = ["source_original", "target_original"]
 
 
-def _planar2supra(g: GeoGrid) -> Tuple[SupraGrid, Dict[int, Set[str]]]:
-    """Convert a planar grid to corresponding supra-grid.
+@dataclass
+class GeoDelta:
+    """Change set on a planar graph or grid since it was converted.
+
+    Note:
+        - Only keys are recorded. Data are looked up in the planar graph
+          after modification, while terminals of removed edges and
+          inter-nodes are found in the supra graph.
+        - Removed inter-nodes are expected to be removed from the planar
+          graph together with their intra-edges.
+        - An added edge or conversion element with an existing key
+          replaces the converted one.
+    """
+
+    #: added intra-edges, as pairs of source and target
+    edges_added: List[Tuple[str, str]] = field(default_factory=list)
+    #: removed intra-edges, as pairs of source and target
+    edges_removed: List[Tuple[str, str]] = field(default_factory=list)
+    #: names of planar nodes newly specified as inter-nodes
+    inter_nodes_added: List[str] = field(default_factory=list)
+    #: names of removed inter-nodes
+    inter_nodes_removed: List[str] = field(default_factory=list)
+    #: names of added conversion elements
+    conversions_added: List[str] = field(default_factory=list)
+    #: names of removed conversion elements
+    conversions_removed: List[str] = field(default_factory=list)
+
+
+def _terminal_names(nodes: Series, layers: Series) -> Series:
+    """Name terminals of inter-edges split from inter-nodes.
+
+    Args:
+        nodes: names of inter-nodes in planar graph.
+        layers: layers to which the terminals belong.
+
+    Returns:
+        Names of terminals in supra graph, like ``"{node}_layer{layer}"``.
+    """
+    return nodes.astype(str) + "_layer" + layers.astype(str)
+
+
+def _split_terminals(intra_edges: DataFrame, inter_nodes: Index):
+    """Rename terminals of intra-edges being inter-nodes in place.
+
+    Args:
+        intra_edges: an edgelist of planar graph, which is indexed by
+            original terminals afterwards.
+        inter_nodes: names of inter-nodes.
+    """
+    for col, col_original in zip(COLUMNS_DI, COLUMNS_DI_ORIGINAL):
+        intra_edges[col_original] = intra_edges[col]
+        is_inter = intra_edges[col].isin(inter_nodes).to_numpy()
+        if is_inter.any():
+            # Assigning an array is much faster than ``loc`` with a mask.
+            terminals = intra_edges[col].to_numpy(dtype=object, copy=True)
+            terminals[is_inter] = _terminal_names(
+                intra_edges[col][is_inter], intra_edges["layer"][is_inter]
+            ).to_numpy()
+            intra_edges[col] = terminals
+    intra_edges.set_index(COLUMNS_DI_ORIGINAL, inplace=True)
+
+
+def _inter_edges(inter_nodes: DataFrame) -> DataFrame:
+    """Name terminals of inter-edges.
+
+    Args:
+        inter_nodes: information on inter-nodes of planar graph.
+
+    Returns:
+        Information on inter-edges, like ``inter_edges`` of supra graph.
+    """
+    inter_edges = deepcopy(inter_nodes)
+    for col, col_layer in zip(COLUMNS_DI, COLUMNS):
+        inter_edges[col] = _terminal_names(
+            inter_edges.index.to_series(), inter_edges[col_layer]
+        )
+    inter_edges.index.name = "node"
+    return inter_edges
+
+
+def _add_terminals(dg: nx.DiGraph, inter_edges: DataFrame):
+    """Add terminals of inter-edges to a supra graph.
+
+    Args:
+        dg: the supra graph.
+        inter_edges: information on inter-edges.
+    """
+    for col, col_layer in zip(COLUMNS_DI, COLUMNS):
+        dg.add_nodes_from(
+            (terminal, {"layer": layer, "origin": node})
+            for node, terminal, layer in zip(
+                inter_edges.index, inter_edges[col], inter_edges[col_layer]
+            )
+        )
+
+
+def _add_inter_edges(dg: nx.DiGraph, inter_edges: DataFrame):
+    """Add inter-edges to a supra graph, where terminals exist.
+
+    Args:
+        dg: the supra graph.
+        inter_edges: information on inter-edges.
+    """
+    layers_inter = inter_edges[COLUMNS].mean(axis=1)
+    if "element" in inter_edges:
+        data_inter = [
+            {"layer": layer, "element": element}
+            for layer, element in zip(layers_inter, inter_edges["element"])
+        ]
+    else:
+        data_inter = [{"layer": layer} for layer in layers_inter]
+    dg.add_edges_from(
+        zip(inter_edges[COLUMNS_DI[0]], inter_edges[COLUMNS_DI[1]], data_inter)
+    )
+
+
+def _bus_index(inter_edges: DataFrame) -> DataFrame:
+    """Index terminals of inter-edges by their origins and layers.
+
+    Args:
+        inter_edges: information on inter-edges.
+
+    Returns:
+        Buses keyed by origins and layers, like ``nodes_new`` of supra
+        graph.
+    """
+    origins = inter_edges.index.to_numpy()
+    index = pd.MultiIndex.from_arrays(
+        [
+            np.concatenate([origins, origins]),
+            np.concatenate([inter_edges[col] for col in COLUMNS]),
+        ],
+        names=["origin", "layer"],
+    )
+    buses = np.concatenate([inter_edges[col] for col in COLUMNS_DI])
+    return pd.DataFrame({"bus": buses}, index=index)
+
+
+def _terminal_buses(
+    edges: DataFrame, layer: Union[str, List[str]]
+) -> DataFrame:
+    """Gather terminals of edges with their layers.
+
+    Args:
+        edges: intra-edges or inter-edges in supra graph.
+        layer: column of layer for each of ``COLUMNS_DI``, or one column
+            for both if it is a string.
+
+    Returns:
+        Buses in column ``node`` and their layers in column ``idx``.
+    """
+    layers = [layer] * 2 if isinstance(layer, str) else layer
+    return pd.concat(
+        [
+            edges[[col, col_layer]].set_axis(["node", "idx"], axis=1)
+            for col, col_layer in zip(COLUMNS_DI, layers)
+        ],
+        ignore_index=True,
+    )
+
+
+def _frames(
+    g: GeoGraph, elements: bool = True
+) -> Tuple[DataFrame, DataFrame, Series]:
+    """Find intra-edges, inter-edges and buses of a supra graph.
+
+    Note:
+        Terminals of intra-edges are renamed column by column, using a
+        hash index of inter-nodes, so it takes linear time in the number
+        of edges.
 
     Args:
         g: a planar graph to be converted.
+        elements: whether to gather elements of intra-edges from compact
+            storage. Default to be True.
 
     Returns:
-        Resulted supra-graph.
+        Intra-edges in the order of edges in ``g``, inter-edges, and
+        layers of all the buses, which are sorted by layers.
     """
-    dg = nx.DiGraph(g)
+    inter_nodes = g.inter_nodes
 
-    # Initiate dictionary for nodes in different layers.
-    node_dict = {}
-    inter_nodes = set(g.inter_nodes.index)
-    for layer in g.layers:
-        node_dict[layer] = set(g.layer_graph(layer).nodes) - inter_nodes
+    # Initiate dataframe for intra-edges, whose terminals being inter-nodes
+    # are split into terminals of inter-edges.
+    intra_edges = to_pandas_edgelist(g, elements)
+    _split_terminals(intra_edges, inter_nodes.index)
 
     # Initiate dataframe for inter-edges.
-    inter_edges = deepcopy(g.inter_nodes)
-    inter_edges["source"] = "default_"
-    inter_edges["target"] = "default_"
-
-    # Initiate dataframe for intra-edges.
-    intra_edges = nx.to_pandas_edgelist(g)
-    intra_edges[COLUMNS_DI_ORIGINAL[0]] = intra_edges[COLUMNS_DI[0]]
-    intra_edges[COLUMNS_DI_ORIGINAL[1]] = intra_edges[COLUMNS_DI[1]]
-    intra_edges.set_index(COLUMNS_DI_ORIGINAL, inplace=True)
+    inter_edges = _inter_edges(inter_nodes)
 
-    def update_intra_edges(edge: Tuple[str, str], edge_new: Tuple[str, str]):
-        """Update intra-edges' relationship after splitting inter-nodes.
+    # Gather buses in each layer, which are sorted by layers.
+    buses = pd.concat(
+        [
+            intra_edges.loc[
+                ~intra_edges.index.get_level_values(col).isin(
+                    inter_nodes.index
+                ),
+                [col_new, "layer"],
+            ].set_axis(["node", "idx"], axis=1)
+            for col_new, col in zip(COLUMNS_DI, COLUMNS_DI_ORIGINAL)
+        ]
+        + [_terminal_buses(inter_edges, COLUMNS)],
+        ignore_index=True,
+    )
+    buses = buses.drop_duplicates().sort_values("idx", kind="stable")
+    buses = buses.set_index("node")["idx"]
+    return intra_edges, inter_edges, buses
 
-        Args:
-            edge: intra-edges in planar graph.
-            edge_new: corresponding edge in supra-graph.
-        """
-        edges_original = intra_edges.index[
-            (intra_edges[COLUMNS_DI[0]] == edge[0])
-            & (intra_edges[COLUMNS_DI[1]] == edge[1])
-        ].tolist()
-        if len(edges_original) != 1:
-            LOGGER.error(f"The origin of edge {edge} is incorrect.")
-        intra_edges.loc[edges_original[0], COLUMNS_DI] = edge_new
-
-    # Split all the inter-nodes to inter-edges.
-    for node, row in g.inter_nodes.iterrows():
-        in_edges = list(dg.in_edges(nbunch=node, data=True))
-        for u, _, data in in_edges:
-            edge_new = (u, str(node) + f'_layer{data["layer"]}')
-            dg.add_edge(*edge_new, **data)
-            update_intra_edges((u, node), edge_new)
-        out_edges = list(dg.out_edges(nbunch=node, data=True))
-        for _, v, data in out_edges:
-            edge_new = (str(node) + f'_layer{data["layer"]}', v)
-            dg.add_edge(*edge_new, **data)
-            update_intra_edges((node, v), edge_new)
-
-        def init_node4inter(binary: int) -> str:
-            """Init source or target for the inter-edge.
-
-            Args:
-                binary: 0 or 1, representing "source" and "target".
-
-            Returns:
-                Node name of source or target.
-            """
-            layer = row[COLUMNS[binary]]
-            node_new = str(node) + f"_layer{layer}"
-            inter_edges.loc[node, COLUMNS_DI[binary]] = node_new
-            node_dict[layer].add(node_new)
-            return node_new
-
-        source = init_node4inter(0)
-        target = init_node4inter(1)
-        dg.add_edge(source, target, layer=mean([row["upper"], row["lower"]]))
-
-        # Store layer and origin of inter-edge terminals as node attributes
-        dg.nodes[source]["layer"] = row["upper"]
-        dg.nodes[source]["origin"] = node
-        dg.nodes[target]["layer"] = row["lower"]
-        dg.nodes[target]["origin"] = node
-
-        dg.remove_node(node)
-
-    # Build supra-grid.
+
+def _planar2supra(g: GeoGraph) -> Tuple[SupraGrid, Series]:
+    """Convert a planar grid to corresponding supra-grid.
+
+    Args:
+        g: a planar graph to be converted.
+
+    Returns:
+        Resulted supra-graph, and layers of all the buses in it, which
+        are sorted by layers.
+    """
+    arrays = arrays_of(g)
+    intra_edges, inter_edges, buses = _frames(g, arrays is None)
+    if arrays is not None:
+        dg = _compact_supra(arrays, intra_edges, inter_edges)
+    else:
+        dg = _supra_graph(g, intra_edges, inter_edges)
+
+    # Build supra-grid, where terminals of inter-edges are indexed by their
+    # origins and layers in the same order as they are added.
     res = SupraGrid(dg)
     res.intra_edges = intra_edges
     res.inter_edges = inter_edges
-    res.inter_edges.index.name = "node"
+    res.bus_index = _bus_index(inter_edges)
 
     res.df_layers = g.df_layers.copy(deep=True)
-    return res, node_dict
+    return res, buses
+
+
+def _supra_graph(
+    g: GeoGraph, intra_edges: DataFrame, inter_edges: DataFrame
+) -> nx.DiGraph:
+    """Build the supra graph from both kinds of edges.
+
+    Args:
+        g: a planar graph to be converted.
+        intra_edges: intra-edges in the order of edges in ``g``.
+        inter_edges: information on inter-edges.
+
+    Returns:
+        The supra graph.
+    """
+    inter_nodes = g.inter_nodes
+    dg = nx.DiGraph()
+    dg.add_nodes_from(
+        (node, data)
+        for node, data in g.nodes(data=True)
+        if node not in inter_nodes.index
+    )
+    _add_terminals(dg, inter_edges)
+    dg.add_edges_from(
+        (source, target, dict(data))
+        for source, target, (_, _, data) in zip(
+            intra_edges[COLUMNS_DI[0]],
+            intra_edges[COLUMNS_DI[1]],
+            g.edges(data=True),
+        )
+    )
+    _add_inter_edges(dg, inter_edges)
+    return dg
+
+
+def _compact_supra(
+    arrays: EdgeArrays, intra_edges: DataFrame, inter_edges: DataFrame
+) -> EdgeArrays:
+    """Store the supra graph in arrays, like :func:`_supra_graph`.
+
+    Note:
+        Nodes, edges and attributes are in the same order as the graph
+        built by :func:`_supra_graph`. Tables of elements on intra-edges
+        are shared with the planar graph.
+
+    Args:
+        arrays: compact storage of the planar graph.
+        intra_edges: intra-edges in the order of edges in ``arrays``.
+        inter_edges: information on inter-edges.
+
+    Returns:
+        Edges of the supra graph in arrays.
+    """
+    names = arrays.nodes
+    terminals = pd.Index(
+        np.concatenate([inter_edges[col].to_numpy() for col in COLUMNS_DI])
+    )
+    nodes = names[~names.isin(inter_edges.index)].append(terminals)
+    edges = {
+        col: nodes.get_indexer(
+            np.concatenate([intra_edges[col], inter_edges[col]])
+        )
+        for col in COLUMNS_DI
+    }
+    layer = np.concatenate(
+        [arrays.layer, inter_edges[COLUMNS].mean(axis=1).to_numpy()]
+    )
+
+    # Elements of inter-edges are stored in new tables after those of
+    # intra-edges.
+    element_table, element_row, tables = (
+        np.full(len(inter_edges), -1),
+        np.zeros(len(inter_edges)),
+        [],
+    )
+    if "element" in inter_edges:
+        element_table, element_row, tables = tabulate_rows(
+            inter_edges["element"].to_numpy()
+        )
+        element_table = np.where(
+            element_table >= 0, element_table + len(arrays.tables), -1
+        )
+
+    # Terminals of inter-edges keep their layers and origins.
+    start = len(nodes) - len(terminals)
+    node_data = {
+        start + i: {"layer": layer, "origin": node}
+        for i, (node, layer) in enumerate(
+            zip(
+                inter_edges.index.tolist() * len(COLUMNS),
+                np.concatenate([inter_edges[col] for col in COLUMNS]).tolist(),
+            )
+        )
+    }
+    return EdgeArrays(
+        nodes,
+        edges[COLUMNS_DI[0]],
+        edges[COLUMNS_DI[1]],
+        layer,
+        np.concatenate([arrays.element_table, element_table]),
+        np.concatenate([arrays.element_row, element_row]),
+        arrays.tables + tables,
+        node_data,
+    )
+
+
+def _attach_conversions(
+    conversions: DataFrame, bus_index: DataFrame
+) -> DataFrame:
+    """Find buses of conversion elements.
+
+    Args:
+        conversions: conversion elements of a planar grid.
+        bus_index: see :attr:`SupraGraph.nodes_new`.
+
+    Returns:
+        Conversion elements of the supra grid.
+    """
+    # Buses are looked up in the index, instead of merging dataframes.
+    keys = pd.MultiIndex.from_arrays(
+        [conversions["node"], pd.Index(conversions["layer"], dtype=object)]
+    )
+    pos = bus_index.index.get_indexer(keys)
+    is_inter = pos >= 0
+
+    # Elements attached to intra-nodes are attached to the same buses.
+    res = conversions.drop(columns=["node", "layer"])
+    buses = conversions["node"].to_numpy(dtype=object, copy=True)
+    buses[is_inter] = bus_index["bus"].to_numpy()[pos[is_inter]]
+    res["bus"] = buses
+    return res
+
+
+def _layer_info(buses: DataFrame, df_layers: DataFrame) -> DataFrame:
+    """Attach layer information to buses.
+
+    Args:
+        buses: layers of buses in column ``idx``, indexed by buses.
+        df_layers: information on layers.
+
+    Returns:
+        Buses with layer names and voltages, like ``buses`` of supra
+        grid.
+    """
+    buses["layer_name"] = buses["idx"].map(df_layers["name"])
+    buses["voltage"] = buses["idx"].map(df_layers["voltage"])
+    return buses
+
+
+def _append(df: DataFrame, rows: DataFrame) -> DataFrame:
+    """Append rows to a dataframe without factorising its index again.
+
+    Note:
+        ``pd.concat`` sorts all the levels of a multi-index again, which
+        dominates a small modification of a large grid. Here, new labels
+        are appended to the levels, and codes are concatenated.
+
+    Args:
+        df: a dataframe, whose index might be a multi-index.
+        rows: new rows with the same index levels.
+
+    Returns:
+        A new dataframe with rows of both.
+    """
+    index = df.index
+    if isinstance(index, pd.MultiIndex):
+        levels = []
+        codes = []
+        for i, level in enumerate(index.levels):
+            labels = rows.index.get_level_values(i)
+            pos = level.get_indexer(labels)
+            is_new = pos < 0
+            if is_new.any():
+                labels_new = labels[is_new].unique()
+                pos[is_new] = len(level) + labels_new.get_indexer(
+                    labels[is_new]
+                )
+                level = level.append(labels_new)
+            levels.append(level)
+            codes.append(np.concatenate([index.codes[i], pos]))
+        index = pd.MultiIndex(
+            levels=levels,
+            codes=codes,
+            names=index.names,
+            verify_integrity=False,
+        )
+    else:
+        index = index.append(rows.index)
+    res = pd.concat([df, rows], ignore_index=True)
+    res.index = index
+    return res
+
+
+@dataclass
+class SupraFrames:
+    """Tables of a supra grid without building its graph.
+
+    Note:
+        Terminals of edges are named like in :func:`planar2supra`, so
+        the tables are the same as those of a converted supra grid.
+    """
+
+    #: like ``intra_edges`` of supra graph, in the order of planar edges
+    intra_edges: DataFrame
+    inter_edges: DataFrame  #: like ``inter_edges`` of supra graph
+    #: like ``buses`` of supra grid, only with ``idx`` for a planar graph
+    buses: DataFrame
+    #: like ``conversions`` of supra grid, or None for a planar graph
+    conversions: Optional[DataFrame] = None
+
+    def edges(self, g: GeoGraph) -> DataFrame:
+        """Gather all the edges in the order of a converted supra graph.
+
+        Note:
+            Edges of a converted supra graph are iterated by sources,
+            which are planar nodes except inter-nodes in order, then
+            upper and lower terminals of inter-edges. Here, edges are
+            sorted by ranks of sources, where intra-edges come before
+            inter-edges, without building the graph.
+
+        Args:
+            g: the planar graph, from which the tables are built.
+
+        Returns:
+            Edges with columns ``source``, ``target`` and ``element``.
+        """
+        inter_nodes = g.inter_nodes.index
+        order = pd.Index(
+            [node for node in g._node if node not in inter_nodes]
+            + self.inter_edges[COLUMNS_DI[0]].tolist()
+            + self.inter_edges[COLUMNS_DI[1]].tolist()
+        )
+        columns = COLUMNS_DI + ["element"]
+        edges = pd.concat(
+            [
+                self.intra_edges.reindex(columns=columns),
+                self.inter_edges.reindex(columns=columns),
+            ],
+            ignore_index=True,
+        )
+        rank = order.get_indexer(edges[COLUMNS_DI[0]])
+        rank[rank < 0] = len(order)
+        is_inter = np.arange(len(edges)) >= len(self.intra_edges)
+        return edges.iloc[np.lexsort((is_inter, rank))]
+
+
+def planar2frames(g: Union[GeoGraph, GeoGrid]) -> SupraFrames:
+    """Find tables of the supra grid for a planar grid.
+
+    Note:
+        It is :func:`planar2supra` without the graph, for exporting a
+        planar grid directly, like
+        :func:`mgrid.power_flow.pandapower.geo2pandapower`.
+
+    Args:
+        g: a planar graph or grid to be converted.
+
+    Returns:
+        Tables of the supra graph (for the grid).
+    """
+    intra_edges, inter_edges, buses = _frames(g)
+    res = SupraFrames(intra_edges, inter_edges, buses.to_frame())
+    if isinstance(g, GeoGrid):
+        res.buses = _layer_info(res.buses, g.df_layers)
+        res.conversions = _attach_conversions(
+            g.conversions, _bus_index(inter_edges)
+        )
+    return res
+
+
+def _origin(supra: SupraGrid, bus: Hashable) -> Hashable:
+    """Find the planar node of a bus.
+
+    Args:
+        supra: a supra graph.
+        bus: name of the bus.
+
+    Returns:
+        The inter-node if the bus is a terminal of an inter-edge, or
+        the bus itself.
+    """
+    return supra._node[bus].get("origin", bus)
+
+
+def _incident_edges(
+    supra: SupraGrid, buses: List[Hashable]
+) -> List[Tuple[Hashable, Hashable]]:
+    """Find planar terminals of intra-edges incident to some buses.
+
+    Args:
+        supra: a supra graph.
+        buses: names of buses.
+
+    Returns:
+        Pairs of source and target in planar graph, without duplicates
+        and inter-edges.
+    """
+    res = {}
+    for bus in buses:
+        origin = _origin(supra, bus)
+        for nbr in supra._succ[bus]:
+            res[(origin, _origin(supra, nbr))] = None
+        for nbr in supra._pred[bus]:
+            res[(_origin(supra, nbr), origin)] = None
+    return [edge for edge in res if edge[0] != edge[1]]
 
 
-def planar2supra(g: Union[GeoGraph, GeoGrid]) -> SupraGrid:
+def _buses(supra: SupraGrid, node: Hashable) -> List[Hashable]:
+    """Find buses into which a planar node is converted.
+
+    Args:
+        supra: a supra graph.
+        node: name of a planar node.
+
+    Returns:
+        Both terminals if it is an inter-node, the node itself if it is
+        in the supra graph, or nothing.
+    """
+    if node in supra.inter_edges.index:
+        res = supra.inter_edges.loc[node, COLUMNS_DI].tolist()
+    elif node in supra._node:
+        res = [node]
+    else:
+        res = []
+    return res
+
+
+def _remove_edges(
+    supra: SupraGrid,
+    edges: List[Tuple[Hashable, Hashable]],
+    touched: Set[Hashable],
+):
+    """Remove intra-edges from a supra graph.
+
+    Note:
+        Edges are looked up in the supra graph first, so that the index
+        of ``intra_edges`` is only searched for existing ones.
+
+    Args:
+        supra: the supra graph.
+        edges: pairs of source and target in planar graph. Missing ones
+            are skipped.
+        touched: buses losing edges, which is extended in place.
+    """
+    edges = [
+        (u, v)
+        for u, v in dict.fromkeys(edges)
+        if any(
+            target in supra._succ[source]
+            for source in _buses(supra, u)
+            for target in _buses(supra, v)
+        )
+    ]
+    if not edges:
+        return
+
+    intra_edges = supra.intra_edges
+    pos = intra_edges.index.get_indexer(edges)
+    pos = pos[pos >= 0]
+    rows = intra_edges.iloc[pos]
+    for source, target in zip(rows[COLUMNS_DI[0]], rows[COLUMNS_DI[1]]):
+        supra.remove_edge(source, target)
+        touched.update((source, target))
+    kept = np.ones(len(intra_edges), dtype=bool)
+    kept[pos] = False
+    supra.intra_edges = intra_edges[kept]
+
+
+def _remove_inter_nodes(
+    supra: SupraGrid, names: List[str], touched: Set[Hashable]
+):
+    """Remove inter-edges with their terminals and intra-edges.
+
+    Args:
+        supra: the supra graph.
+        names: names of removed inter-nodes. Missing ones are skipped.
+        touched: buses losing edges, which is extended in place.
+    """
+    inter_edges = supra.inter_edges
+    names = [name for name in names if name in inter_edges.index]
+    if not names:
+        return
+
+    bus_index = supra.nodes_new
+    rows = inter_edges.loc[names]
+    terminals = rows[COLUMNS_DI[0]].tolist() + rows[COLUMNS_DI[1]].tolist()
+    _remove_edges(supra, _incident_edges(supra, terminals), touched)
+    supra.remove_nodes_from(terminals)
+    touched.update(terminals)
+
+    supra.inter_edges = inter_edges.drop(index=names)
+    supra.bus_index = bus_index.drop(index=names, level="origin")
+
+
+def _add_inter_nodes(
+    supra: SupraGrid, g: GeoGraph, names: List[str], touched: Set[Hashable]
+) -> Tuple[List[Tuple[Hashable, Hashable]], DataFrame]:
+    """Split planar nodes into terminals of new inter-edges.
+
+    Args:
+        supra: the supra graph.
+        g: the modified planar graph.
+        names: names of new inter-nodes. Those not in ``g`` or already
+            converted are skipped.
+        touched: buses losing edges, which is extended in place.
+
+    Returns:
+        Intra-edges detached from the planar nodes, which must be added
+        again, and new buses with their layers.
+    """
+    names = [
+        name
+        for name in names
+        if name in g.inter_nodes.index and name not in supra.inter_edges.index
+    ]
+    if not names:
+        return [], _terminal_buses(supra.inter_edges.iloc[:0], COLUMNS)
+
+    planar = [name for name in names if name in supra._node]
+    detached = _incident_edges(supra, planar)
+    _remove_edges(supra, detached, touched)
+    supra.remove_nodes_from(planar)
+    touched.update(planar)
+
+    inter_edges = _inter_edges(g.inter_nodes.loc[names])
+    _add_terminals(supra, inter_edges)
+    _add_inter_edges(supra, inter_edges)
+    supra.inter_edges = _append(supra.inter_edges, inter_edges)
+    supra.bus_index = _append(supra.nodes_new, _bus_index(inter_edges))
+    return detached, _terminal_buses(inter_edges, COLUMNS)
+
+
+def _add_edges(
+    supra: SupraGrid, g: GeoGraph, edges: List[Tuple[Hashable, Hashable]]
+) -> DataFrame:
+    """Add intra-edges of a planar graph to a supra graph.
+
+    Args:
+        supra: the supra graph, where the edges are missing.
+        g: the modified planar graph.
+        edges: pairs of source and target in ``g``. Missing ones are
+            skipped.
+
+    Returns:
+        Terminals of the new intra-edges with their layers.
+    """
+    edges = [
+        (source, target)
+        for source, target in dict.fromkeys(edges)
+        if source in g._succ and target in g._succ[source]
+    ]
+    if not edges:
+        return _terminal_buses(supra.intra_edges.iloc[:0], "layer")
+
+    intra_edges = pd.DataFrame.from_records(
+        [
+            dict(zip(COLUMNS_DI, edge), **g._succ[edge[0]][edge[1]])
+            for edge in edges
+        ]
+    )
+    _split_terminals(intra_edges, supra.inter_edges.index)
+
+    supra.add_nodes_from(
+        (node, g._node.get(node, {}))
+        for node in set(intra_edges[COLUMNS_DI[0]])
+        | set(intra_edges[COLUMNS_DI[1]])
+        if node not in supra._node
+    )
+    supra.add_edges_from(
+        (source, target, dict(g._succ[u][v]))
+        for source, target, (u, v) in zip(
+            intra_edges[COLUMNS_DI[0]], intra_edges[COLUMNS_DI[1]], edges
+        )
+    )
+    supra.intra_edges = _append(supra.intra_edges, intra_edges)
+    return _terminal_buses(intra_edges, "layer")
+
+
+def _patch_buses(
+    supra: SupraGrid, touched: Set[Hashable], buses_new: DataFrame
+):
+    """Drop buses without edges and add new ones in order of layers.
+
+    Args:
+        supra: the supra grid.
+        touched: buses which have lost edges.
+        buses_new: terminals of new edges with their layers, which might
+            exist.
+    """
+    buses = supra.buses
+    dropped = [
+        bus
+        for bus in touched
+        if bus in buses.index
+        and (
+            bus not in supra._node
+            or not (supra._succ[bus] or supra._pred[bus])
+        )
+    ]
+    buses_new = buses_new.drop_duplicates("node").set_index("node")
+    buses_new = buses_new[~buses_new.index.isin(buses.index)]
+    if dropped:
+        buses = buses.drop(index=dropped)
+    if len(buses_new) > 0:
+        buses_new = _layer_info(buses_new, supra.df_layers)
+        buses = pd.concat([buses, buses_new]).sort_values(
+            "idx", kind="stable"
+        )
+    supra.buses = buses
+
+
+def _patch_conversions(
+    supra: SupraGrid, g: GeoGrid, delta: GeoDelta, moved: List[str]
+):
+    """Drop and attach conversion elements.
+
+    Args:
+        supra: the supra grid.
+        g: the modified planar grid.
+        delta: modification of the planar grid.
+        moved: planar nodes split into terminals of new inter-edges.
+    """
+    conversions = supra.conversions
+    names = list(delta.conversions_added)
+    if moved:
+        # Elements on split nodes are attached to terminals again.
+        names += conversions.index[conversions["bus"].isin(moved)].tolist()
+    names = list(dict.fromkeys(names))
+
+    dropped = [
+        name
+        for name in dict.fromkeys(delta.conversions_removed + names)
+        if name in conversions.index
+    ]
+    if dropped:
+        conversions = conversions.drop(index=dropped)
+    added = [name for name in names if name in g.conversions.index]
+    if added:
+        conversions = pd.concat(
+            [
+                conversions,
+                _attach_conversions(
+                    g.conversions.loc[added], supra.nodes_new
+                ),
+            ]
+        )
+    supra.conversions = conversions
+
+    for key in g.types.keys() - supra.types.keys():
+        supra.types[key] = deepcopy(g.types[key])
+
+
+def patch_supra(
+    supra: SupraGrid, g: Union[GeoGraph, GeoGrid], delta: GeoDelta
+) -> SupraGrid:
+    """Apply modification of a planar graph or grid to its supra graph.
+
+    Note:
+        - Intra-edges, inter-edges, buses and conversion elements are
+          patched in place. Only modified nodes and edges and their
+          neighbours are visited, and rows are dropped from or added to
+          each dataframe at once.
+        - Buses are sorted by layers again if any is added. Within a
+          layer, new buses come last, so the order can differ from that
+          of a new conversion.
+        - Results derived from the supra grid, like power flow solvers,
+          must be built again.
+
+    Args:
+        supra: supra graph converted from ``g`` before modification.
+        g: the modified planar graph or grid.
+        delta: modification since ``supra`` was converted.
+
+    Returns:
+        The patched supra graph.
+    """
+    touched = set()
+    _remove_edges(supra, delta.edges_removed + delta.edges_added, touched)
+    _remove_inter_nodes(supra, delta.inter_nodes_removed, touched)
+    moved = [
+        name
+        for name in delta.inter_nodes_added
+        if name in supra._node and "origin" not in supra._node[name]
+    ]
+    detached, buses_inter = _add_inter_nodes(
+        supra, g, delta.inter_nodes_added, touched
+    )
+    buses_intra = _add_edges(supra, g, delta.edges_added + detached)
+    supra.df_layers = g.df_layers.copy(deep=True)
+
+    if isinstance(g, GeoGrid) and supra.buses is not None:
+        _patch_buses(supra, touched, pd.concat([buses_intra, buses_inter]))
+        _patch_conversions(supra, g, delta, moved)
+
+    LOGGER.debug(
+        f"Supra graph has been patched with {len(delta.edges_added)} "
+        f"added and {len(delta.edges_removed)} removed edge(s)."
+    )
+    return supra
+
+
+def planar2supra(
+    g: Union[GeoGraph, GeoGrid],
+    supra: Optional[SupraGrid] = None,
+    delta: Optional[GeoDelta] = None,
+) -> SupraGrid:
     """Convert a planar grid to corresponding supra-grid.
 
+    Note:
+        If both ``supra`` and ``delta`` are given, the supra graph is
+        patched in place by :func:`patch_supra`, so the cost depends on
+        the size of the modification rather than the grid.
+
     Args:
         g: a planar graph or grid to be converted.
+        supra: supra graph converted from ``g`` before modification.
+        delta: modification of ``g`` since ``supra`` was converted.
 
     Returns:
         Resulted supra graph (for the grid).
 
     """
-    supra, node_dict = _planar2supra(g)
+    if supra is not None and delta is not None:
+        return patch_supra(supra, g, delta)
 
-    if isinstance(g, GeoGrid):
-        for node, row in g.inter_nodes.iterrows():
-            source = supra.inter_edges.loc[node, "source"]
-            target = supra.inter_edges.loc[node, "target"]
-            supra.edges[source, target]["element"] = row["element"]
+    supra, buses = _planar2supra(g)
 
+    if isinstance(g, GeoGrid):
         # Get conversion elements.
-        conversions = deepcopy(g.conversions)
-        conversions.reset_index(inplace=True)
-        conversions = pd.merge(
-            conversions,
-            supra.nodes_new,
-            how="left",
-            left_on=["node", "layer"],
-            right_index=True,
-        )
-        conversions.set_index("name", inplace=True)
-        conversions.drop(columns=["node", "layer"], inplace=True)
-        supra.conversions = conversions
-
+        supra.conversions = _attach_conversions(g.conversions, supra.nodes_new)
         supra.types = deepcopy(g.types)
 
-        # Build a list of buses using dictionary for nodes in different layers.
-        keys_sorted = sorted(node_dict)
-        data = {
-            "idx": chain(*[[key] * len(node_dict[key]) for key in keys_sorted])
-        }
-        buses = pd.DataFrame(
-            data,
-            index=chain(*[node_dict[key] for key in keys_sorted]),
+        # Build a list of buses with layer information.
+        supra.buses = _layer_info(buses.to_frame(), supra.df_layers)
+
+    return supra
+
+
+def _terminal_name(node: Hashable, layer: int) -> str:
+    """Name a terminal like :func:`_terminal_names` for one node.
+
+    Args:
+        node: name of an inter-node in planar graph.
+        layer: layer to which the terminal belongs.
+
+    Returns:
+        Name of the terminal in supra graph.
+    """
+    return f"{node}_layer{layer}"
+
+
+class _NodeView(Mapping):
+    """Nodes of a supra graph computed from a planar graph.
+
+    Planar nodes except inter-nodes come first, followed by terminals of
+    inter-edges, like in a converted supra graph.
+    """
+
+    def __init__(self, g: GeoGraph, terminals: nx.DiGraph):
+        """Wrap nodes of a planar graph.
+
+        Args:
+            g: a planar graph.
+            terminals: terminals and inter-edges for inter-nodes of
+                ``g``.
+        """
+        self._g = g
+        self._terminals = terminals
+        self._inter_nodes = set(g.inter_nodes.index)
+
+    def __getitem__(self, node: Hashable) -> dict:
+        """Get attributes of a node.
+
+        Args:
+            node: name of a bus.
+
+        Raises:
+            KeyError: if the bus does not exist.
+
+        Returns:
+            Node attributes, which are shared with the planar graph.
+        """
+        if node in self._terminals._node:
+            return self._terminals._node[node]
+        if node in self._inter_nodes:
+            raise KeyError(node)
+        return self._g._node[node]
+
+    def __contains__(self, node: Hashable) -> bool:
+        """Check if a bus exists without searching.
+
+        Args:
+            node: name of a bus.
+
+        Returns:
+            Whether the bus exists.
+        """
+        return node in self._terminals._node or (
+            node in self._g._node and node not in self._inter_nodes
         )
 
-        buses["layer_name"] = buses["idx"].map(supra.df_layers["name"])
-        buses.index.name = "node"
-        buses["voltage"] = buses["idx"].map(supra.df_layers["voltage"])
-        supra.buses = buses
+    def __iter__(self) -> Iterator[Hashable]:
+        """Iterate over buses.
 
-    return supra
+        Yields:
+            Names of buses.
+        """
+        inter_nodes = self._inter_nodes
+        for node in self._g._node:
+            if node not in inter_nodes:
+                yield node
+        yield from self._terminals._node
+
+    def __len__(self) -> int:
+        """Count buses.
+
+        Returns:
+            Number of buses.
+        """
+        return (
+            len(self._g._node) - len(self._inter_nodes) + len(self._terminals)
+        )
+
+
+class _AdjacencyView(Mapping):
+    """Successors or predecessors of buses computed from a planar graph.
+
+    Note:
+        Neighbours of a bus are gathered in a new dictionary on every
+        access, whose values are edge attributes shared with the planar
+        graph.
+    """
+
+    def __init__(
+        self,
+        nodes: _NodeView,
+        adj: Dict[Hashable, dict],
+        adj_inter: Dict[Hashable, dict],
+    ):
+        """Wrap successors or predecessors of a planar graph.
+
+        Args:
+            nodes: buses of the supra graph.
+            adj: successors or predecessors of the planar graph.
+            adj_inter: successors or predecessors along inter-edges.
+        """
+        self._nodes = nodes
+        self._adj = adj
+        self._adj_inter = adj_inter
+
+    def _rename(self, nbrs: dict, layer: Optional[int] = None) -> dict:
+        """Rename planar neighbours being inter-nodes to terminals.
+
+        Args:
+            nbrs: planar neighbours and edge attributes.
+            layer: the only layer of edges to keep. Default to be None,
+                when all of them are kept.
+
+        Returns:
+            Buses of neighbours and edge attributes.
+        """
+        inter_nodes = self._nodes._inter_nodes
+        res = {}
+        for nbr, data in nbrs.items():
+            if layer is not None and data.get("layer") != layer:
+                continue
+            if nbr in inter_nodes:
+                nbr = _terminal_name(nbr, data["layer"])
+            res[nbr] = data
+        return res
+
+    def __getitem__(self, node: Hashable) -> dict:
+        """Gather neighbours of a bus.
+
+        Args:
+            node: name of a bus.
+
+        Raises:
+            KeyError: if the bus does not exist.
+
+        Returns:
+            Neighbours of the bus and edge attributes.
+        """
+        if node in self._adj_inter:
+            data = self._nodes._terminals._node[node]
+            res = self._rename(self._adj[data["origin"]], data["layer"])
+            res.update(self._adj_inter[node])
+        elif node in self._nodes:
+            res = self._rename(self._adj[node])
+        else:
+            raise KeyError(node)
+        return res
+
+    def __contains__(self, node: Hashable) -> bool:
+        """Check if a bus exists.
+
+        Args:
+            node: name of a bus.
+
+        Returns:
+            Whether the bus exists.
+        """
+        return node in self._nodes
+
+    def __iter__(self) -> Iterator[Hashable]:
+        """Iterate over buses.
+
+        Returns:
+            An iterator over names of buses.
+        """
+        return iter(self._nodes)
+
+    def __len__(self) -> int:
+        """Count buses.
+
+        Returns:
+            Number of buses.
+        """
+        return len(self._nodes)
+
+
+class SupraGridView(SupraGrid):
+    """Read-only supra graph computed from a planar graph on the fly.
+
+    Note:
+        - Only inter-nodes are split, into a small graph of terminals and
+          inter-edges. Other nodes and intra-edges are looked up in the
+          planar graph when visited, and their attributes are shared.
+        - Buses, conversion elements and types are gathered like
+          :func:`planar2supra`, except that types are shared, and
+          ``intra_edges`` is not built, which is as large as edgelist.
+        - The view is invalid once the planar graph is modified.
+
+    Attributes:
+        planar (GeoGraph): the viewed planar graph or grid.
+    """
+
+    def __init__(self, g: Optional[Union[GeoGraph, GeoGrid]] = None):
+        """View a planar graph or grid as a supra graph.
+
+        Note:
+            The option for empty graph is essential for views built by
+            ``networkx``, like subgraphs.
+
+        Args:
+            g: a planar graph or grid. Default to be None.
+        """
+        super().__init__()
+        self.planar = g
+        if g is None:
+            return
+
+        self.inter_edges = _inter_edges(g.inter_nodes)
+        self.bus_index = _bus_index(self.inter_edges)
+        self.df_layers = g.df_layers.copy(deep=True)
+
+        terminals = nx.DiGraph()
+        _add_terminals(terminals, self.inter_edges)
+        _add_inter_edges(terminals, self.inter_edges)
+        self._node = _NodeView(g, terminals)
+        self._succ = self._adj = _AdjacencyView(
+            self._node, g._succ, terminals._succ
+        )
+        self._pred = _AdjacencyView(self._node, g._pred, terminals._pred)
+        nx.freeze(self)
+
+        if isinstance(g, GeoGrid):
+            self.conversions = _attach_conversions(
+                g.conversions, self.bus_index
+            )
+            self.types = g.types
+
+            # Buses are found from the index of node layers, instead of
+            # edges, in the same order as a converted supra grid.
+            inter_nodes = g.inter_nodes.index
+            buses = pd.DataFrame(
+                [
+                    (node, layers[0])
+                    for node, layers in g._node_layers.items()
+                    if node not in inter_nodes
+                ],
+                columns=["node", "idx"],
+            )
+            buses = pd.concat(
+                [buses, _terminal_buses(self.inter_edges, COLUMNS)],
+                ignore_index=True,
+            )
+            buses = buses.sort_values("idx", kind="stable").set_index("node")
+            self.buses = _layer_info(buses, self.df_layers)
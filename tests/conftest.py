@@ -4,6 +4,10 @@ import pandas as pd
 import pytest as pt
 
 from mgrid.graph.geographic import COLUMNS, GeoGraph
+from mgrid.grid import GeoGrid
+from mgrid.power_flow.conversion import Capacitor, Ejection, Slack
+from mgrid.power_flow.delivery import Cable, TransformerStd
+from mgrid.power_flow.type import TransformerType
 
 
 @pt.fixture(scope="module")
@@ -39,3 +43,92 @@ def case_large() -> GeoGraph:
     assert res.number_of_edges() == 8
     assert res.number_of_nodes() == 7
     return res
+
+
+def _feeders(compact: bool = False) -> GeoGrid:
+    """Init a grid with three substations and radial feeders below them.
+
+    Note:
+        Substations are connected in layer 0 (10 kV), and each has a
+        feeder with three cabinets in layer 1 (0.4 kV). Every cabinet
+        has a load, except that the last one in feeder 2 has a PV panel.
+
+    Args:
+        compact: whether to store edges in arrays.
+
+    Returns:
+        A grid with 11 intra-edges and 3 inter-edges.
+    """
+    edges = []
+    for i in range(3):
+        if i > 0:
+            edges.append((f"sub{i - 1}", f"sub{i}", 0))
+        upstream = f"sub{i}"
+        for j in range(3):
+            edges.append((upstream, f"cab{i}{j}", 1))
+            upstream = f"cab{i}{j}"
+    df = pd.DataFrame(edges, columns=["source", "target", "layer"])
+    df["element"] = [
+        Cable(
+            length_km=0.2,
+            name=f"{source}-{target}",
+            parallel=1,
+            r_ohm=0.1 if layer else 0.3,
+            x_ohm=0.08,
+            c_nf=0,
+            max_i_ka=0.3,
+        )
+        for source, target, layer in edges
+    ]
+
+    res = GeoGrid.from_edgelist(
+        df, "source", "target", "element", compact=compact
+    )
+    res.types["trafo"] = TransformerType(
+        s_mva=0.4,
+        v_high_kv=10,
+        v_low_kv=0.4,
+        vk_percent=4,
+        vkr_percent=1.2,
+        pfe_kw=0,
+        i0_percent=0,
+    )
+    res.add_inter_nodes(
+        (node, TransformerStd("trafo", node, parallel=1))
+        for node in res.inter_nodes.index
+    )
+    res.df_layers["voltage"] = [10, 0.4]
+
+    res.add_conversion("slack", "sub0", Slack(), 0)
+    res.add_conversion("capacitor", "sub2", Capacitor(0.1, 0.01), 0)
+    res.add_conversions(
+        (f"load{i}{j}", f"cab{i}{j}", Ejection(0.01 * (j + 1), 0.95))
+        for i in range(3)
+        for j in range(3)
+        if (i, j) != (2, 2)
+    )
+    res.add_conversion("pv", "cab22", Ejection(-0.02, 1))
+
+    assert res.number_of_edges() == 11
+    assert len(res.inter_nodes) == 3
+    return res
+
+
+@pt.fixture(scope="module")
+def feeders() -> GeoGrid:
+    """Init a grid with three substations and radial feeders below them.
+
+    Returns:
+        A grid with 11 intra-edges and 3 inter-edges.
+    """
+    return _feeders()
+
+
+@pt.fixture(scope="module")
+def compact_feeders() -> GeoGrid:
+    """Init the same grid as ``feeders`` with edges stored in arrays.
+
+    Returns:
+        A frozen grid with 11 intra-edges and 3 inter-edges.
+    """
+    return _feeders(compact=True)
@@ -2,8 +2,10 @@
 import networkx as nx
 import pandas as pd
 from pandas.core.frame import DataFrame
+import pytest as pt
 
 from mgrid.graph.geographic import COLUMNS, GeoGraph
+from mgrid.grid import GeoGrid
 
 
 def test_from_edgelist():
@@ -27,3 +29,117 @@ def test_methods(simple: GeoGraph):
 
     graph_0 = simple.layer_graph(0)
     assert isinstance(graph_0, nx.DiGraph)
+
+
+def test_layer_cache():
+    """Check if edgelists and views in one layer follow changes."""
+    dg = nx.DiGraph()
+    dg.add_edge("a", "b", layer=0)
+    dg.add_edge("a", "c", layer=1)
+    res = GeoGraph(dg)
+
+    assert len(res.layer_edges(0)) == 1
+    view = res.layer_graph(1, copy=False)
+    assert set(view.edges) == {("a", "c")}
+    assert nx.is_frozen(view)
+
+    res.add_edge("c", "d", layer=1)
+    assert len(res.layer_edges(1)) == 2
+    assert set(res.layer_graph(1).edges) == {("a", "c"), ("c", "d")}
+
+
+def test_find_inter_nodes():
+    """Check if inter-nodes are detected from layers of incident edges."""
+    df = pd.DataFrame(
+        {
+            "source": ["a", "a", "b", "c", "d"],
+            "target": ["b", "c", "d", "e", "f"],
+            "layer": [0, 1, 0, 1, 2],
+        }
+    )
+
+    res = GeoGraph.from_edgelist(df, source="source", target="target")
+    assert res.inter_nodes.to_dict("index") == {
+        "a": {"upper": 0, "lower": 1}
+    }
+    assert res.layers == {0, 1, 2}
+
+
+def test_find_layer():
+    """Check if layers of nodes are maintained when the graph changes."""
+    dg = nx.DiGraph()
+    dg.add_edge("a", "b", layer=0)
+    dg.add_edge("b", "c", layer=0)
+    res = GeoGraph(dg)
+    assert res.find_layer("b") == (0, 0)
+
+    res.add_edge("b", "d", layer=1)
+    assert res.find_layer("b") == (0, 1)
+    assert res.find_layer("d") == (1, 1)
+
+    res.remove_node("d")
+    assert res.find_layer("b") == (0, 0)
+
+    res.add_inter_node("c", upper=False)
+    assert res.find_layer("c") == (0, 1)
+    res.add_edges_from([("c", "e")], layer=1)
+    assert res.find_layer("c") == (0, 1)
+    assert res.find_layer("e") == (1, 1)
+
+    # Moving an existing edge to another layer narrows its terminals.
+    res.add_edge("a", "b", layer=1)
+    assert res.find_layer("a") == (1, 1)
+    assert res.find_layer("b") == (0, 1)
+    res.add_edges_from([("a", "b")], layer=0)
+    assert res.find_layer("a") == (0, 0)
+    assert res.find_layer("b") == (0, 0)
+
+
+def test_add_inter_nodes():
+    """Check if a batch of inter-nodes can be specified at once."""
+    dg = nx.DiGraph()
+    dg.add_edge("a", "b", layer=0)
+    dg.add_edge("c", "d", layer=1)
+    res = GeoGraph(dg)
+
+    res.add_inter_nodes([("a", True), ("d", False), ("e", True)])
+    assert res.inter_nodes.to_dict("index") == {
+        "a": {"upper": -1, "lower": 0},
+        "d": {"upper": 1, "lower": 2},
+    }
+    assert res.layers == {-1, 0, 1, 2}
+    assert res.df_layers.index.tolist() == [-1, 0, 1, 2]
+    assert res.df_layers.loc[2, "name"] == "layer2"
+    assert res.find_layer("d") == (1, 2)
+
+
+def test_compact(feeders: GeoGrid, compact_feeders: GeoGrid):
+    """Check if a graph stored in arrays behaves like ``networkx``.
+
+    Args:
+        feeders: a grid with three substations and radial feeders.
+        compact_feeders: the same grid with edges stored in arrays.
+    """
+    res = compact_feeders
+    assert list(res.nodes) == list(feeders.nodes)
+    assert res.inter_nodes.equals(feeders.inter_nodes)
+    assert res.layers == feeders.layers
+    assert dict(res._node_layers) == feeders._node_layers
+    assert res.find_layer("sub1") == feeders.find_layer("sub1")
+
+    # Views of elements are equal in values to the original elements.
+    assert list(res.edges(data=True)) == list(feeders.edges(data=True))
+    assert list(res.in_edges("sub1", data=True)) == list(
+        feeders.in_edges("sub1", data=True)
+    )
+    assert res.has_edge("sub0", "cab00") and "nowhere" not in res
+
+    edges = res.layer_edges(1)
+    assert edges[["source", "target", "layer"]].equals(
+        feeders.layer_edges(1)[["source", "target", "layer"]]
+    )
+    expected = {("sub0", "sub1"), ("sub1", "sub2")}
+    assert set(res.layer_graph(0).edges) == expected
+
+    with pt.raises(nx.NetworkXError):
+        res.add_edge("sub2", "cab99", layer=1)
@@ -7,7 +7,7 @@ import pytest as pt
 
 from mgrid.graph.geographic import COLUMNS, GeoGraph
 from mgrid.grid import GeoGrid
-from mgrid.power_flow.conversion import Slack
+from mgrid.power_flow.conversion import Ejection, Slack
 from mgrid.power_flow.delivery import Cable, TransformerStd
 from mgrid.power_flow.pandapower import supra2pandapower
 from mgrid.power_flow.type import TransformerType
@@ -226,3 +226,27 @@ def test_planar_grid(grid: GeoGrid):
 
     net = supra2pandapower(res)
     print(net)
+
+
+def test_batches(case_large: GeoGraph):
+    """Check if inter-nodes and conversions can be added in batches.
+
+    Args:
+        case_large: a test case with 8 planar edges and 2 inter-edges.
+    """
+    planar = GeoGrid(case_large)
+    trans = TransformerStd("STAT1004", "n5", parallel=1)
+    planar.add_inter_nodes(
+        pd.DataFrame({"element": [trans]}, index=pd.Index(["n5"]))
+    )
+    assert planar.inter_nodes.loc["n5", "element"] == trans
+
+    planar.add_conversions(
+        [
+            ("load", "n6", Ejection(0.1, 0.9)),
+            ("slack", "n5", Slack(), 0),
+            ("nowhere", "n0", Slack()),
+        ]
+    )
+    assert planar.conversions.index.tolist() == ["load", "slack"]
+    assert planar.conversions["layer"].tolist() == [1, 0]
@@ -0,0 +1,309 @@
+"""Test modules in ``power_flow``."""
+from copy import deepcopy
+import pickle
+
+import numpy as np
+import pandapower as pp
+import pandas as pd
+import pytest as pt
+
+from mgrid.grid import GeoGrid
+from mgrid.power_flow.conversion import Ejection, EjectionPhase, Slack
+from mgrid.power_flow.delivery import Cable, CablePhase
+from mgrid.power_flow.impedance import (
+    RadialPowerFlow,
+    RadialPowerFlowPhase,
+)
+from mgrid.power_flow.pandapower import geo2pandapower, supra2pandapower
+from mgrid.power_flow.partition import ParallelPowerFlow, partition
+from mgrid.power_flow.snapshot import TimeSeriesPowerFlow, TimeSeriesResult
+from mgrid.power_flow.table import ElementTable
+from mgrid.transformation import planar2supra
+
+
+def test_supra2pandapower(feeders: GeoGrid):
+    """Check if all the elements are added to a pandapower model.
+
+    Args:
+        feeders: a grid with three substations and radial feeders.
+    """
+    supra = planar2supra(feeders)
+    net = supra2pandapower(supra)
+
+    assert net.bus["name"].tolist() == supra.buses.index.tolist()
+    assert len(net.line) == 11
+    assert len(net.trafo) == 3
+    assert (net.trafo["std_type"] == "trafo").all()
+    assert len(net.load) == 8
+    assert len(net.sgen) == 1
+    assert len(net.shunt) == 1
+    assert len(net.ext_grid) == 1
+
+    buses = net.bus["name"]
+    assert buses[net.load.set_index("name").loc["load00", "bus"]] == "cab00"
+    assert buses[net.ext_grid.loc[0, "bus"]] == "sub0_layer0"
+
+    pp.runpp(net)
+    assert net.converged
+
+
+def test_geo2pandapower(feeders: GeoGrid):
+    """Check if the direct pipeline builds the same pandapower model.
+
+    Args:
+        feeders: a grid with three substations and radial feeders.
+    """
+    expected = supra2pandapower(planar2supra(feeders))
+    net = geo2pandapower(feeders)
+    for key in ["bus", "line", "trafo", "load", "sgen", "shunt", "ext_grid"]:
+        assert net[key].equals(expected[key])
+
+
+def test_single_layer():
+    """Check if a grid without inter-nodes can be exported."""
+    df = pd.DataFrame({"source": ["a", "b"], "target": ["b", "c"]})
+    df["layer"] = 0
+    df["element"] = [
+        Cable(0.1, name, 1, r_ohm=0.1, x_ohm=0.08, c_nf=0, max_i_ka=0.3)
+        for name in ["a-b", "b-c"]
+    ]
+    grid = GeoGrid.from_edgelist(df, "source", "target", "element")
+    grid.df_layers["voltage"] = [0.4]
+    grid.add_conversion("slack", "a", Slack(), 0)
+    grid.add_conversion("load", "c", Ejection(0.01, 0.95), 0)
+
+    supra = planar2supra(grid)
+    assert supra.conversions["bus"].tolist() == ["a", "c"]
+    expected = supra2pandapower(supra)
+    net = geo2pandapower(grid)
+    for key in ["bus", "line", "load", "ext_grid"]:
+        assert net[key].equals(expected[key])
+    assert net.bus["name"][net.load.loc[0, "bus"]] == "c"
+
+
+def test_compact_pandapower(feeders: GeoGrid, compact_feeders: GeoGrid):
+    """Check if a grid stored in arrays builds the same pandapower model.
+
+    Args:
+        feeders: a grid with three substations and radial feeders.
+        compact_feeders: the same grid with edges stored in arrays.
+    """
+    expected = supra2pandapower(planar2supra(feeders))
+    nets = [
+        supra2pandapower(planar2supra(compact_feeders)),
+        geo2pandapower(compact_feeders),
+    ]
+    for net in nets:
+        for key in ["bus", "line", "trafo", "load", "sgen", "ext_grid"]:
+            pd.testing.assert_frame_equal(net[key], expected[key])
+
+
+def test_element_table():
+    """Check if views of a table behave like data-classes."""
+    cables = [
+        Cable(
+            length_km=i,
+            name=f"c{i}",
+            parallel=1,
+            r_ohm=0.1,
+            x_ohm=0.08,
+            c_nf=0,
+            max_i_ka=0.3,
+        )
+        for i in range(3)
+    ]
+    table = ElementTable.from_elements(cables)
+    assert len(table) == 3
+    assert table.columns["length_km"].dtype == np.float64
+
+    view = table[1]
+    assert isinstance(view, Cable)
+    assert view.name == "c1"
+    assert view == cables[1] and cables[1] == view
+    assert view != cables[0] and view == table[1]
+    view.length_km = 5
+    assert table.columns["length_km"][1] == 5
+    assert pickle.loads(pickle.dumps(view)).length_km == 5
+
+    gathered = ElementTable.gather([table[2], table[0]])
+    assert gathered.columns["name"].tolist() == ["c2", "c0"]
+
+
+def test_compact_elements(feeders: GeoGrid):
+    """Check if compacted elements result in the same pandapower model.
+
+    Args:
+        feeders: a grid with three substations and radial feeders.
+    """
+    expected = supra2pandapower(planar2supra(feeders))
+
+    grid = deepcopy(feeders)
+    tables = grid.compact_elements()
+    assert len(tables["edges"][Cable]) == 11
+    assert len(tables["conversions"][Ejection]) == 9
+    assert isinstance(grid.edges["sub0", "sub1"]["element"], Cable)
+
+    net = supra2pandapower(planar2supra(grid))
+    for key in ["bus", "line", "trafo", "load", "sgen"]:
+        pd.testing.assert_frame_equal(net[key], expected[key])
+
+
+def test_radial_power_flow(feeders: GeoGrid):
+    """Check if the direct impedance method agrees with pandapower.
+
+    Args:
+        feeders: a grid with three substations and radial feeders.
+    """
+    supra = planar2supra(feeders)
+    net = supra2pandapower(supra)
+    pp.runpp(net)
+    expected = net.res_bus.set_index(net.bus["name"])
+
+    rpf = RadialPowerFlow(supra)
+    assert rpf.bibc.shape == (14, 15)
+    assert rpf.buses[rpf.slack].tolist() == ["sub0_layer0"]
+    v = rpf.solve()
+    assert rpf.converged
+    res = rpf.to_frame(v)
+    assert np.allclose(res["vm_pu"], expected["vm_pu"], atol=1e-8)
+    assert np.allclose(res["va_degree"], expected["va_degree"], atol=1e-6)
+
+    # Topology is reused for another load profile.
+    p_mw = rpf.ejections["p_mw"].to_numpy() * 2
+    q_mvar = rpf.ejections["q_mvar"].to_numpy() * 2
+    v_double = rpf.solve(rpf.demand(p_mw, q_mvar), v_init=v)
+    assert rpf.converged
+    assert np.abs(v_double).min() < np.abs(v).min()
+
+
+def test_radial_power_flow_meshed(feeders: GeoGrid):
+    """Check if meshed grids are rejected by the direct impedance method.
+
+    Args:
+        feeders: a grid with three substations and radial feeders.
+    """
+    supra = planar2supra(feeders)
+    element = supra.edges["cab00", "cab01"]["element"]
+    supra.add_edge("cab02", "cab12", element=element)
+    with pt.raises(ValueError):
+        RadialPowerFlow(supra)
+
+
+def test_radial_power_flow_phase(feeders: GeoGrid):
+    """Check the three-phase direct impedance method.
+
+    Args:
+        feeders: a grid with three substations and radial feeders.
+    """
+    supra = planar2supra(feeders)
+    v_balanced = RadialPowerFlow(supra).solve()
+    rpf = RadialPowerFlowPhase(supra)
+    v = rpf.solve()
+    assert v.shape == (15, 3)
+    assert np.allclose(v[:, 0], v_balanced)
+    assert np.allclose(v[:, 2], v_balanced * np.exp(2j * np.pi / 3))
+    assert np.allclose(rpf.to_frame(v)["vuf"], 0)
+
+    # Add a single-phase load, and a cable defined phase by phase.
+    supra = deepcopy(supra)
+    supra.conversions.loc["ev", ["element", "bus"]] = [
+        EjectionPhase(0.02, 1, ["a"]),
+        "cab02",
+    ]
+    cable = supra.edges["cab01", "cab02"]["element"]
+    supra.edges["cab01", "cab02"]["element"] = CablePhase(
+        length_km=cable.length_km,
+        name=cable.name,
+        parallel=1,
+        phases=["a", "b", "c"],
+        r_ohm_mat=np.eye(3) * cable.r_ohm,
+        x_ohm_mat=np.eye(3) * cable.x_ohm,
+    )
+    rpf = RadialPowerFlowPhase(supra)
+    res = rpf.to_frame(rpf.solve())
+    assert rpf.converged
+    assert res.loc["cab02", "vm_pu_a"] < res.loc["cab02", "vm_pu_b"]
+    assert res.loc["cab02", "vuf"] > res.loc["cab01", "vuf"] > 0
+
+    # Any ejection must not be attached to a missing phase.
+    supra.edges["cab01", "cab02"]["element"] = CablePhase(
+        length_km=cable.length_km,
+        name=cable.name,
+        parallel=1,
+        phases=["a"],
+        r_ohm_mat=np.eye(1) * cable.r_ohm,
+        x_ohm_mat=np.eye(1) * cable.x_ohm,
+    )
+    with pt.raises(ValueError):
+        RadialPowerFlowPhase(supra)
+
+
+def test_time_series(feeders: GeoGrid, tmp_path):
+    """Check if time-series results agree with single power flows.
+
+    Args:
+        feeders: a grid with three substations and radial feeders.
+        tmp_path: a temporary directory for memory-mapped results.
+    """
+    supra = planar2supra(feeders)
+    net = supra2pandapower(supra)
+    pp.runpp(net)
+
+    rpf = RadialPowerFlow(supra)
+    names = ["load00", "load12"]
+    p_mw = np.outer([1, 2, 0], rpf.ejections.loc[names, "p_mw"])
+    runner = TimeSeriesPowerFlow(rpf, names)
+    res = TimeSeriesResult.allocate(len(p_mw), rpf, str(tmp_path))
+    runner.run(p_mw, res=res)
+
+    assert res.converged.all()
+    assert (tmp_path / "vm_pu.npy").exists()
+    expected = net.res_bus.set_index(net.bus["name"])
+    assert np.allclose(res.vm_pu[0], expected["vm_pu"])
+    lines = net.res_line.set_index(net.line["name"])
+    branches = [element.name for element in rpf.branches["element"]]
+    i_ka = pd.Series(res.i_ka[0], index=branches)
+    assert np.allclose(i_ka[lines.index], lines["i_ka"])
+    assert (res.vm_pu[1] <= res.vm_pu[0]).all()
+    assert (res.vm_pu[2] >= res.vm_pu[0]).all()
+
+    rpf_phase = RadialPowerFlowPhase(supra)
+    res_phase = TimeSeriesPowerFlow(rpf_phase, names).run(p_mw)
+    assert res_phase.vm_pu.shape == (3, 15, 3)
+    assert np.allclose(res_phase.vm_pu[..., 1], res.vm_pu)
+
+
+def test_partition(feeders: GeoGrid):
+    """Check if feeders solved in parallel agree with the whole grid.
+
+    Args:
+        feeders: a grid with three substations and radial feeders.
+    """
+    supra = planar2supra(feeders)
+    rpf = RadialPowerFlow(supra)
+    v = rpf.solve()
+    expected = rpf.to_frame(v)
+
+    part = partition(supra, [0])
+    assert len(part.grids) == 4
+    assert (part.boundaries["parent"] == 0).all()
+    assert "equivalent_sub0_layer1" in part.grids[0].conversions.index
+    assert part.grids[1].buses.index.tolist() == [
+        "sub0_layer0",
+        "cab00",
+        "cab01",
+        "cab02",
+        "sub0_layer1",
+    ]
+
+    with ParallelPowerFlow(part, max_workers=2) as runner:
+        with pt.raises(ValueError):
+            runner.run(max_rounds=0)
+        buses, branches = runner.run()
+        assert runner.converged
+    assert len(buses) == len(expected)
+    assert np.allclose(buses.loc[expected.index], expected, atol=1e-8)
+
+    branches = branches.set_index(["source", "target"])
+    edges = list(zip(rpf.branches["source"], rpf.branches["target"]))
+    assert np.allclose(branches.loc[edges, "i_ka"], rpf.i_ka(v))
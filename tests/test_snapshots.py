@@ -1,5 +1,12 @@
 """Test class in ``snapshots/relational-db.py``."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import sqlite3
 
+import networkx as nx
+import pytest as pt
+
+from mgrid.graph.geographic import GeoGraph
 from mgrid.snapshots.relational import GraphSnapshots
 
 EDGES_SNAPSHOT_3 = {("b", "c"), ("c", "d")}
@@ -15,30 +22,380 @@ def test_init():
     gs._select_direct_links("test")
 
 
-def test_manual_insertions():
-    """Test methods in ``GraphSnapshots`` after some manual insertions."""
-    gs = GraphSnapshots(":memory:")
+def insert_manually(gs: GraphSnapshots):
+    """Insert three snapshots manually for the sack of tests.
 
-    # Insert some values manually for the sack of tests.
+    Args:
+        gs: an empty database for snapshots.
+    """
     with gs.conn:
         gs.conn.executescript(
             """
             INSERT INTO snapshots (name)
             VALUES ('first'), ('second'), ('third');
 
+            INSERT INTO nodes (name) VALUES ('a'), ('b'), ('c'), ('d');
+
             INSERT INTO edges (source, target, element)
-            VALUES ('a', 'b', 1), ('b', 'c', 2), ('c', 'd', 3);
+            VALUES (1, 2, 1), (2, 3, 2), (3, 4, 3);
+
+            INSERT INTO events (snapshot, edge)
+            VALUES (2, 1), (3, 2), (4, 3), (4, 1);
+
+            INSERT INTO links (snapshot, link)
+            VALUES (2, 1), (3, 1), (4, 2), (4, 3);
+        """
+        )
 
+
+def test_manual_insertions():
+    """Test methods in ``GraphSnapshots`` after some manual insertions."""
+    gs = GraphSnapshots(":memory:")
+    insert_manually(gs)
+
+    assert gs.sym_diff({"first", "second", "third"}) == EDGES_SNAPSHOT_3
+    assert gs._get_links("third") == {"first", "second", "head"}
+
+
+def test_get_links():
+    """Test if all the ancestors in a deep chain of snapshots are found."""
+    gs = GraphSnapshots(":memory:")
+    depth = 2000
+    with gs.conn:
+        gs.conn.executemany(
+            "INSERT INTO snapshots (name) VALUES (?);",
+            [(f"s{i}",) for i in range(depth)],
+        )
+        # Snapshot "s{i}" is keyed by i + 2, after "head".
+        gs.conn.executemany(
+            "INSERT INTO links (snapshot, link) VALUES (?, ?);",
+            [(i + 2, i + 1) for i in range(depth)],
+        )
+        gs.conn.executemany(
+            "INSERT INTO links (snapshot, link) VALUES (?, ?);",
+            [(depth + 1, i + 2) for i in range(0, depth - 1, 2)],
+        )
+
+    links = gs._get_links(f"s{depth - 1}")
+    assert isinstance(links, set)
+    assert links == {"head"} | {f"s{i}" for i in range(depth - 1)}
+    assert len(gs._select_direct_links("s1999")) == depth // 2
+
+
+def test_read():
+    """Test reading committed and pending snapshots."""
+    gs = GraphSnapshots(":memory:")
+    insert_manually(gs)
+
+    dg = gs.read("third")
+    assert set(dg.edges) == EDGES_SNAPSHOT_3
+    assert dg.edges["c", "d"]["element"] == 3
+    assert gs.read("head").number_of_edges() == 0
+    assert gs.read("fourth") is None
+    assert isinstance(gs.read("first", GeoGraph), GeoGraph)
+
+    gs.pose("fourth", "third")
+    gs.add_edge("a", "b", 1)
+    gs.add_edge("a", "b", 1)
+    gs.remove_edge("c", "d")
+    gs.add_edge("d", "e", 4)
+    edges = {("a", "b"), ("b", "c"), ("d", "e")}
+    assert set(gs.pending_snapshot.edges) == edges
+    gs.rollback()
+    assert gs.read("fourth") is None
+    assert gs.pending_snapshot is None
+
+    gs.pose("fourth", "third")
+    dg = gs.pending_snapshot
+    dg.remove_edge("b", "c")
+    dg.add_edge("e", "f", element=5)
+    gs.replace_pending_snapshot(dg)
+    gs.commit()
+    dg = gs.read("fourth")
+    assert set(dg.edges) == {("c", "d"), ("e", "f")}
+    assert dg.edges["e", "f"]["element"] == 5
+    assert gs.sym_diff({"fourth"}) == {("b", "c"), ("e", "f")}
+
+
+def test_pose_duplicate():
+    """Test if posing an existing name leaves nothing pending."""
+    gs = GraphSnapshots(":memory:")
+    gs.pose("a", [])
+    gs.add_edge("x", "y", 0)
+    gs.commit()
+    with pt.raises(sqlite3.IntegrityError):
+        gs.pose("a", [])
+    assert gs.pending is None and gs.cursor is None
+
+    gs.pose("b", "a")
+    gs.add_edge("y", "z", 1)
+    gs.commit()
+    assert set(gs.read("a").edges) == {("x", "y")}
+    assert set(gs.read("b").edges) == {("x", "y"), ("y", "z")}
+
+
+def test_checkpoints():
+    """Test if reading from checkpoints gives the same snapshots."""
+    gs = GraphSnapshots(":memory:", checkpoint_events=None)
+    insert_manually(gs)
+    gs.checkpoint("first")
+    gs.checkpoint("first")
+    assert gs._nearest_checkpoint("third") == "first"
+    assert set(gs.read("third").edges) == EDGES_SNAPSHOT_3
+    assert set(gs.read("first").edges) == {("a", "b")}
+
+    # A pending snapshot is neither committed nor checkpointed.
+    gs.pose("pending", "third")
+    gs.add_edge("x", "y", 9)
+    gs.checkpoint("third")
+    gs.rollback()
+    assert not gs._exists("pending")
+    assert gs._nearest_checkpoint("third") == "first"
+    gs.pose("pending", "third")
+    gs.rollback()
+
+    # Build a chain of snapshots, each moving one edge forward.
+    plain = GraphSnapshots(":memory:", checkpoint_events=None)
+    checked = GraphSnapshots(":memory:", checkpoint_events=10)
+    for gs in [plain, checked]:
+        link = "head"
+        for i in range(30):
+            gs.pose(f"s{i}", link)
+            gs.add_edges([(f"n{i + 1}", f"n{i + 2}", i), (f"m{i}", "o", i)])
+            gs.remove_edge(f"n{i}", f"n{i + 1}")
+            gs.commit()
+            link = f"s{i}"
+
+    num_checkpoints = checked.conn.execute(
+        "SELECT COUNT(*) FROM checkpoints"
+    ).fetchone()[0]
+    assert num_checkpoints == 6
+    assert plain.conn.execute("SELECT * FROM checkpoints").fetchall() == []
+    for snapshot in ["s0", "s8", "s9", "s29"]:
+        expected = plain.read(snapshot)
+        res = checked.read(snapshot)
+        assert set(res.edges(data="element")) == set(
+            expected.edges(data="element")
+        )
+    assert checked._nearest_checkpoint("s29") == "s29"
+
+
+def test_checkpoint_own_increment():
+    """Test if only events in linked increments trigger checkpoints."""
+    gs = GraphSnapshots(":memory:", checkpoint_events=5)
+    gs.pose("big", "head")
+    gs.add_edges([(f"n{i}", f"n{i + 1}", i) for i in range(10)])
+    gs.commit()
+    assert gs._nearest_checkpoint("big") is None
+
+    gs.pose("small", "big")
+    gs.add_edge("m", "n", 10)
+    gs.commit()
+    assert gs._nearest_checkpoint("small") == "small"
+    assert len(gs.read("small").edges) == 11
+
+
+def test_ingest(tmp_path):
+    """Test if ingested snapshots equal those built edge by edge.
+
+    Args:
+        tmp_path: temporary directory for a database file.
+    """
+    path = str(tmp_path / "snapshots.db")
+    gs = GraphSnapshots(path)
+    edges = [(f"n{i}", f"n{i + 1}", i) for i in range(100)]
+    gs.ingest("base", edges, chunk_size=30)
+    assert gs.conn.execute("PRAGMA journal_mode;").fetchone()[0] == "delete"
+    assert gs.conn.execute("PRAGMA synchronous;").fetchone()[0] == 2
+    assert set(gs.read("base").edges(data="element")) == set(edges)
+    indices = gs.conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' "
+        "AND name NOT LIKE 'sqlite_%';"
+    ).fetchall()
+    assert len(indices) == 3
+
+    gs.ingest("next", edges[10:] + [("m", "n", 100)], links="base")
+    expected = GraphSnapshots(":memory:")
+    expected.pose("next", "head")
+    expected.add_edges(edges[10:] + [("m", "n", 100)])
+    expected.commit()
+    assert set(gs.read("next").edges(data="element")) == set(
+        expected.read("next").edges(data="element")
+    )
+    assert set(gs.read("base").edges(data="element")) == set(edges)
+    num_events = gs.conn.execute(
+        "SELECT COUNT(*) FROM events JOIN snapshots ON id = snapshot "
+        "WHERE name = 'next';"
+    ).fetchone()[0]
+    assert num_events == 11
+
+
+def test_migrate(tmp_path):
+    """Test if a database keyed by names is migrated.
+
+    Args:
+        tmp_path: temporary directory for a database file.
+    """
+    path = str(tmp_path / "snapshots.db")
+    with sqlite3.connect(path) as conn:
+        conn.executescript(
+            """
+            CREATE TABLE edges (
+                source TEXT, target TEXT, element INTEGER,
+                PRIMARY KEY (source, target)
+            );
+            CREATE UNIQUE INDEX edges_inv ON edges (target, source);
+            CREATE TABLE snapshots (name TEXT PRIMARY KEY);
+            CREATE TABLE events (snapshot TEXT, source TEXT, target TEXT);
+            CREATE TABLE links (snapshot TEXT, link TEXT);
+
+            INSERT INTO snapshots (name)
+            VALUES ('head'), ('first'), ('second'), ('third');
+            INSERT INTO edges (source, target, element)
+            VALUES ('a', 'b', 1), ('b', 'c', 2), ('c', 'd', 3);
             INSERT INTO events (snapshot, source, target)
             VALUES
                 ('first', 'a', 'b'), ('second', 'b', 'c'), ('third', 'c', 'd'),
-                ('third', 'a', 'b');
-
+                ('third', 'a', 'b'), ('third', 'b', 'c'), ('third', 'b', 'c');
             INSERT INTO links (snapshot, link)
             VALUES
                 ('first', 'head'), ('second', 'head'), ('third', 'first'),
                 ('third', 'second');
-        """
+            """
         )
+    conn.close()
 
-    assert gs.sym_diff({"first", "second", "third"}) == EDGES_SNAPSHOT_3
+    gs = GraphSnapshots(path)
+    assert gs.conn.execute("PRAGMA user_version;").fetchone()[0] == 1
+    dg = gs.read("third")
+    assert set(dg.edges) == EDGES_SNAPSHOT_3
+    assert dg.edges["c", "d"]["element"] == 3
+    assert gs.sym_diff({"third"}) == {("a", "b"), ("c", "d")}
+    assert gs._get_links("third") == {"first", "second", "head"}
+
+
+def test_cache():
+    """Test if cached snapshots are reused and evicted."""
+    gs = GraphSnapshots(":memory:", cache_edges=5)
+    plain = GraphSnapshots(":memory:")
+    for db in [gs, plain]:
+        db.pose("first", "head")
+        db.add_edges([("a", "b", 1), ("b", "c", 2), ("c", "d", 3)])
+        db.commit()
+        db.pose("second", "first")
+        db.remove_edge("a", "b")
+        db.add_edge("d", "e", 4)
+        db.commit()
+
+    dg = gs.read("first")
+    assert (gs.cache.hits, gs.cache.misses) == (0, 1)
+    assert gs.read("first") is dg
+    assert nx.is_frozen(dg)
+    assert (gs.cache.hits, gs.cache.misses) == (1, 1)
+
+    dg = gs.read("second")
+    assert gs.cache.reuses == 1
+    expected = plain.read("second")
+    assert set(dg.edges(data="element")) == set(expected.edges(data="element"))
+    assert set(dg.nodes) == set(expected.nodes)
+    assert "second" in gs.cache and "first" not in gs.cache
+    assert gs.cache.edges == 3
+
+    geo = gs.read("second", GeoGraph)
+    assert isinstance(geo, GeoGraph) and not nx.is_frozen(geo)
+    assert (gs.cache.hits, gs.cache.misses) == (2, 2)
+
+    gs.pose("third", "second")
+    gs.add_edge("e", "f", 5)
+    assert gs.pending_snapshot.number_of_edges() == 4
+    assert (gs.cache.hits, gs.cache.misses) == (2, 2)
+
+
+def test_diff():
+    """Test differences between two snapshots against full reads."""
+    gs = GraphSnapshots(":memory:")
+    insert_manually(gs)
+    gs.pose("fourth", ["second", "first"])
+    gs.add_edge("e", "f", 5)
+    gs.remove_edge("a", "b")
+    gs.commit()
+
+    df = gs.diff("first", "third")
+    assert set(df.columns) == {"source", "target", "element", "added"}
+    for a, b in [("first", "third"), ("third", "fourth"), ("head", "third")]:
+        df = gs.diff(a, b)
+        before = set(gs.read(a).edges)
+        after = set(gs.read(b).edges)
+        added = df.loc[df["added"], ["source", "target"]]
+        removed = df.loc[~df["added"], ["source", "target"]]
+        assert set(added.itertuples(index=False, name=None)) == after - before
+        assert (
+            set(removed.itertuples(index=False, name=None)) == before - after
+        )
+    assert gs.diff("third", "third").empty
+    assert gs.diff("third", "fifth") is None
+
+
+def test_pool(tmp_path):
+    """Test concurrent readers while a snapshot is pending.
+
+    Args:
+        tmp_path: temporary directory for a database file.
+    """
+    path = str(tmp_path / "snapshots.db")
+    gs = GraphSnapshots(path, cache_edges=1000, readers=4)
+    edges = [(f"n{i}", f"n{i + 1}", i) for i in range(100)]
+    gs.ingest("base", edges)
+    gs.pose("next", "base")
+    gs.add_edge("m", "n", 100)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(gs.read, "base") for _ in range(8)]
+        futures.append(executor.submit(gs.read, "next"))
+        graphs = [future.result(timeout=10) for future in futures]
+    assert all(set(dg.edges) == set(graphs[0].edges) for dg in graphs[:-1])
+    assert graphs[0].number_of_edges() == 100
+    assert graphs[-1] is None
+    assert gs.pending_snapshot.number_of_edges() == 101
+
+    async def read_all():
+        return await asyncio.gather(
+            gs.read_async("base"), gs.diff_async("base", "next")
+        )
+
+    gs.commit()
+    dg, df = asyncio.run(read_all())
+    assert dg.number_of_edges() == 100
+    assert len(df) == 1 and df["added"].all()
+    assert len(gs._readers) > 0
+    gs.close()
+    assert gs._readers == []
+
+
+def test_compact():
+    """Test if squashed history keeps snapshots to keep readable."""
+    gs = GraphSnapshots(":memory:", checkpoint_events=None, cache_edges=100)
+    link = "head"
+    for i in range(10):
+        gs.pose(f"s{i}", link)
+        gs.add_edges([(f"n{i + 1}", f"n{i + 2}", i), (f"m{i}", "o", i)])
+        gs.remove_edge(f"n{i}", f"n{i + 1}")
+        gs.commit()
+        link = f"s{i}"
+    gs.pose("branch", "s6")
+    gs.add_edge("x", "y", 10)
+    gs.commit()
+    keep = ["s4", "s9", "branch"]
+    expected = {name: set(gs.read(name).edges) for name in keep}
+
+    res = gs.compact(keep, checkpoint=True)
+    assert sorted(res.squashed) == ["s0", "s1", "s2", "s3", "s5", "s7", "s8"]
+    assert res.bytes_reclaimed == res.bytes_before - res.bytes_after
+    assert res.seconds_before > 0 and res.seconds_after > 0
+    for name in keep:
+        assert set(gs.read(name).edges) == expected[name]
+    assert gs.read("s3") is None
+    assert gs._get_links("s9") == {"s6", "s4", "head"}
+    assert gs._nearest_checkpoint("s9") == "s9"
+    num_events = gs.conn.execute("SELECT COUNT(*) FROM events;").fetchone()
+    assert num_events[0] < 29
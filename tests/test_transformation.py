@@ -1,9 +1,18 @@
 """Test functions in ``convert.py``."""
+from copy import deepcopy
 from itertools import chain
 
 from mgrid.graph.geographic import COLUMNS, COLUMNS_DI, GeoGraph
+from mgrid.graph.supra import SupraGraph
 from mgrid.grid import GeoGrid
-from mgrid.transformation import COLUMNS_DI_ORIGINAL, planar2supra
+from mgrid.power_flow.conversion import Ejection
+from mgrid.power_flow.delivery import TransformerStd
+from mgrid.transformation import (
+    COLUMNS_DI_ORIGINAL,
+    GeoDelta,
+    planar2supra,
+    SupraGridView,
+)
 
 
 def test_planar2supra(simple: GeoGraph):
@@ -35,3 +44,154 @@ def test_case_large(case_large: GeoGrid):
     res = planar2supra(case_large)
     assert res.number_of_edges() == 8 + 2
     assert res.number_of_nodes() == 7 + 2
+
+
+def test_terminals(case_large: GeoGrid):
+    """Check if intra-edges are attached to split terminals.
+
+    Args:
+        case_large: a test case with 8 planar edges and 2 inter-edges.
+    """
+    res = planar2supra(case_large)
+
+    intra_edges = res.intra_edges
+    assert intra_edges.loc[("n2", "n5"), COLUMNS_DI].tolist() == [
+        "n2",
+        "n5_layer0",
+    ]
+    assert intra_edges.loc[("n5", "n6"), COLUMNS_DI].tolist() == [
+        "n5_layer1",
+        "n6",
+    ]
+    assert intra_edges.loc[("n3", "n4"), COLUMNS_DI].tolist() == [
+        "n3_layer0",
+        "n4",
+    ]
+
+    for _, row in res.inter_edges.iterrows():
+        assert res.has_edge(row["source"], row["target"])
+    assert "n5" not in res.nodes
+
+
+def test_bus_index(case_large: GeoGrid):
+    """Check if the index of split terminals matches a scan of nodes.
+
+    Args:
+        case_large: a test case with 8 planar edges and 2 inter-edges.
+    """
+    res = planar2supra(case_large)
+    bus_index = res.nodes_new
+    assert bus_index is res.bus_index
+
+    res.bus_index = None
+    scanned = res.nodes_new
+    assert bus_index.index.names == ["origin", "layer"]
+    assert bus_index.equals(scanned)
+    assert bus_index.loc[("n5", 0), "bus"] == "n5_layer0"
+
+
+def test_nodes_new_scan():
+    """Check if scanned terminals follow modification of a supra graph."""
+    res = SupraGraph()
+    res.add_node("a_layer0", origin="a", layer=0)
+    assert len(res.nodes_new) == 1
+    res.add_node("b_layer1", origin="b", layer=1)
+    assert res.nodes_new.loc[("b", 1), "bus"] == "b_layer1"
+    res.remove_node("a_layer0")
+    assert res.nodes_new.index.tolist() == [("b", 1)]
+    assert res.bus_index is None
+
+
+def test_patch(feeders: GeoGrid):
+    """Check if patching a supra grid is the same as converting again.
+
+    Args:
+        feeders: a grid with three substations and radial feeders.
+    """
+    g = deepcopy(feeders)
+    supra = planar2supra(g)
+    delta = GeoDelta()
+
+    # Extend and mesh feeders, and move a load to the new cabinet.
+    cable = g.edges["sub0", "cab00"]["element"]
+    g.add_edge("cab02", "cab03", layer=1, element=cable)
+    g.add_edge("cab22", "cab12", layer=1, element=cable)
+    g.remove_edge("cab10", "cab11")
+    g.conversions.drop(index="load00", inplace=True)
+    g.add_conversion("load00", "cab03", Ejection(0.05, 0.9))
+    delta.edges_added += [("cab02", "cab03"), ("cab22", "cab12")]
+    delta.edges_removed.append(("cab10", "cab11"))
+    delta.conversions_added.append("load00")
+
+    # Split a cabinet with a load into a new layer.
+    g.add_inter_node("cab01", TransformerStd("trafo", "cab01", 1), False)
+    g.add_edge("cab01", "lv", layer=2, element=cable)
+    g.add_conversion("lv", "lv", Ejection(0.001, 0.9))
+    delta.inter_nodes_added.append("cab01")
+    delta.edges_added.append(("cab01", "lv"))
+    delta.conversions_added.append("lv")
+
+    # Remove a substation.
+    g.remove_node("sub2")
+    g.inter_nodes.drop(index="sub2", inplace=True)
+    g.conversions.drop(index="capacitor", inplace=True)
+    delta.inter_nodes_removed.append("sub2")
+    delta.conversions_removed.append("capacitor")
+
+    expected = planar2supra(g)
+    res = planar2supra(g, supra, delta)
+    assert res is supra
+    assert dict(res.nodes(data=True)) == dict(expected.nodes(data=True))
+    assert {(u, v): d for u, v, d in res.edges(data=True)} == {
+        (u, v): d for u, v, d in expected.edges(data=True)
+    }
+    for key in ["intra_edges", "inter_edges", "bus_index", "conversions"]:
+        assert getattr(res, key).sort_index().equals(
+            getattr(expected, key).sort_index()
+        )
+    assert res.conversions.at["load01", "bus"] == "cab01_layer1"
+    assert res.buses.sort_index().equals(expected.buses.sort_index())
+    assert res.buses["idx"].is_monotonic_increasing
+
+
+def test_view(feeders: GeoGrid):
+    """Check if a view of a planar grid is the same as its conversion.
+
+    Args:
+        feeders: a grid with three substations and radial feeders.
+    """
+    expected = planar2supra(feeders)
+    res = SupraGridView(feeders)
+
+    assert list(res.nodes(data=True)) == list(expected.nodes(data=True))
+    assert list(res.edges(data=True)) == list(expected.edges(data=True))
+    assert res.number_of_edges() == expected.number_of_edges()
+    assert res.has_edge("sub0_layer1", "cab00")
+    assert "sub0" not in res
+    assert res.intra_edges is None
+    for key in ["inter_edges", "bus_index", "buses", "conversions"]:
+        assert getattr(res, key).equals(getattr(expected, key))
+
+    piece = res.subgraph(["sub0_layer1", "cab00", "cab01"])
+    assert set(piece.edges) == {("sub0_layer1", "cab00"), ("cab00", "cab01")}
+
+
+def test_compact(feeders: GeoGrid, compact_feeders: GeoGrid):
+    """Check if a grid stored in arrays is converted like ``networkx``.
+
+    Args:
+        feeders: a grid with three substations and radial feeders.
+        compact_feeders: the same grid with edges stored in arrays.
+    """
+    expected = planar2supra(feeders)
+    res = planar2supra(compact_feeders)
+
+    assert res._arrays is not None
+    assert list(res.nodes(data=True)) == list(expected.nodes(data=True))
+    assert list(res.edges(data=True)) == list(expected.edges(data=True))
+    assert res.intra_edges.equals(expected.intra_edges.drop(columns="element"))
+    for key in ["inter_edges", "bus_index", "buses", "conversions"]:
+        assert getattr(res, key).equals(getattr(expected, key))
+
+    view = SupraGridView(compact_feeders)
+    assert list(view.edges(data=True)) == list(res.edges(data=True))